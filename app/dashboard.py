@@ -5,18 +5,31 @@
 # Enhanced: Plotly 3D, basemaps, export, MaterialTemplate
 # ============================================================
 
-import os, time, numpy as np, pandas as pd, xarray as xr
-import panel as pn, hvplot.xarray, hvplot.pandas, holoviews as hv, geoviews as gv
-import matplotlib.pyplot as plt, shap, plotly.graph_objects as go
+import os, sys, time, numpy as np, pandas as pd, xarray as xr
+import panel as pn
 from io import BytesIO
-from sklearn.ensemble import RandomForestRegressor
+# Plotting stacks (hvplot, geoviews, shap, plotly) are imported inside the tab
+# builders below, so importing this module only costs Panel + xarray.
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from libuts.scenarios import scenario_table, evaluate_scenarios, scenario_summary
+from libuts.explain import latest_explanation
+from libuts.stats import load_or_compute_stats, summary_frame, corr_frame
+from libuts.store import ML_DATASET, open_store
+from libuts.pyramid import Pyramid
+from libuts.transect import TransectSampler
 
 pn.extension('tabulator', 'plotly', 'floatpanel', 'echarts', sizing_mode="stretch_width")
 
 # ------------------------------------------------------------
 # 🌍 Load Data
 # ------------------------------------------------------------
-ds = xr.open_dataset("outputs/greifswalder_step3_ml.nc")
+STORE_ZARR = "outputs/greifswalder_store.zarr"
+STEP3_NC = "outputs/greifswalder_step3_ml.nc"
+PYRAMID_ZARR = "outputs/greifswalder_pyramid.zarr"
+# Lazy: only metadata is read here, chunks are loaded as tabs need them
+has_store = os.path.exists(STORE_ZARR)
+ds = open_store(STORE_ZARR, ML_DATASET) if has_store else xr.open_dataset(STEP3_NC)
 print("✅ Loaded:", list(ds.data_vars))
 
 restoration_csv = "outputs/restoration_summary.csv"
@@ -81,215 +94,340 @@ sidebar = pn.Column(
 # ------------------------------------------------------------
 # 🗺 Spatial Explorer (with basemap)
 # ------------------------------------------------------------
-var_select = pn.widgets.Select(name="Variable", options=list(ds.data_vars), value="SSI")
-import geoviews as gv
-import cartopy.crs as ccrs
-from holoviews.operation.datashader import regrid
-
-@pn.depends(var_select)
-def map_view(var):
-    da = ds[var]
-
-    # --- CRS and extent ---
-    crs = ccrs.PlateCarree()
-    lon_min, lon_max = float(ds.lon.min()), float(ds.lon.max())
-    lat_min, lat_max = float(ds.lat.min()), float(ds.lat.max())
-    extent = (lon_min, lon_max, lat_min, lat_max)
-
-    # --- GeoViews image (1D coords are fine) ---
-    img = gv.Image(
-        da,
-        kdims=["lon", "lat"],
-        crs=crs
-    ).opts(
-        cmap="viridis",
-        colorbar=True,
-        tools=["hover", "wheel_zoom", "pan"],
-        active_tools=["wheel_zoom"],
-        frame_width=850,
-        frame_height=600,
-        projection=crs,
-        global_extent=False,
-        xlim=(lon_min, lon_max),
-        ylim=(lat_min, lat_max),
-        title=f"🗺️ {var} — Spatial Distribution"
+def build_spatial():
+    var_select = pn.widgets.Select(name="Variable", options=list(ds.data_vars), value="SSI")
+    import hvplot.xarray  # noqa: F401  (loads the bokeh plotting extension)
+    import geoviews as gv
+    import cartopy.crs as ccrs
+    import holoviews as hv
+    from holoviews.operation.datashader import regrid
+    from holoviews.streams import RangeXY
+
+    # Tile pyramid from Step 3: only the level and chunks in view are read
+    pyramid = Pyramid(PYRAMID_ZARR) if os.path.exists(PYRAMID_ZARR) else None
+
+    @pn.depends(var_select)
+    def map_view(var):
+        use_pyramid = pyramid is not None and var in pyramid.variables
+        da = ds[var]
+
+        # --- CRS and extent ---
+        crs = ccrs.PlateCarree()
+        lon_min, lon_max = float(ds.lon.min()), float(ds.lon.max())
+        lat_min, lat_max = float(ds.lat.min()), float(ds.lat.max())
+        extent = (lon_min, lon_max, lat_min, lat_max)
+
+        # --- GeoViews image (1D coords are fine) ---
+        def image(da):
+            return gv.Image(
+                da,
+                kdims=["lon", "lat"],
+                crs=crs
+            ).opts(
+                cmap="viridis",
+                colorbar=True,
+                tools=["hover", "wheel_zoom", "pan"],
+                active_tools=["wheel_zoom"],
+                frame_width=850,
+                frame_height=600,
+                projection=crs,
+                global_extent=False,
+                xlim=(lon_min, lon_max),
+                ylim=(lat_min, lat_max),
+                title=f"🗺️ {var} — Spatial Distribution"
+            )
+
+        # --- Base map overlay ---
+        base = gv.tile_sources.EsriImagery.opts(alpha=0.6)
+
+        # --- Combine: pyramid level per viewport, else regrid the full array ---
+        if use_pyramid:
+            def tile(x_range, y_range):
+                return image(pyramid.view(var, x_range, y_range, 850, 600)[0])
+            rng = RangeXY(x_range=(lon_min, lon_max), y_range=(lat_min, lat_max))
+            return base * hv.DynamicMap(tile, streams=[rng])
+        return (base * regrid(image(da))).opts(framewise=True)
+
+    return pn.Column(
+        pn.pane.Markdown("## 🗺️ Spatial Layers Overview", styles=style),
+        var_select, map_view,
+        pn.pane.Markdown("_Toggle variable and explore overlayed on basemap._", styles=style)
     )
 
-    # --- Base map overlay ---
-    base = gv.tile_sources.EsriImagery.opts(alpha=0.6)
-
-    # --- Combine ---
-    return (base * regrid(img)).opts(framewise=True)
-
-tab1 = pn.Column(
-    pn.pane.Markdown("## 🗺️ Spatial Layers Overview", styles=style),
-    var_select, map_view,
-    pn.pane.Markdown("_Toggle variable and explore overlayed on basemap._", styles=style)
-)
 
 # ------------------------------------------------------------
 # 📈 Cross-Section Explorer (time-aware)
 # ------------------------------------------------------------
-lat_slider = pn.widgets.FloatSlider(
-    name="Latitude", start=float(ds.lat.min()), end=float(ds.lat.max()),
-    step=0.01, value=float(ds.lat.mean()), width=400
-)
+def build_cross_section():
+    import hvplot.pandas  # noqa: F401
+    import holoviews as hv
+    from holoviews.streams import PolyDraw
+
+    sampler = TransectSampler(ds)
+    lat_slider = pn.widgets.FloatSlider(
+        name="Latitude", start=float(ds.lat.min()), end=float(ds.lat.max()),
+        step=0.01, value=float(ds.lat.mean()), width=400
+    )
+    profile_vars = [v for v in ("SSI", "PAR_bed", "depth") if v in ds] or ["SSI"]
+    var_choice = pn.widgets.MultiChoice(
+        name="Variables", options=[v for v in ds.data_vars if ds[v].ndim == 2], value=profile_vars, width=400
+    )
 
-time_slider = None
-if "time" in ds.dims:
-    time_slider = pn.widgets.DiscreteSlider(name="Time", options=list(map(str, ds.time.values)))
+    time_slider = None
+    if "time" in ds.dims:
+        time_slider = pn.widgets.DiscreteSlider(name="Time", options=list(map(str, ds.time.values)))
+
+    # --- Drawing canvas: a coarse SSI preview with one editable polyline ---
+    step = max(1, max(ds.sizes["lat"], ds.sizes["lon"]) // 300)
+    preview = ds["SSI"].coarsen(lat=step, lon=step, boundary="trim").mean()
+    line = hv.Path([]).opts(color=ACCENT, line_width=3)
+    draw = PolyDraw(source=line, num_objects=1, drag=True)
+    canvas = (hv.Image(preview, kdims=["lon", "lat"]).opts(cmap="viridis", width=450, height=350) * line).opts(
+        title="✏️ Draw a transect (double-click to start/finish)"
+    )
 
-@pn.depends(lat_slider)
-def ssi_profile(lat):
-    cut = ds.sel(lat=lat, method="nearest")
-    return cut.hvplot.line(
-        x="lon", y="SSI", color=ACCENT, line_width=3,
-        title=f"📈 SSI cross-section at {lat:.3f}° N"
+    def transect_profile(lat, variables, drawn):
+        xs, ys = (drawn or {}).get("xs", []), (drawn or {}).get("ys", [])
+        if xs and len(xs[0]) >= 2:
+            vertices, label = list(zip(xs[0], ys[0])), "drawn transect"
+        else:
+            vertices, label = sampler.latitude_line(lat), f"{lat:.3f}° N"
+        variables = variables or ["SSI"]
+        df = sampler.profile(vertices, variables)
+        if df.empty:
+            return pn.pane.Markdown("_The drawn transect does not cross the grid._", styles=style)
+        plots = [
+            df.hvplot.line(x="distance_km", y=v, color=ACCENT, line_width=3, height=280,
+                           title=f"📈 {v} along {label}")
+            for v in variables
+        ]
+        return hv.Layout(plots).cols(3)
+
+    return pn.Column(
+        pn.pane.Markdown("## 📈 Cross-Section", styles=style),
+        pn.Row(pn.Column(lat_slider, var_choice), canvas),
+        pn.bind(transect_profile, lat_slider, var_choice, draw.param.data),
+        pn.pane.Markdown("_Slide a west–east line or draw any polyline (e.g. a planting corridor) "
+                         "to compare variables along it._", styles=style)
     )
 
-tab2 = pn.Column(
-    pn.pane.Markdown("## 📈 SSI Cross-Section", styles=style),
-    lat_slider, ssi_profile,
-    pn.pane.Markdown("_Observe suitability gradients longitudinally._", styles=style)
-)
 
 # ------------------------------------------------------------
 # 🔬 Correlation + Summary Statistics
 # ------------------------------------------------------------
-def correlation_heatmap():
-    df = ds.to_dataframe().dropna()
-    corr = df.corr().stack().reset_index()
-    corr.columns = ["x", "y", "correlation"]
-    return corr.hvplot.heatmap(
-        x="x", y="y", C="correlation", cmap="coolwarm", clim=(-1, 1),
-        width=500, height=450, title="🔬 Variable Correlation Matrix", tools=["hover"]
-    )
+def build_correlation():
+    import hvplot.pandas  # noqa: F401
+    # Computed once per source-file hash (libuts.stats), not per render
+    stats = load_or_compute_stats(STORE_ZARR, variables=list(ds.data_vars)) if has_store \
+        else load_or_compute_stats(STEP3_NC)
+
+    def correlation_heatmap():
+        corr = corr_frame(stats).stack().reset_index()
+        corr.columns = ["x", "y", "correlation"]
+        return corr.hvplot.heatmap(
+            x="x", y="y", C="correlation", cmap="coolwarm", clim=(-1, 1),
+            width=500, height=450, title="🔬 Variable Correlation Matrix", tools=["hover"]
+        )
 
-def summary_table():
-    df = ds.to_dataframe().describe().T.reset_index().rename(columns={'index': 'Variable'})
-    return pn.widgets.Tabulator(df, height=350, theme='fast', layout='fit_data_stretch')
+    def summary_table():
+        df = summary_frame(stats)
+        return pn.widgets.Tabulator(df, height=350, theme='fast', layout='fit_data_stretch')
+
+    return pn.Row(
+        pn.Column(correlation_heatmap),
+        pn.Column("### 📊 Summary Statistics", summary_table()),
+    )
 
-tab3 = pn.Row(
-    pn.Column(correlation_heatmap),
-    pn.Column("### 📊 Summary Statistics", summary_table()),
-)
 
 # ------------------------------------------------------------
 # 🧠 SHAP Explainability
 # ------------------------------------------------------------
-df = ds[["KD490", "ADG443", "APH443", "BBP443"]].to_dataframe().dropna()
-y = ds["SSI"].to_dataframe().reindex(df.index).fillna(0)
-rf = RandomForestRegressor(n_estimators=150, random_state=42)
-rf.fit(df, y.values.ravel())
-
-explainer = shap.TreeExplainer(rf)
-shap_values = explainer.shap_values(df)
-mean_abs = np.abs(shap_values).mean(axis=0)
-ranking = pd.DataFrame({'Variable': df.columns, 'Mean |SHAP|': mean_abs}).sort_values('Mean |SHAP|', ascending=False)
-
-shap_var = pn.widgets.Select(name="Variable", options=list(df.columns), value="KD490")
-
-@pn.depends(shap_var)
-def shap_dependence(var):
-    plt.figure(figsize=(6,4))
-    shap.dependence_plot(var, shap_values, df, show=False)
-    buf = BytesIO(); plt.savefig(buf, format="png", dpi=120, bbox_inches="tight"); plt.close()
-    return pn.pane.PNG(buf.getvalue(), height=400)
-
-ranking_table = pn.widgets.Tabulator(ranking, height=200, theme='fast')
-
-tab4 = pn.Column(
-    pn.pane.Markdown("## 🧠 SHAP Explainability", styles=style),
-    shap_var, shap_dependence,
-    pn.pane.Markdown("### Mean |SHAP| Variable Importance", styles=style),
-    ranking_table
-)
+def build_explainability():
+    # Precomputed by Step 3 (libuts.explain) — no model training here
+    # The explanation of the model whose SSI_ML is loaded (any, for outputs without the hash)
+    expl = latest_explanation(model_hash=ds["SSI_ML"].attrs.get("model_hash") if "SSI_ML" in ds else None)
+
+    if expl is not None:
+        import matplotlib.pyplot as plt, shap
+        shap_values, shap_X, ranking = expl["shap_values"], expl["X"], expl["ranking"]
+        shap_var = pn.widgets.Select(name="Variable", options=list(shap_X.columns), value=ranking["Variable"].iloc[0])
+
+        @pn.depends(shap_var)
+        def shap_dependence(var):
+            plt.figure(figsize=(6,4))
+            shap.dependence_plot(var, shap_values, shap_X, show=False)
+            buf = BytesIO(); plt.savefig(buf, format="png", dpi=120, bbox_inches="tight"); plt.close()
+            return pn.pane.PNG(buf.getvalue(), height=400)
+
+        ranking_table = pn.widgets.Tabulator(ranking, height=200, theme='fast')
+
+        return pn.Column(
+            pn.pane.Markdown("## 🧠 SHAP Explainability", styles=style),
+            shap_var, shap_dependence,
+            pn.pane.Markdown(f"### Mean |SHAP| Variable Importance  _(n = {len(shap_X)} stratified samples)_", styles=style),
+            ranking_table
+        )
+    else:
+        return pn.pane.Markdown("🧠 No SHAP artefact found — run Step 3 (`make ml`) first.")
+
 
 # ------------------------------------------------------------
 # 🌱 Restoration Planner (auto coords + export)
 # ------------------------------------------------------------
-if has_restoration:
-    if not any(col.lower() in ["lon","longitude","x"] for col in restoration.columns):
-        np.random.seed(42)
-        restoration["lon"] = np.random.uniform(13.2,14.3,len(restoration))
-        restoration["lat"] = np.random.uniform(53.9,54.6,len(restoration))
-
-    co2_slider = pn.widgets.FloatSlider(name="Min CO₂ (kt eq)", start=0,
-        end=float(restoration["CO2_potential"].max()), value=0)
-    risk_slider = pn.widgets.FloatSlider(name="Max ALAN Risk", start=0,
-        end=float(restoration["ALAN_risk"].max()), value=float(restoration["ALAN_risk"].max()))
-    unc_slider = pn.widgets.FloatSlider(name="Max Uncertainty", start=0,
-        end=float(restoration["uncertainty"].max()), value=float(restoration["uncertainty"].max()))
-
-    @pn.depends(co2_slider, risk_slider, unc_slider)
-    def filtered_sites(co2_min, alan_max, unc_max):
-        f = restoration.query("CO2_potential>=@co2_min & ALAN_risk<=@alan_max & uncertainty<=@unc_max")
-        if f.empty:
-            return pn.pane.Markdown("❌ No sites match filters.", styles={"color":"#ff4d6d"})
-
-        map_points = f.hvplot.points("lon","lat",color="CO2_potential",cmap="viridis",size=9,
-                                     tools=["hover"],width=650,height=450,
-                                     title=f"🌱 {len(f)} Restoration Sites")
-
-        # --- CSV export helper ---
-        def _make_csv():
-            return f.to_csv(index=False)
-
-        download = pn.widgets.FileDownload(
-            filename="filtered_restoration.csv",
-            label="⬇️ Download CSV",
-            button_type="success",
+def build_restoration():
+    import hvplot.pandas, holoviews as hv  # noqa: F401
+    if has_restoration:
+        if not any(col.lower() in ["lon","longitude","x"] for col in restoration.columns):
+            np.random.seed(42)
+            restoration["lon"] = np.random.uniform(13.2,14.3,len(restoration))
+            restoration["lat"] = np.random.uniform(53.9,54.6,len(restoration))
+
+        co2_slider = pn.widgets.FloatSlider(name="Min CO₂ (kt eq)", start=0,
+            end=float(restoration["CO2_potential"].max()), value=0)
+        risk_slider = pn.widgets.FloatSlider(name="Max ALAN Risk", start=0,
+            end=float(restoration["ALAN_risk"].max()), value=float(restoration["ALAN_risk"].max()))
+        unc_slider = pn.widgets.FloatSlider(name="Max Uncertainty", start=0,
+            end=float(restoration["uncertainty"].max()), value=float(restoration["uncertainty"].max()))
+
+        @pn.depends(co2_slider, risk_slider, unc_slider)
+        def filtered_sites(co2_min, alan_max, unc_max):
+            f = restoration.query("CO2_potential>=@co2_min & ALAN_risk<=@alan_max & uncertainty<=@unc_max")
+            if f.empty:
+                return pn.pane.Markdown("❌ No sites match filters.", styles={"color":"#ff4d6d"})
+
+            map_points = f.hvplot.points("lon","lat",color="CO2_potential",cmap="viridis",size=9,
+                                         tools=["hover"],width=650,height=450,
+                                         title=f"🌱 {len(f)} Restoration Sites")
+
+            # --- CSV export helper ---
+            def _make_csv():
+                return f.to_csv(index=False)
+
+            download = pn.widgets.FileDownload(
+                filename="filtered_restoration.csv",
+                label="⬇️ Download CSV",
+                button_type="success",
+            )
+            download.callback = _make_csv   # ✅ correct pattern for Panel>=1.3
+
+
+            metrics = pn.Row(
+                pn.indicators.Number(name="Total CO₂ (kt)", value=f["CO2_potential"].sum(),
+                                     format="{value:.2f}", default_color=ACCENT),
+                pn.indicators.Number(name="Mean Risk", value=f["ALAN_risk"].mean(),
+                                     format="{value:.2f}", default_color="#ffb703"),
+                pn.indicators.Number(name="Mean Uncertainty", value=f["uncertainty"].mean(),
+                                     format="{value:.2f}", default_color="#fb8500")
+            )
+            return pn.Column(map_points, metrics, download)
+
+        pareto_plot = (
+            pareto.hvplot.scatter(x="Uncertainty", y="CO2_potential", c="ALAN_risk",
+                cmap="plasma", colorbar=True, size=60, width=550, height=450,
+                title="⚖️ Pareto Front — CO₂ vs Uncertainty")
+            if pareto is not None else hv.Curve([])
         )
-        download.callback = _make_csv   # ✅ correct pattern for Panel>=1.3
 
-
-        metrics = pn.Row(
-            pn.indicators.Number(name="Total CO₂ (kt)", value=f["CO2_potential"].sum(),
-                                 format="{value:.2f}", default_color=ACCENT),
-            pn.indicators.Number(name="Mean Risk", value=f["ALAN_risk"].mean(),
-                                 format="{value:.2f}", default_color="#ffb703"),
-            pn.indicators.Number(name="Mean Uncertainty", value=f["uncertainty"].mean(),
-                                 format="{value:.2f}", default_color="#fb8500")
+        return pn.Row(
+            pn.Column("## 🌱 Restoration Planner", co2_slider, risk_slider, unc_slider, filtered_sites),
+            pn.Column("## ⚖️ Trade-offs", pareto_plot)
         )
-        return pn.Column(map_points, metrics, download)
-
-    pareto_plot = (
-        pareto.hvplot.scatter(x="Uncertainty", y="CO2_potential", c="ALAN_risk",
-            cmap="plasma", colorbar=True, size=60, width=550, height=450,
-            title="⚖️ Pareto Front — CO₂ vs Uncertainty")
-        if pareto is not None else hv.Curve([])
-    )
+    else:
+        return pn.Column("### 🌱 Restoration Planner",
+                         pn.pane.Markdown("_No restoration data available yet._", styles=style))
 
-    tab5 = pn.Row(
-        pn.Column("## 🌱 Restoration Planner", co2_slider, risk_slider, unc_slider, filtered_sites),
-        pn.Column("## ⚖️ Trade-offs", pareto_plot)
-    )
-else:
-    tab5 = pn.Column("### 🌱 Restoration Planner",
-                     pn.pane.Markdown("_No restoration data available yet._", styles=style))
 
 # ------------------------------------------------------------
 # 🌊 3D Bathymetry Viewer (Plotly)
 # ------------------------------------------------------------
-if "depth" in ds.data_vars:
-    z = ds["depth"].values
-    fig = go.Figure(data=[go.Surface(z=z, colorscale="Viridis")])
-    fig.update_layout(title="3D Bathymetry (Depth)", autosize=True, height=500,
-                      scene=dict(zaxis_title='Depth', xaxis_title='Lon', yaxis_title='Lat'))
-    tab6 = pn.Column(pn.pane.Plotly(fig))
-else:
-    tab6 = pn.pane.Markdown("🧭 No 'depth' variable found.")
+def build_bathymetry():
+    import plotly.graph_objects as go
+    if "depth" in ds.data_vars:
+        z = ds["depth"].values
+        fig = go.Figure(data=[go.Surface(z=z, colorscale="Viridis")])
+        fig.update_layout(title="3D Bathymetry (Depth)", autosize=True, height=500,
+                          scene=dict(zaxis_title='Depth', xaxis_title='Lon', yaxis_title='Lat'))
+        return pn.Column(pn.pane.Plotly(fig))
+    else:
+        return pn.pane.Markdown("🧭 No 'depth' variable found.")
+
 
 # ------------------------------------------------------------
-# 🧩 Combine Tabs in Material Template
+# 🧪 What-if Scenarios (turbidity, depth, SSI weights)
 # ------------------------------------------------------------
+def build_whatif():
+    import hvplot.xarray  # noqa: F401
+    inputs_nc = "outputs/greifswalder_inputs.nc"
+    has_inputs = has_store and "PAR_surface" in open_store(STORE_ZARR)
+    if has_inputs or os.path.exists(inputs_nc):
+        layers = ["KD490", "PAR_surface", "depth"]
+        inputs = (open_store(STORE_ZARR, layers) if has_inputs else xr.open_dataset(inputs_nc)[layers]).load()
+        in_lon = [c for c in inputs.dims if "lon" in c.lower()][0]
+        in_lat = [c for c in inputs.dims if "lat" in c.lower()][0]
+        baseline = evaluate_scenarios(inputs, scenario_table())
+        base_summary = scenario_summary(baseline).iloc[0]
+
+        kd_scale = pn.widgets.FloatSlider(name="KD490 scale (turbidity)", start=0.5, end=1.5, step=0.05, value=1.0)
+        depth_offset = pn.widgets.FloatSlider(name="Depth offset (m)", start=-2.0, end=2.0, step=0.1, value=0.0)
+        w_par = pn.widgets.FloatSlider(name="Weight PAR_bed", start=0, end=1, step=0.05, value=0.5)
+        w_zeu = pn.widgets.FloatSlider(name="Weight Zeu", start=0, end=1, step=0.05, value=0.3)
+        w_depth = pn.widgets.FloatSlider(name="Weight |depth|", start=0, end=1, step=0.05, value=0.2)
+
+        @pn.depends(kd_scale, depth_offset, w_par, w_zeu, w_depth)
+        def whatif_view(k, off, wp, wz, wd):
+            t0 = time.perf_counter()
+            res = evaluate_scenarios(inputs, scenario_table([[wp, wz, wd]], k, off))
+            summary = scenario_summary(res).iloc[0]
+            latency = (time.perf_counter() - t0) * 1e3
+
+            ssi = res["SSI"].isel(scenario=0)
+            delta = (ssi - baseline["SSI"].isel(scenario=0)).rename("ΔSSI")
+            maps = (
+                ssi.hvplot.image(x=in_lon, y=in_lat, cmap="YlGn", clim=(0, 1), width=450, height=380,
+                                 title="Scenario SSI") +
+                delta.hvplot.image(x=in_lon, y=in_lat, cmap="coolwarm", clim=(-0.5, 0.5), width=450, height=380,
+                                   title="Δ SSI vs Step 2")
+            )
+            metrics = pn.Row(
+                pn.indicators.Number(name="Mean SSI", value=summary["SSI_mean"],
+                                     format="{value:.3f}", default_color=ACCENT),
+                pn.indicators.Number(name="Suitable area Δ", value=100 * (summary["suitable_fraction"] - base_summary["suitable_fraction"]),
+                                     format="{value:+.1f} %", default_color="#fb8500"),
+                pn.indicators.Number(name="Latency", value=latency, format="{value:.0f} ms", default_color="#6c757d"),
+            )
+            return pn.Column(maps, metrics)
+
+        return pn.Row(
+            pn.Column("## 🧪 What-if Scenarios", kd_scale, depth_offset, w_par, w_zeu, w_depth, width=300),
+            whatif_view,
+        )
+    else:
+        return pn.pane.Markdown("🧪 Step 1 inputs not found — run `make preprocess` for what-if scenarios.")
+
+
+# ------------------------------------------------------------
+# 🧩 Combine Tabs in Material Template (built on first open)
+# ------------------------------------------------------------
+def lazy(builder):
+    """Run ``builder`` the first time its tab is rendered, then reuse the result."""
+    built = {}
+
+    def render():
+        if "tab" not in built:
+            built["tab"] = builder()
+        return built["tab"]
+
+    return pn.param.ParamFunction(render, lazy=True)
+
 tabs = pn.Tabs(
-    ("🗺️ Spatial", tab1),
-    ("📈 Cross-section", tab2),
-    ("🔬 Correlation", tab3),
-    ("🧠 Explainability", tab4),
-    ("🌱 Restoration", tab5),
-    ("🌊 3D Bathymetry", tab6)
+    ("🗺️ Spatial", lazy(build_spatial)),
+    ("📈 Cross-section", lazy(build_cross_section)),
+    ("🔬 Correlation", lazy(build_correlation)),
+    ("🧠 Explainability", lazy(build_explainability)),
+    ("🌱 Restoration", lazy(build_restoration)),
+    ("🌊 3D Bathymetry", lazy(build_bathymetry)),
+    ("🧪 What-if", lazy(build_whatif)),
+    dynamic=True,
 )
 
 dashboard = pn.template.MaterialTemplate(
@@ -0,0 +1,47 @@
+#!/usr/bin/env python
+# ==============================================================
+# LiBuTS Benchmark — dashboard import (startup) time
+#   python benchmarks/bench_dashboard_startup.py [repeats] [grid]
+# Runs app/dashboard.py in fresh interpreters against synthetic outputs
+# and compares it with a bare `import panel`.
+# ==============================================================
+
+import os, sys, json, statistics, subprocess, tempfile
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from synthetic import step1_grid
+
+repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+n = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+TARGET_S = 2.0
+
+TIMER = """
+import time, runpy, json
+t0 = time.perf_counter()
+{body}
+print(json.dumps(time.perf_counter() - t0))
+"""
+
+def timed(body, cwd):
+    out = subprocess.run([sys.executable, "-c", TIMER.format(body=body)], cwd=cwd,
+                         capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+with tempfile.TemporaryDirectory() as tmp:
+    os.makedirs(os.path.join(tmp, "outputs"))
+    ds = step1_grid(n).rename({"latitude": "lat", "longitude": "lon"})
+    ds["SSI"] = ds["KD490"] / float(ds["KD490"].max())
+    ds["SSI_ML"] = ds["SSI"]
+    ds.drop_vars("PAR_surface").to_netcdf(os.path.join(tmp, "outputs", "greifswalder_step3_ml.nc"))
+
+    app = os.path.join(ROOT, "app", "dashboard.py")
+    panel_s = [timed("import panel", tmp) for _ in range(repeats)]
+    dash_s = [timed(f"runpy.run_path({app!r}, run_name='dashboard')", tmp) for _ in range(repeats)]
+
+med_dash, med_panel = statistics.median(dash_s), statistics.median(panel_s)
+print(f"grid {n}×{n}, {repeats} runs")
+print(f"  import panel         : {med_panel:6.2f} s (median)")
+print(f"  import dashboard.py  : {med_dash:6.2f} s (median)")
+print(f"  dashboard overhead   : {med_dash - med_panel:6.2f} s")
+print("✅ within target" if med_dash < TARGET_S else f"⚠️ above {TARGET_S:.0f} s target")
@@ -0,0 +1,46 @@
+#!/usr/bin/env python
+# ==============================================================
+# LiBuTS Benchmark — Step 5 serial vs pooled vs island NSGA-II
+#   python benchmarks/bench_islands.py [grid n_gen n_islands]
+# Time for each mode to reach the hypervolume of the serial run.
+# ==============================================================
+
+import os, sys, time
+from pymoo.optimize import minimize
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from libuts.planner import (RestorationProblem, make_algorithm, front_hypervolume, attribute_matrix,
+                            FrontHistory, OBJECTIVES)
+from libuts.islands import PooledRestorationProblem, run_islands
+from libuts.patches import label_patches, patch_table, PATCH_FEATURES
+from synthetic import restoration_candidates
+
+args = [int(a) for a in sys.argv[1:]]
+n, n_gen, n_islands = (args + [300, 50, os.cpu_count() or 4][len(args):])[:3]
+df, shape = restoration_candidates(n)
+labels = label_patches(df["row"], df["col"], df[PATCH_FEATURES].values, shape)
+patches = patch_table(df, labels, OBJECTIVES)
+A, w = attribute_matrix(patches), patches["n_pixels"].values
+print(f"{len(patches)} patch candidates, {n_gen} generations, {os.cpu_count()} CPUs")
+
+
+def serial(problem):
+    cb = FrontHistory()
+    minimize(problem, make_algorithm(100, "binary"), ("n_gen", n_gen), seed=42, callback=cb)
+    return [(h["seconds"], front_hypervolume(h["F"], A)) for h in cb.history]
+
+
+def time_to(trace, target):
+    return next((t for t, hv in trace if hv >= target), float("nan"))
+
+
+runs = {"serial": serial(RestorationProblem(A, weights=w))}
+with PooledRestorationProblem(A, weights=w, n_workers=n_islands) as pooled:
+    runs["pooled"] = serial(pooled)
+res = run_islands(A, weights=w, n_islands=n_islands, n_gen=n_gen, migrate_every=5)
+runs[f"islands×{n_islands}"] = [(h["seconds"], front_hypervolume(h["F"], A)) for h in res.history]
+
+target = runs["serial"][-1][1]
+print(f"{'mode':>10} {'final HV':>9} {'total s':>8} {'s to serial HV':>15}")
+for name, trace in runs.items():
+    print(f"{name:>10} {trace[-1][1]:9.3f} {trace[-1][0]:8.2f} {time_to(trace, target):15.2f}")
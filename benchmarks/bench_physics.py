@@ -0,0 +1,23 @@
+#!/usr/bin/env python
+# ==============================================================
+# LiBuTS Benchmark — Step 2 physics throughput vs grid size
+#   python benchmarks/bench_physics.py [sizes …]
+# ==============================================================
+
+import os, sys, tempfile, time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from libuts.physics import run_physics
+from libuts.streaming import peak_rss_mb
+from synthetic import write_step1
+
+sizes = [int(s) for s in sys.argv[1:]] or [250, 500, 1000, 2000]
+
+print(f"{'grid':>11} {'seconds':>8} {'Mpix/s':>8} {'peak RSS MB':>12}")
+with tempfile.TemporaryDirectory() as tmp:
+    for n in sizes:
+        src = write_step1(os.path.join(tmp, f"inputs_{n}.nc"), n)
+        t0 = time.perf_counter()
+        run_physics(src, os.path.join(tmp, f"physics_{n}.nc"), tile=1024)
+        dt = time.perf_counter() - t0
+        print(f"{n:>5}×{n:<5} {dt:8.2f} {n * n / dt / 1e6:8.2f} {peak_rss_mb():12.0f}")
@@ -0,0 +1,61 @@
+#!/usr/bin/env python
+# ==============================================================
+# LiBuTS Benchmark — Step 5 NSGA-II problem formulations
+#   python benchmarks/bench_planner.py [n_candidates …]
+# Objective throughput and NSGA-II generations/s at pop_size=100.
+# ==============================================================
+
+import os, sys, time
+import numpy as np
+import pandas as pd
+from pymoo.algorithms.moo.nsga2 import NSGA2
+from pymoo.optimize import minimize
+from pymoo.operators.sampling.rnd import FloatRandomSampling
+from pymoo.operators.crossover.sbx import SBX
+from pymoo.operators.mutation.pm import PM
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from libuts.planner import RestorationProblem, ElementwiseRestorationProblem, make_algorithm
+
+POP, N_GEN = 100, 10
+sizes = [int(s) for s in sys.argv[1:]] or [2000, 10000, 50000]
+
+
+def candidates(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({"CO2_potential": rng.gamma(2, 1, n), "uncertainty": rng.uniform(0, 0.3, n),
+                         "ALAN_risk": rng.uniform(0, 1, n)})
+
+
+def baseline_algorithm():
+    """The original Step 5 set-up (pairwise duplicate check)."""
+    return NSGA2(pop_size=POP, sampling=FloatRandomSampling(), crossover=SBX(prob=0.9, eta=15),
+                 mutation=PM(eta=20), eliminate_duplicates=True)
+
+
+def gens_per_s(problem, algorithm):
+    t0 = time.perf_counter()
+    minimize(problem, algorithm, ("n_gen", N_GEN), seed=42)
+    return N_GEN / (time.perf_counter() - t0)
+
+
+def evals_per_s(problem, X, repeat=3):
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        problem.evaluate(X)
+    return repeat * len(X) / (time.perf_counter() - t0)
+
+
+print(f"{'n_var':>7} {'problem':>12} {'encoding':>9} {'evals/s':>10} {'gen/s':>7} {'speed-up':>9}")
+for n in sizes:
+    df = candidates(n)
+    X = np.random.default_rng(1).random((POP, n))
+    runs = [("elementwise", ElementwiseRestorationProblem(df), "baseline")]
+    runs += [(r, RestorationProblem(df, representation=r), e)
+             for e in ("real", "binary") for r in ("dense", "sparse", "bitset")]
+    base = None
+    for name, problem, encoding in runs:
+        algorithm = baseline_algorithm() if encoding == "baseline" else make_algorithm(POP, encoding)
+        g = gens_per_s(problem, algorithm)
+        base = base or g
+        print(f"{n:>7} {name:>12} {encoding:>9} {evals_per_s(problem, X):10.0f} {g:7.2f} {g / base:9.1f}")
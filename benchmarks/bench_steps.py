@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+# ==============================================================
+# LiBuTS Benchmark — script chain vs in-process steps
+#   python benchmarks/bench_steps.py [grid]
+# Runs Steps 2–5 on a synthetic Step 1 grid twice, each in a fresh
+# temporary output directory: as the notebooks/ scripts (one interpreter
+# per step, Zarr store hand-over, like `make all`) and as libuts.steps.run_all
+# (one interpreter, datasets passed in memory, nothing persisted).
+# Step 5 is left out when geopandas (needed by its export) is missing.
+# ==============================================================
+
+import os, sys, json, subprocess, tempfile, importlib.util
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from synthetic import step1_grid, write_step1
+from libuts.store import STEP_VARIABLES, write_variables
+
+n = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+with_step5 = importlib.util.find_spec("geopandas") is not None
+scripts = ["02_physics_suitability.py", "03_ml_rf_shap.py", "04_uncertainty_enrichment.py"] \
+    + (["05_restoration_planner.py"] if with_step5 else [])
+until = "optimize" if with_step5 else "uncertainty"
+
+TIMER = """
+import sys, time, json, runpy
+sys.path.insert(0, {root!r})
+from libuts.streaming import peak_rss_mb
+t0 = time.perf_counter()
+{body}
+print(json.dumps([time.perf_counter() - t0, peak_rss_mb()]))
+"""
+
+def timed(body, cwd):
+    env = dict(os.environ, MPLBACKEND="Agg")
+    t = __import__("time").perf_counter()
+    out = subprocess.run([sys.executable, "-c", TIMER.format(root=ROOT, body=body)], cwd=cwd, env=env,
+                         capture_output=True, text=True, check=True)
+    wall = __import__("time").perf_counter() - t
+    _, rss = json.loads(out.stdout.strip().splitlines()[-1])
+    return wall, rss
+
+def workdir(tmp, name):
+    d = os.path.join(tmp, name)
+    os.makedirs(os.path.join(d, "outputs"))
+    write_step1(os.path.join(d, "outputs", "greifswalder_inputs.nc"), n)
+    write_variables(step1_grid(n), os.path.join(d, "outputs", "greifswalder_store.zarr"),
+                    STEP_VARIABLES["inputs"], step="inputs", new=True)
+    return d
+
+with tempfile.TemporaryDirectory() as tmp:
+    chain = workdir(tmp, "scripts")
+    per_step = [timed(f"runpy.run_path({os.path.join(ROOT, 'notebooks', s)!r}, run_name='__main__')", chain)
+                for s in scripts]
+    chain_s, chain_rss = sum(s for s, _ in per_step), max(r for _, r in per_step)
+
+    inproc = workdir(tmp, "steps")
+    body = (f"from libuts.steps import run_all\n"
+            f"run_all('outputs/greifswalder_inputs.nc', save=False, until={until!r})")
+    run_s, run_rss = timed(body, inproc)
+
+print(f"grid {n}×{n}, Steps 2–{5 if with_step5 else 4}")
+for s, (sec, rss) in zip(scripts, per_step):
+    print(f"  {s:<30}: {sec:6.1f} s, peak RSS {rss:5.0f} MB")
+print(f"  script chain (make all)       : {chain_s:6.1f} s, peak RSS {chain_rss:5.0f} MB")
+print(f"  run_all (in memory)           : {run_s:6.1f} s, peak RSS {run_rss:5.0f} MB")
+print(f"  speed-up                      : {chain_s / run_s:6.2f}×")
@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+# ==============================================================
+# LiBuTS Benchmark — per-step NetCDFs vs the shared Zarr store
+#   python benchmarks/bench_store.py [grid] [days]
+# Writes the Step 1–4 grids of a synthetic run both ways: one NetCDF per
+# step, each re-saving the upstream variables (the legacy layout), and
+# libuts.store, where each step appends only its own variables (float32,
+# Zstandard, consolidated metadata). With days > 0 a daily KD490 cube and
+# the time-resolved Step 2 metrics are included. Reports disk usage,
+# write time and the dashboard's open + first-read time.
+# ==============================================================
+
+import os, sys, time, tempfile
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import xarray as xr
+from synthetic import step1_grid
+from libuts.physics import daily_physics, light_budget
+from libuts.store import STEP_VARIABLES, ML_DATASET, disk_usage, open_store, write_variables
+
+n = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+days = int(sys.argv[2]) if len(sys.argv) > 2 else 0
+
+# Synthetic outputs of Steps 1–4
+rng = np.random.default_rng(0)
+inputs = step1_grid(n).rename({"latitude": "lat", "longitude": "lon"})
+physics = light_budget(inputs)
+ml = xr.merge([inputs[["KD490", "ADG443", "APH443", "BBP443"]], physics[["SSI", "depth", "Zeu", "PAR_bed"]]])
+ml["SSI_ML"] = ml["SSI"] * (1 + 0.05 * rng.standard_normal((n, n)))
+enriched = ml.copy()
+for v, data in [("temp_bottom", 10 + 5 * rng.random((n, n))), ("nutrients", rng.gamma(2, 0.3, (n, n))),
+                ("shear_stress", np.abs(rng.normal(0.15, 0.05, (n, n)))), ("uncertainty", 0.1 * rng.random((n, n)))]:
+    enriched[v] = (("lat", "lon"), data)
+daily = light = None
+if days:
+    time_axis = np.datetime64("2024-07-01") + np.arange(days).astype("timedelta64[D]")
+    kd = inputs["KD490"].values * (1 + 0.2 * rng.random((days, 1, 1))).astype("float32")
+    daily = xr.Dataset({"KD490": (("time", "lat", "lon"), kd)},
+                       coords={"time": time_axis, "lat": inputs["lat"], "lon": inputs["lon"]})
+    light = daily_physics(inputs, daily).load()
+
+netcdf = [("inputs", inputs), ("kd_daily", daily), ("physics", physics), ("physics_daily", light),
+          ("ml", ml), ("enriched", enriched)]
+store = [("inputs", inputs), ("inputs_daily", daily.rename(KD490="KD490_daily") if days else None),
+         ("physics", physics), ("physics_daily", light), ("ml", ml), ("uncertainty", enriched)]
+
+with tempfile.TemporaryDirectory() as tmp:
+    t0 = time.perf_counter()
+    for name, ds in netcdf:
+        if ds is not None:
+            ds.to_netcdf(os.path.join(tmp, f"{name}.nc"))
+    nc_s = time.perf_counter() - t0
+    nc_mb = sum(disk_usage(os.path.join(tmp, f)) for f in os.listdir(tmp)) / 1e6
+
+    path = os.path.join(tmp, "store.zarr")
+    t0 = time.perf_counter()
+    for i, (name, ds) in enumerate(store):
+        if ds is not None:
+            write_variables(ds, path, STEP_VARIABLES[name], step=name, new=i == 0)
+    zarr_s = time.perf_counter() - t0
+    zarr_mb = disk_usage(path) / 1e6
+
+    # Dashboard start: open the Step 3 dataset and read one field
+    t0 = time.perf_counter()
+    with xr.open_dataset(os.path.join(tmp, "ml.nc")) as ds:
+        float(ds["SSI"].mean())
+    nc_open = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    ds = open_store(path, ML_DATASET)
+    float(ds["SSI"].mean())
+    zarr_open = time.perf_counter() - t0
+
+print(f"grid {n}×{n}" + (f", {days} days" if days else ""))
+print(f"  per-step NetCDFs : {nc_mb:8.1f} MB, write {nc_s:6.2f} s, open + read SSI {nc_open * 1e3:6.0f} ms")
+print(f"  Zarr store       : {zarr_mb:8.1f} MB, write {zarr_s:6.2f} s, open + read SSI {zarr_open * 1e3:6.0f} ms")
+print(f"  disk ratio       : {nc_mb / zarr_mb:8.1f}×")
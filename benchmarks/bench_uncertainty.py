@@ -0,0 +1,44 @@
+#!/usr/bin/env python
+# ==============================================================
+# LiBuTS Benchmark — Step 4 uncertainty estimators
+#   python benchmarks/bench_uncertainty.py [grid n_trees n_boot]
+# Wall time of each estimator and its agreement with the refit bootstrap.
+# ==============================================================
+
+import os, sys, time
+import numpy as np
+from scipy.stats import spearmanr
+from sklearn.ensemble import RandomForestClassifier
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from libuts.uncertainty import prediction_std
+from synthetic import step1_grid
+
+args = [int(a) for a in sys.argv[1:]]
+n, n_trees, n_boot = (args + [120, 100, 20][len(args):])[:3]
+
+df = step1_grid(n).to_dataframe().dropna()
+X = df[["KD490", "ADG443", "APH443", "BBP443", "depth"]].values
+noise = np.random.default_rng(0).normal(0, 0.3, len(df))
+y = ((df["KD490"].values + noise) > df["KD490"].median()).astype(int)
+params = dict(n_estimators=n_trees, max_depth=12, random_state=42)
+print(f"{len(y)} rows, {n_trees} trees, {n_boot} bootstrap refits")
+
+t0 = time.perf_counter()
+ref = prediction_std(RandomForestClassifier(**params), X, "bootstrap", y=y, n_boot=n_boot)
+t_boot = time.perf_counter() - t0
+
+t0 = time.perf_counter()
+rf = RandomForestClassifier(n_jobs=-1, **params).fit(X, y)
+t_fit = time.perf_counter() - t0
+
+print(f"{'method':>10} {'seconds':>8} {'speed-up':>9} {'mean std':>9} {'pearson':>8} {'spearman':>9}")
+print(f"{'bootstrap':>10} {t_boot:8.2f} {1:9.1f} {ref.mean():9.3f} {1:8.2f} {1:9.2f}")
+for method in ("trees", "oob", "ij"):
+    t0 = time.perf_counter()
+    est = prediction_std(rf, X, method)
+    dt = time.perf_counter() - t0 + t_fit
+    ok = np.isfinite(est)
+    r = np.corrcoef(est[ok], ref[ok])[0, 1]
+    rho = spearmanr(est[ok], ref[ok]).statistic
+    print(f"{method:>10} {dt:8.2f} {t_boot / dt:9.1f} {np.nanmean(est):9.3f} {r:8.2f} {rho:9.2f}")
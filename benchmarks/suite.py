@@ -0,0 +1,232 @@
+#!/usr/bin/env python
+# ==============================================================
+# LiBuTS Benchmark suite — Steps 2–5 and the dashboard across grid sizes
+#   python benchmarks/suite.py [--sizes 100 500] [--days D] [--profile quick|full]
+#                              [--baseline benchmarks/baseline.json] [--save-baseline]
+# For every size, synthetic.py writes a Step 1 store (optionally with a
+# daily KD490 cube); each stage then runs in a fresh interpreter against
+# that store, like `make all`, recording wall time and peak RSS (of the
+# stage's process or its largest worker). The dashboard stage times the
+# module start plus every tab builder. A stage whose input stage failed
+# is skipped. Results go to benchmarks/results/suite-<time>.json; against a
+# baseline of the same profile, stages that got slower or bigger than
+# --tolerance are listed and the exit code is 1.
+# ==============================================================
+
+import os, sys, json, time, argparse, platform, subprocess, tempfile
+import pandas as pd
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.abspath(os.path.join(HERE, ".."))
+RESULTS = os.path.join(HERE, "results")
+BASELINE = os.path.join(HERE, "baseline.json")
+
+SIZES = (100, 500, 1000, 2000, 4000)
+DEFAULT_SIZES = (100, 500)        # what baseline.json holds; the full profile at 1000² takes hours
+STORE = "outputs/greifswalder_store.zarr"
+
+# Stage → the stage whose outputs it reads
+STAGES = {"physics": None, "ml": "physics", "uncertainty": "ml", "optimize": "uncertainty", "dashboard": "ml"}
+
+# Keyword arguments of the libuts.steps functions; "full" is the pipeline as shipped
+PROFILES = {
+    "full": {},
+    "quick": {"ml": {"rf_params": {"n_estimators": 50}, "shap_samples": 500},
+              "uncertainty": {"rf_params": {"n_estimators": 50}, "n_splits": 3, "method": "trees"},
+              "optimize": {"n_gen": 10}},
+}
+
+BODIES = {
+    "physics": "from libuts.steps import physics_step\n"
+               "physics_step(STORE, daily=STORE if DAYS else None, **KW)",
+    "ml": "from libuts.ml import RF_PARAMS\n"
+          "from libuts.steps import ml_step\n"
+          "KW['rf_params'] = dict(RF_PARAMS, **KW.get('rf_params', {}))\n"
+          "ml_step(STORE, STORE, **KW)",
+    "uncertainty": "from libuts.steps import UNCERTAINTY_RF, uncertainty_step\n"
+                   "KW['rf_params'] = dict(UNCERTAINTY_RF, **KW.get('rf_params', {}))\n"
+                   "uncertainty_step(STORE, **KW)",
+    # The GeoPackage export needs geopandas; without it Step 5 runs but writes nothing
+    "optimize": "import importlib.util\n"
+                "from libuts.steps import optimize_step\n"
+                "optimize_step(STORE, save=importlib.util.find_spec('geopandas') is not None, **KW)",
+    "dashboard": "t = time.perf_counter()\n"
+                 "app = runpy.run_path(os.path.join(ROOT, 'app', 'dashboard.py'), run_name='dashboard')\n"
+                 "EXTRA['startup'] = time.perf_counter() - t\n"
+                 "for name in [k for k in app if k.startswith('build_')]:\n"
+                 "    t = time.perf_counter()\n"
+                 "    app[name]()\n"
+                 "    EXTRA[name[6:]] = time.perf_counter() - t",
+}
+
+TIMER = """
+import os, sys, time, json, runpy, resource
+ROOT = {root!r}
+sys.path.insert(0, ROOT)
+STORE, DAYS, KW, EXTRA = {store!r}, {days!r}, json.loads({kwargs!r}), {{}}
+t0 = time.perf_counter()
+{body}
+seconds = time.perf_counter() - t0
+rss = max(resource.getrusage(who).ru_maxrss for who in (resource.RUSAGE_SELF, resource.RUSAGE_CHILDREN)) / 1024
+print(json.dumps([seconds, rss, EXTRA]))
+"""
+
+
+def machine():
+    """Where the numbers come from: comparisons are only meaningful on the same machine."""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                                text=True).stdout.strip()
+    except OSError:
+        commit = ""
+    return {"host": platform.node(), "platform": platform.platform(), "python": platform.python_version(),
+            "cpus": os.cpu_count(), "memory_gb": round(os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES") / 1e9, 1),
+            "commit": commit}
+
+
+def run_stage(stage, workdir, kwargs=None, days=0, timeout=1800):
+    """Run one stage in a fresh interpreter in ``workdir``; returns its record."""
+    script = TIMER.format(root=ROOT, store=STORE, days=days, kwargs=json.dumps(kwargs or {}), body=BODIES[stage])
+    env = dict(os.environ, MPLBACKEND="Agg")
+    t0 = time.perf_counter()
+    try:
+        out = subprocess.run([sys.executable, "-c", script], cwd=workdir, env=env, capture_output=True,
+                             text=True, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        return {"status": "timeout", "seconds": round(time.perf_counter() - t0, 2), "error": f"over {timeout} s"}
+    if out.returncode != 0:
+        lines = out.stderr.strip().splitlines() or [f"exit code {out.returncode}"]
+        return {"status": "failed", "seconds": round(time.perf_counter() - t0, 2), "error": lines[-1]}
+    seconds, rss, extra = json.loads(out.stdout.strip().splitlines()[-1])
+    record = {"status": "ok", "seconds": round(seconds, 3), "peak_rss_mb": round(rss, 1)}
+    if extra:
+        record["parts"] = {k: round(v, 3) for k, v in extra.items()}
+    return record
+
+
+def run_size(n, days=0, profile="quick", stages=tuple(STAGES), timeout=1800, seed=0):
+    """Synthetic Step 1 store of ``n`` × ``n`` pixels, then each of ``stages`` on it."""
+    records = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        os.makedirs(os.path.join(workdir, "outputs"))
+        t0 = time.perf_counter()
+        subprocess.run([sys.executable, os.path.join(HERE, "synthetic.py"), STORE, str(n), "--days", str(days),
+                        "--seed", str(seed)], cwd=workdir, capture_output=True, check=True)
+        records["synthetic"] = {"status": "ok", "seconds": round(time.perf_counter() - t0, 3)}
+        for stage in stages:
+            needs = STAGES[stage]
+            if needs and records.get(needs, {}).get("status") != "ok":
+                records[stage] = {"status": "skipped", "error": f"needs {needs}"}
+            else:
+                records[stage] = run_stage(stage, workdir, PROFILES[profile].get(stage), days, timeout)
+            rec = records[stage]
+            print(f"  {n:>5}² {stage:<12}: {rec['status']:<7}"
+                  + (f" {rec['seconds']:8.1f} s" if "seconds" in rec else "")
+                  + (f", peak RSS {rec['peak_rss_mb']:6.0f} MB" if "peak_rss_mb" in rec else "")
+                  + (f" — {rec['error']}" if rec.get("error") else ""), flush=True)
+    return records
+
+
+def run_suite(sizes=DEFAULT_SIZES, days=0, profile="quick", stages=tuple(STAGES), timeout=1800):
+    """Every stage at every size; returns the results document (see ``save``)."""
+    stages = [s for s in STAGES if s in stages]
+    results = {"created": time.strftime("%Y-%m-%dT%H:%M:%S"), "machine": machine(), "profile": profile,
+               "days": days, "stages": stages, "sizes": {}}
+    for n in sizes:
+        results["sizes"][str(n)] = run_size(n, days, profile, stages, timeout)
+    return results
+
+
+def save(results, path=None):
+    path = path or os.path.join(RESULTS, f"suite-{results['created'].replace(':', '')}.json")
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(results, f, indent=1)
+    return path
+
+
+def summary_frame(results):
+    """One row per size and stage: status, seconds and peak RSS."""
+    rows = [{"size": int(n), "stage": stage, **{k: rec.get(k) for k in ("status", "seconds", "peak_rss_mb")}}
+            for n, stages in results["sizes"].items() for stage, rec in stages.items()]
+    return pd.DataFrame(rows, columns=["size", "stage", "status", "seconds", "peak_rss_mb"])
+
+
+def comparable(results, baseline):
+    """Why ``baseline`` cannot be compared with ``results`` (``None`` when it can)."""
+    for key in ("profile", "days"):
+        if results.get(key) != baseline.get(key):
+            return f"{key} differs ({baseline.get(key)!r} in the baseline, {results.get(key)!r} now)"
+    return None
+
+
+def compare(results, baseline, tolerance=0.25, min_seconds=0.5, min_rss_mb=50):
+    """
+    Regressions of ``results`` against ``baseline``, one row per metric.
+
+    A stage regresses when it no longer finishes, or when its seconds or
+    peak RSS exceed the baseline by more than ``tolerance`` (relative)
+    plus ``min_seconds`` / ``min_rss_mb`` (absolute, so sub-second stages
+    do not flag on noise). Only sizes and stages present in both count.
+    """
+    slack = {"seconds": min_seconds, "peak_rss_mb": min_rss_mb}
+    rows = []
+    for n, stages in results["sizes"].items():
+        for stage, rec in stages.items():
+            base = baseline["sizes"].get(n, {}).get(stage)
+            if not base or base["status"] != "ok":
+                continue
+            if rec["status"] != "ok":
+                rows.append({"size": int(n), "stage": stage, "metric": "status", "baseline": "ok",
+                             "current": rec["status"], "change": None})
+                continue
+            for metric, extra in slack.items():
+                if metric in base and metric in rec and rec[metric] > base[metric] * (1 + tolerance) + extra:
+                    rows.append({"size": int(n), "stage": stage, "metric": metric, "baseline": base[metric],
+                                 "current": rec[metric], "change": f"{rec[metric] / base[metric] - 1:+.0%}"})
+    return pd.DataFrame(rows, columns=["size", "stage", "metric", "baseline", "current", "change"])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time and memory-profile Steps 2–5 and the dashboard.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES),
+                        help=f"grid edges in pixels (e.g. {' '.join(map(str, SIZES))})")
+    parser.add_argument("--days", type=int, default=0, help="daily KD490 cube length (0: no time axis)")
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="quick")
+    parser.add_argument("--stages", nargs="+", choices=list(STAGES), default=list(STAGES))
+    parser.add_argument("--timeout", type=float, default=1800, help="seconds per stage")
+    parser.add_argument("--out", help="results JSON (default: benchmarks/results/suite-<time>.json)")
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative growth")
+    parser.add_argument("--save-baseline", action="store_true", help="store these results as the baseline")
+    args = parser.parse_args(argv)
+
+    print(f"🔹 Suite: sizes {args.sizes}, {args.days} days, profile {args.profile}")
+    results = run_suite(args.sizes, args.days, args.profile, args.stages, args.timeout)
+    print(f"🔹 Results → {save(results, args.out)}")
+    with pd.option_context("display.width", 160):
+        print(summary_frame(results).to_string(index=False))
+
+    if args.save_baseline:
+        print(f"🔹 Baseline → {save(results, args.baseline)}")
+        return 0
+    if not os.path.exists(args.baseline):
+        print(f"⚠️ No baseline at {args.baseline}; rerun with --save-baseline to store one.")
+        return 0
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    reason = comparable(results, baseline)
+    if reason:
+        print(f"⚠️ Baseline not compared: {reason}.")
+        return 0
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions.empty:
+        print(f"✅ No regressions against {args.baseline} (tolerance {args.tolerance:.0%})")
+        return 0
+    print(f"❌ {len(regressions)} regression(s) against {args.baseline} (tolerance {args.tolerance:.0%}):")
+    print(regressions.to_string(index=False))
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
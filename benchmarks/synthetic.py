@@ -0,0 +1,134 @@
+"""
+Synthetic Step 1 grids for benchmarks.
+
+Fields are smooth random surfaces with a land mask, shaped and named like
+``outputs/greifswalder_inputs.nc`` so every step can run without
+Copernicus credentials. An optional daily KD490 cube (with cloud gaps)
+stands in for the time-resolved inputs.
+
+    python benchmarks/synthetic.py outputs/greifswalder_store.zarr 1000 --days 30
+"""
+
+import argparse
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import xarray as xr
+
+AOI = dict(lon_min=13.3, lon_max=13.7, lat_min=54.0, lat_max=54.4)
+
+
+def _smooth(rng, n, scale=8):
+    """Cheap smooth field: bilinear upsampling of coarse noise."""
+    coarse = rng.random((scale + 1, scale + 1))
+    x = np.linspace(0, scale, n)
+    i = np.minimum(x.astype(int), scale - 1)
+    f = x - i
+    rows = coarse[i] * (1 - f)[:, None] + coarse[i + 1] * f[:, None]
+    return rows[:, i] * (1 - f) + rows[:, i + 1] * f
+
+
+def step1_grid(n, seed=0):
+    """Step 1-shaped dataset on an ``n`` × ``n`` grid."""
+    rng = np.random.default_rng(seed)
+    lat = np.linspace(AOI["lat_min"], AOI["lat_max"], n)
+    lon = np.linspace(AOI["lon_min"], AOI["lon_max"], n)
+    dims = ("latitude", "longitude")
+
+    kd = (0.2 + 1.3 * _smooth(rng, n)).astype("float32")
+    depth = (-1 - 14 * _smooth(rng, n)).astype("float32")
+    depth[_smooth(rng, n) > 0.8] = np.nan                      # land
+    ds = xr.Dataset(
+        {
+            "KD490": (dims, kd),
+            "ADG443": (dims, (0.1 + 0.5 * kd + 0.05 * rng.random((n, n))).astype("float32")),
+            "APH443": (dims, (0.02 + 0.1 * _smooth(rng, n)).astype("float32")),
+            "BBP443": (dims, (0.005 + 0.02 * kd * _smooth(rng, n)).astype("float32")),
+            "PAR_surface": (dims, 20 + 5 * _smooth(rng, n)),
+            "depth": (dims, depth),
+        },
+        coords={"latitude": lat, "longitude": lon},
+    )
+    ds.attrs.update({"AOI": "synthetic", "source": "benchmarks/synthetic.py"})
+    return ds
+
+
+def daily_kd490(ds, days, seed=0, start="2024-07-01", clouds=0.2, chunks=(32, 256, 256)):
+    """
+    Lazy daily KD490 cube around the mean field of ``ds`` (dask, ``chunks``).
+
+    Each day scales the mean by a random factor and blanks ``clouds`` of
+    the pixels; land (NaN ``depth``) is always blank. Blocks are generated
+    as they are written, so a large cube is never held in memory.
+    """
+    import dask.array as da
+
+    rng = np.random.default_rng(seed)
+    kd = ds["KD490"].where(np.isfinite(ds["depth"])).values.astype("float32")
+    factors = (1 + 0.4 * (rng.random(days) - 0.5)).astype("float32")
+    cube = da.from_array(factors, chunks=chunks[:1])[:, None, None] * da.from_array(kd, chunks=chunks[1:])[None]
+    cloudy = da.random.default_rng(seed + 1).random(cube.shape, chunks=cube.chunks) < clouds
+    time = np.datetime64(start) + np.arange(days).astype("timedelta64[D]")
+    dims = ("time",) + ds["KD490"].dims
+    return xr.Dataset({"KD490": (dims, da.where(cloudy, np.float32(np.nan), cube))},
+                      coords={"time": time, **{d: ds[d] for d in dims[1:]}})
+
+
+def write_step1(path, n, seed=0, days=0):
+    """
+    Write a Step 1 grid to ``path``: a NetCDF, or a Zarr store (``.zarr``).
+
+    ``days`` adds the daily KD490 cube as the store's ``KD490_daily``
+    (stores only).
+    """
+    ds = step1_grid(n, seed)
+    if not str(path).endswith(".zarr"):
+        if days:
+            raise ValueError("A daily cube needs a Zarr store path (.zarr).")
+        ds.to_netcdf(path)
+        return path
+    from libuts.store import STEP_VARIABLES, write_variables
+    write_variables(ds, path, STEP_VARIABLES["inputs"], step="inputs", new=True)
+    if days:
+        daily = daily_kd490(ds, days, seed).rename(KD490="KD490_daily")
+        write_variables(daily, path, STEP_VARIABLES["inputs_daily"], step="inputs")
+    return path
+
+
+def restoration_candidates(n, seed=0):
+    """
+    Step 5-shaped candidate table on an ``n`` × ``n`` grid.
+
+    Returns ``(df, shape)``; ``df`` has grid ``row`` / ``col``, ``lat`` /
+    ``lon`` and the depth, SSI, uncertainty and objective columns, already
+    restricted to the -12 … -2 m depth band.
+    """
+    ds = step1_grid(n, seed)
+    rng = np.random.default_rng(seed + 1)
+    depth = ds["depth"].values
+    par_bed = ds["PAR_surface"].values * np.exp(-ds["KD490"].values * np.abs(depth))
+    ssi = np.clip(par_bed / np.nanmax(par_bed) + 0.05 * rng.normal(size=depth.shape), 0, 1)
+    row, col = np.nonzero(np.isfinite(depth) & (depth >= -12) & (depth <= -2))
+    df = pd.DataFrame({
+        "row": row, "col": col,
+        "lat": ds["latitude"].values[row], "lon": ds["longitude"].values[col],
+        "depth": depth[row, col], "SSI": ssi[row, col],
+        "uncertainty": 0.3 * _smooth(rng, n)[row, col],
+    })
+    df["SSI_ML"] = np.clip(df["SSI"] + 0.05 * rng.normal(size=len(df)), 0, 1)
+    df["CO2_potential"] = df["SSI"] * np.abs(df["depth"]) * 1.2
+    df["ALAN_risk"] = 1 - df["SSI_ML"]
+    return df, depth.shape
+
+
+if __name__ == "__main__":
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+    parser = argparse.ArgumentParser(description="Write a synthetic Step 1 grid (NetCDF or Zarr store).")
+    parser.add_argument("path")
+    parser.add_argument("n", type=int, help="grid edge (pixels)")
+    parser.add_argument("--days", type=int, default=0, help="daily KD490 cube length (stores only)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    print(write_step1(args.path, args.n, args.seed, args.days))
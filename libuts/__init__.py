@@ -0,0 +1,8 @@
+"""
+LiBuTS — Light-Budget Twin for Seagrass Restoration.
+
+Reusable building blocks for the pipeline steps in ``notebooks/`` and the
+dashboard in ``app/``.
+"""
+
+__version__ = "0.1.0"
@@ -0,0 +1,346 @@
+"""
+Batch runner: the Step 1–5 chain for every AOI of a catalogue.
+
+The catalogue (``config/aois.yaml``) lists AOIs by name and bounding box;
+keys set on an AOI override the catalogue ``defaults``. Each AOI runs
+:func:`libuts.steps.run_all` in its own process, at most ``n_workers`` at
+a time, into ``<out_root>/<name>/`` with ``<name>`` as the file prefix
+and its console output in ``batch.log`` there. An AOI that fails (or
+whose process dies) is recorded as ``failed`` without stopping the
+others. Every AOI leaves ``batch_status.json``, updated as each step
+completes. A rerun skips AOIs that finished with the same configuration
+and whose outputs are still there; within an AOI it resumes after the
+last step whose configuration (and upstream) is unchanged and whose
+variables are still in the AOI store, so a failure in Step 5 does not
+repeat Steps 1–4. ``offline`` makes Step 1 read only from the Copernicus
+subset and POWER caches, which all AOIs share.
+
+Command line (from the repository root)::
+
+    python -m libuts.batch                          # config/aois.yaml
+    python -m libuts.batch -j 4 --offline
+    python -m libuts.batch --only greifswalder --force
+"""
+
+import argparse
+import contextlib
+import hashlib
+import json
+import multiprocessing as mp
+import os
+import re
+import sys
+import time
+import traceback
+from multiprocessing.connection import wait
+
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CATALOGUE = "config/aois.yaml"
+OUT_ROOT = "outputs/aois"
+STATUS = "batch_status.json"
+SUMMARY = "batch_summary.csv"
+
+NAME = re.compile(r"[a-z0-9_]+")
+BBOX = ("lon_min", "lon_max", "lat_min", "lat_max")
+STEP_KWARGS = ("retrieve", "physics", "ml", "uncertainty", "optimize")
+
+# One AOI per process: the steps run in-process, the parallelism comes from the AOIs
+IN_PROCESS = {"ml": {"n_workers": 0}, "uncertainty": {"cv_workers": 0, "boot_workers": 0}, "optimize": {"execution": "serial"}}
+
+
+def _merge(base, override):
+    """``base`` updated with ``override``; nested dicts are merged key by key."""
+    out = dict(base)
+    for k, v in override.items():
+        out[k] = _merge(out[k], v) if isinstance(v, dict) and isinstance(out.get(k), dict) else v
+    return out
+
+
+def _resolve(path, root=ROOT):
+    return path if os.path.isabs(path) else os.path.join(root, path)
+
+
+def load_catalogue(path=CATALOGUE, root=ROOT):
+    """AOIs of the catalogue at ``path``, each merged with the catalogue defaults."""
+    import yaml
+
+    with open(_resolve(path, root)) as f:
+        catalogue = yaml.safe_load(f) or {}
+    defaults = catalogue.get("defaults") or {}
+    aois = []
+    for entry in catalogue.get("aois") or []:
+        aoi = _merge(defaults, entry)
+        name, bbox = str(aoi.get("name", "")), aoi.get("bbox") or {}
+        if not NAME.fullmatch(name):
+            raise ValueError(f"AOI name {name!r} must be lower-case letters, digits or '_'.")
+        if name in {a["name"] for a in aois}:
+            raise ValueError(f"Duplicate AOI {name!r} in {path}.")
+        if not all(k in bbox for k in BBOX) or bbox["lon_min"] >= bbox["lon_max"] \
+                or bbox["lat_min"] >= bbox["lat_max"]:
+            raise ValueError(f"AOI {name!r} needs a bbox with {', '.join(BBOX)} (min < max).")
+        unknown = set(aoi.get("steps") or {}) - set(STEP_KWARGS)
+        if unknown:
+            raise ValueError(f"AOI {name!r}: unknown steps {sorted(unknown)}; choose from {STEP_KWARGS}.")
+        aois.append(aoi)
+    return aois
+
+
+def config_hash(aoi):
+    """Digest of an AOI's merged configuration (what a finished run is reused for)."""
+    return hashlib.sha256(json.dumps(aoi, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+
+def step_hashes(aoi):
+    """
+    Per step, a digest of what its outputs depend on: the AOI (bbox,
+    period, inputs …) and the keyword arguments of the step and those
+    before it.
+    """
+    from libuts.steps import STEP_NAMES
+
+    config = {k: v for k, v in aoi.items() if k not in ("name", "title", "until", "save", "steps")}
+    hashes = {}
+    for name, kwargs in zip(STEP_NAMES, STEP_KWARGS):
+        config[kwargs] = (aoi.get("steps") or {}).get(kwargs)
+        hashes[name] = config_hash(config)
+    return hashes
+
+
+def _saved_steps(aoi):
+    """The steps of the AOI's chain that run (no ``inputs`` given) and persist their outputs."""
+    from libuts.steps import STEP_NAMES
+
+    save = aoi.get("save", True)
+    persist = set(STEP_NAMES if save is True else () if save is False else save)
+    names = STEP_NAMES[:STEP_NAMES.index(aoi.get("until", "optimize")) + 1]
+    return [s for s in names if s in persist and not (s == "inputs" and aoi.get("inputs"))]
+
+
+def _outputs(aoi, out_dir):
+    """``{step: whether its saved outputs are in out_dir}`` for the saved steps of the AOI."""
+    from libuts.steps import step_paths
+    from libuts.store import STEP_VARIABLES, store_variables
+
+    paths = step_paths(out_dir, aoi["name"])
+    held = store_variables(paths.store) if os.path.exists(paths.store) else {}
+    found = {}
+    for step in _saved_steps(aoi):
+        if step == "optimize":
+            found[step] = os.path.exists(paths.summary)
+        else:
+            found[step] = all(held.get(v) == step for v in STEP_VARIABLES[step]) \
+                and (step != "ml" or os.path.exists(paths.valid_pixels))
+    return found
+
+
+def reusable_steps(aoi, out_dir):
+    """
+    Steps a rerun of the AOI can skip: the leading steps that completed
+    with the same configuration (:func:`step_hashes`) and whose outputs
+    are still in ``out_dir``. The last step always runs.
+    """
+    from libuts.steps import STEP_NAMES
+
+    done = (read_status(out_dir) or {}).get("steps") or {}
+    hashes, found = step_hashes(aoi), _outputs(aoi, out_dir)
+    reuse = []
+    for step in STEP_NAMES[:STEP_NAMES.index(aoi.get("until", "optimize"))]:
+        if step == "inputs" and aoi.get("inputs"):
+            continue
+        if done.get(step) != hashes[step] or not found.get(step):
+            break
+        reuse.append(step)
+    return reuse
+
+
+def read_status(out_dir):
+    fn = os.path.join(out_dir, STATUS)
+    if not os.path.exists(fn):
+        return None
+    with open(fn) as f:
+        return json.load(f)
+
+
+def _write_status(out_dir, record):
+    fn = os.path.join(out_dir, STATUS)
+    with open(fn + ".tmp", "w") as f:
+        json.dump(record, f, indent=1)
+    os.replace(fn + ".tmp", fn)
+
+
+# ---------------------------------------------------------------------
+# One AOI
+# ---------------------------------------------------------------------
+def run_aoi(aoi, out_root=OUT_ROOT, offline=False, root=ROOT, force=False):
+    """
+    Run the chain for one AOI into ``<out_root>/<name>/``; never raises.
+
+    An ``inputs`` path (Step 1 NetCDF or store, with an optional ``daily``
+    cube) skips the retrieval. Returns the AOI's summary record, also
+    written to its ``batch_status.json``. Steps that completed in an
+    earlier run with the same configuration are reused (``reused``), unless
+    ``force``.
+    """
+    from libuts.steps import END, GEBCO, START, run_all
+
+    name = aoi["name"]
+    out_dir = _resolve(os.path.join(out_root, name), root)
+    os.makedirs(out_dir, exist_ok=True)
+    steps = _merge(IN_PROCESS, aoi.get("steps") or {})
+    steps["retrieve"] = dict(
+        steps.get("retrieve") or {}, aoi=aoi["bbox"], start=aoi.get("start", START), end=aoi.get("end", END),
+        title=aoi.get("title", name), gebco_path=_resolve(aoi.get("gebco", GEBCO), root),
+        cache_dir=_resolve(aoi.get("cache_dir", "data/cache/cmems"), root),
+        power_cache_dir=_resolve(aoi.get("power_cache_dir", "data/cache/power"), root), offline=offline,
+    )
+    hashes = step_hashes(aoi)
+    reused = [] if force else reusable_steps(aoi, out_dir)
+    record = {"aoi": name, "status": "failed", "config": config_hash(aoi), "seconds": 0.0, "reused": reused,
+              "steps": {s: hashes[s] for s in reused}}
+
+    def completed(step):
+        record["steps"][step] = hashes[step]
+        _write_status(out_dir, record)
+
+    t0 = time.perf_counter()
+    with open(os.path.join(out_dir, "batch.log"), "w") as log, \
+            contextlib.redirect_stdout(log), contextlib.redirect_stderr(log):
+        try:
+            inputs = _resolve(aoi["inputs"], root) if aoi.get("inputs") else None
+            daily = _resolve(aoi["daily"], root) if aoi.get("daily") else None
+            res = run_all(inputs, out_dir=out_dir, prefix=name, until=aoi.get("until", "optimize"),
+                          daily=daily, save=aoi.get("save", True), skip=reused, on_step=completed,
+                          **{k: steps.get(k) for k in STEP_KWARGS})
+            record.update(status="done", timings=res.timings, peak_rss_mb=round(res.peak_rss_mb, 1))
+            if hasattr(res, "selected"):
+                record.update(n_candidates=len(res.candidates), n_sites=len(res.selected))
+        except Exception as e:
+            traceback.print_exc()
+            record["error"] = f"{type(e).__name__}: {e}"
+    record["seconds"] = round(time.perf_counter() - t0, 2)
+    _write_status(out_dir, record)
+    return record
+
+
+def _aoi_process(conn, aoi, out_root, offline, root, force):
+    conn.send(run_aoi(aoi, out_root, offline, root, force))
+    conn.close()
+
+
+# ---------------------------------------------------------------------
+# Batch
+# ---------------------------------------------------------------------
+def summary_frame(records):
+    """One row per AOI: status, seconds per step, peak RSS, candidates, sites and error."""
+    rows = []
+    for r in records:
+        row = {k: r.get(k) for k in ("aoi", "status", "seconds")}
+        row.update({f"{k}_s": v for k, v in (r.get("timings") or {}).items()})
+        row.update({k: r.get(k) for k in ("peak_rss_mb", "n_candidates", "n_sites", "error")})
+        rows.append(row)
+    df = pd.DataFrame(rows)
+    step_cols = [f"{s}_s" for s in ("inputs", "physics", "ml", "uncertainty", "optimize") if f"{s}_s" in df]
+    cols = ["aoi", "status", "seconds"] + step_cols + ["peak_rss_mb", "n_candidates", "n_sites", "error"]
+    return df.reindex(columns=cols)
+
+
+def run_batch(aois, out_root=OUT_ROOT, n_workers=None, offline=False, force=False, root=ROOT):
+    """
+    Run every AOI of ``aois`` (see :func:`load_catalogue`), ``n_workers`` at a time.
+
+    ``n_workers=0`` runs the AOIs one after another in this process;
+    ``None`` uses one process per CPU. AOIs that already finished with the
+    same configuration, and whose outputs are all still there, are reported
+    as ``cached``; the others resume after their last reusable step (see
+    :func:`run_aoi`). ``force`` reruns everything.
+    Returns the summary table, also written to ``<out_root>/batch_summary.csv``.
+    """
+    records, todo = {}, []
+    for aoi in aois:
+        out_dir = _resolve(os.path.join(out_root, aoi["name"]), root)
+        done = read_status(out_dir)
+        if not force and done and done["status"] == "done" and done["config"] == config_hash(aoi) \
+                and all(_outputs(aoi, out_dir).values()):
+            records[aoi["name"]] = dict(done, status="cached")
+        else:
+            todo.append(aoi)
+    print(f"🔹 Batch: {len(todo)} AOI(s) to run, {len(records)} cached")
+
+    def report(rec):
+        records[rec["aoi"]] = rec
+        mark = "✅" if rec["status"] == "done" else "❌"
+        print(f"{mark} {rec['aoi']}: {rec['status']} in {rec['seconds']:.1f} s"
+              + (f" — {rec['error']}" if rec.get("error") else ""))
+
+    if n_workers == 0:
+        for aoi in todo:
+            report(run_aoi(aoi, out_root, offline, root, force))
+    else:
+        n_workers = n_workers or os.cpu_count() or 1
+        # A fresh interpreter per AOI: no dask / zarr thread pools inherited from this process,
+        # and its memory goes back to the OS when the AOI ends
+        ctx = mp.get_context("spawn")
+        running = {}
+        try:
+            while todo or running:
+                while todo and len(running) < n_workers:
+                    aoi = todo.pop(0)
+                    recv, send = ctx.Pipe(duplex=False)
+                    p = ctx.Process(target=_aoi_process, args=(send, aoi, out_root, offline, root, force))
+                    p.start()
+                    send.close()
+                    running[p.sentinel] = (p, recv, aoi, time.perf_counter())
+                for sentinel in wait(list(running)):
+                    p, recv, aoi, t0 = running.pop(sentinel)
+                    try:
+                        rec = recv.recv()
+                    except EOFError:          # the process died before reporting (e.g. out of memory)
+                        rec = {"aoi": aoi["name"], "status": "failed", "config": config_hash(aoi),
+                               "seconds": round(time.perf_counter() - t0, 2),
+                               "error": f"worker exited with code {p.exitcode}"}
+                        out_dir = _resolve(os.path.join(out_root, aoi["name"]), root)
+                        os.makedirs(out_dir, exist_ok=True)
+                        # Keep the steps it completed (written as it went) for the next run
+                        rec["steps"] = (read_status(out_dir) or {}).get("steps") or {}
+                        _write_status(out_dir, rec)
+                    recv.close()
+                    p.join()
+                    report(rec)
+        finally:
+            for p, *_ in running.values():
+                p.terminate()
+                p.join()
+
+    table = summary_frame([records[a["name"]] for a in aois])
+    out = _resolve(out_root, root)
+    os.makedirs(out, exist_ok=True)
+    table.to_csv(os.path.join(out, SUMMARY), index=False)
+    return table
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m libuts.batch", description=__doc__.split("\n\n")[0])
+    parser.add_argument("catalogue", nargs="?", default=CATALOGUE, help="AOI catalogue (YAML)")
+    parser.add_argument("--only", nargs="+", metavar="AOI", help="run only these AOIs")
+    parser.add_argument("--out-root", default=OUT_ROOT)
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="AOIs run concurrently (0: in this process)")
+    parser.add_argument("--offline", action="store_true", help="use cached Step 1 inputs only")
+    parser.add_argument("--force", action="store_true", help="rerun AOIs that already finished")
+    args = parser.parse_args(argv)
+    aois = load_catalogue(args.catalogue)
+    if args.only:
+        missing = set(args.only) - {a["name"] for a in aois}
+        if missing:
+            parser.error(f"unknown AOI(s): {', '.join(sorted(missing))}")
+        aois = [a for a in aois if a["name"] in args.only]
+    table = run_batch(aois, args.out_root, n_workers=args.jobs, offline=args.offline, force=args.force)
+    with pd.option_context("display.width", 160, "display.max_columns", None):
+        print(table.drop(columns="error").to_string(index=False))
+    print(f"🔹 Summary → {os.path.join(args.out_root, SUMMARY)}")
+    return int((table["status"] == "failed").any())
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,66 @@
+"""
+Windowed GEBCO reader.
+
+Only the 1-D coordinate vectors of the global grid are read to locate the
+row/column window around the target grid; that slab alone is loaded and
+resampled with a precomputed nearest-neighbour index. Cost depends on the
+AOI, not on the size of the source file.
+"""
+
+import numpy as np
+import xarray as xr
+
+
+def nearest_index(src, dst):
+    """Index into ``src`` (monotonic, either direction) nearest to each ``dst``."""
+    src = np.asarray(src, dtype=float)
+    dst = np.asarray(dst, dtype=float)
+    descending = src.size > 1 and src[0] > src[-1]
+    asc = src[::-1] if descending else src
+    i = np.clip(np.searchsorted(asc, dst), 1, max(asc.size - 1, 1))
+    if asc.size > 1:
+        i = i - ((dst - asc[i - 1]) <= (asc[i] - dst))
+    else:
+        i = np.zeros_like(i)
+    return (asc.size - 1 - i) if descending else i
+
+
+def coord_window(coord, lo, hi, pad=1):
+    """Slice of ``coord`` covering ``[lo, hi]`` plus ``pad`` cells on each side."""
+    c = np.asarray(coord)
+    idx = np.flatnonzero((c >= lo) & (c <= hi))
+    if idx.size == 0:
+        idx = nearest_index(c, [lo, hi])
+    start = max(int(idx.min()) - pad, 0)
+    stop = min(int(idx.max()) + pad + 1, c.size)
+    return slice(start, stop)
+
+
+def read_gebco_window(path, lat_range, lon_range, var="elevation", pad=1):
+    """Load the GEBCO slab covering ``lat_range`` × ``lon_range`` (degrees)."""
+    with xr.open_dataset(path) as src:
+        lat_name = [d for d in src[var].dims if "lat" in d.lower()][0]
+        lon_name = [d for d in src[var].dims if "lon" in d.lower()][0]
+        rows = coord_window(src[lat_name].values, *lat_range, pad=pad)
+        cols = coord_window(src[lon_name].values, *lon_range, pad=pad)
+        slab = src[var].isel({lat_name: rows, lon_name: cols}).load()
+    return slab.rename({lat_name: "lat", lon_name: "lon"})
+
+
+def gebco_on_grid(path, lat, lon, var="elevation"):
+    """
+    GEBCO elevation resampled (nearest) onto the target ``lat``/``lon`` vectors.
+
+    The result carries the target coordinate names, so it merges directly
+    with the OLCI layers.
+    """
+    lat_v, lon_v = np.asarray(lat), np.asarray(lon)
+    slab = read_gebco_window(path, (lat_v.min(), lat_v.max()), (lon_v.min(), lon_v.max()), var=var)
+    iy = nearest_index(slab["lat"].values, lat_v)
+    ix = nearest_index(slab["lon"].values, lon_v)
+    return xr.DataArray(
+        slab.values[np.ix_(iy, ix)],
+        dims=(lat.dims[0], lon.dims[0]),
+        coords={lat.dims[0]: lat_v, lon.dims[0]: lon_v},
+        attrs=slab.attrs,
+    )
@@ -0,0 +1,153 @@
+"""
+Persistent, incremental on-disk cache for Copernicus Marine subsets.
+
+Each (dataset_id, variables, AOI) request gets its own cache directory with
+one NetCDF file per day and a ``manifest.json`` listing the days already
+fetched. Opening a date range only fetches the days missing from the
+manifest, so widening the period appends new days and an unchanged rerun
+reads from disk without touching the network. A day that returned no data
+counts as fetched (a fully clouded L3 day) only once it is older than the
+product latency; until then it is ``pending`` and asked for again, so
+near-real-time days published late are not lost.
+"""
+
+import hashlib
+import json
+import os
+
+import numpy as np
+import xarray as xr
+
+DEFAULT_CACHE_DIR = "data/cache/cmems"
+LATENCY_DAYS = 5        # after this, a day without data will not get any (NRT products: ~1–2 days)
+
+
+def copernicus_reader(username=None, password=None):
+    """Return a reader that opens subsets with ``copernicusmarine.open_dataset``."""
+
+    def read(dataset_id, variables, aoi, start, end):
+        from copernicusmarine import open_dataset
+        return open_dataset(
+            dataset_id=dataset_id,
+            variables=list(variables),
+            minimum_longitude=aoi["lon_min"], maximum_longitude=aoi["lon_max"],
+            minimum_latitude=aoi["lat_min"], maximum_latitude=aoi["lat_max"],
+            start_datetime=start, end_datetime=end,
+            username=username, password=password,
+        )
+
+    return read
+
+
+def _days(start, end):
+    return np.arange(np.datetime64(start, "D"), np.datetime64(end, "D") + 1)
+
+
+def _contiguous(days):
+    """Split sorted ``datetime64[D]`` days into ``(first, last)`` runs."""
+    runs = []
+    for d in days:
+        if runs and d - runs[-1][1] == np.timedelta64(1, "D"):
+            runs[-1][1] = d
+        else:
+            runs.append([d, d])
+    return [(str(a), str(b)) for a, b in runs]
+
+
+class SubsetCache:
+    """
+    Day-granular cache in front of a subset ``reader``.
+
+    ``reader(dataset_id, variables, aoi, start, end)`` must return an
+    ``xarray.Dataset`` with a ``time`` dimension; use
+    :func:`copernicus_reader` for the real service or any local stand-in
+    for offline runs and tests. With ``offline=True`` missing days raise
+    instead of being fetched (pending days are read as they are). Empty
+    days within ``latency_days`` of ``today`` (default: the current date)
+    stay pending.
+    """
+
+    def __init__(self, root=DEFAULT_CACHE_DIR, reader=None, offline=False, latency_days=LATENCY_DAYS,
+                 today=None):
+        self.root = root
+        self.reader = reader or copernicus_reader()
+        self.offline = offline
+        self.latency_days = latency_days
+        self.today = today
+
+    def key(self, dataset_id, variables, aoi):
+        spec = {
+            "dataset_id": dataset_id,
+            "variables": sorted(variables),
+            "aoi": {k: round(float(aoi[k]), 6) for k in ("lon_min", "lon_max", "lat_min", "lat_max")},
+        }
+        digest = hashlib.sha1(json.dumps(spec, sort_keys=True).encode()).hexdigest()[:12]
+        return f"{dataset_id}-{digest}", spec
+
+    def _manifest(self, path, spec):
+        fn = os.path.join(path, "manifest.json")
+        if os.path.exists(fn):
+            with open(fn) as f:
+                return json.load(f)
+        return dict(spec, days=[], pending=[])
+
+    def _have(self, manifest):
+        """Days not to fetch: done, plus (offline) the pending ones, which cannot be checked."""
+        return set(manifest["days"]) | (set(manifest.get("pending", [])) if self.offline else set())
+
+    def _write_manifest(self, path, manifest):
+        tmp = os.path.join(path, "manifest.json.tmp")
+        with open(tmp, "w") as f:
+            json.dump(manifest, f, indent=1)
+        os.replace(tmp, os.path.join(path, "manifest.json"))
+
+    def missing(self, dataset_id, variables, aoi, start, end):
+        """Days in ``[start, end]`` that are not cached yet."""
+        name, spec = self.key(dataset_id, variables, aoi)
+        have = self._have(self._manifest(os.path.join(self.root, name), spec))
+        return [d for d in _days(start, end) if str(d) not in have]
+
+    def fetch(self, dataset_id, variables, aoi, start, end):
+        """Fetch and store the missing days in ``[start, end]``; return how many."""
+        name, spec = self.key(dataset_id, variables, aoi)
+        path = os.path.join(self.root, name)
+        os.makedirs(path, exist_ok=True)
+        manifest = self._manifest(path, spec)
+        have = self._have(manifest)
+        todo = [d for d in _days(start, end) if str(d) not in have]
+        if todo and self.offline:
+            raise RuntimeError(
+                f"{len(todo)} day(s) of {dataset_id} not cached "
+                f"({todo[0]} … {todo[-1]}) and the cache is offline."
+            )
+
+        settled = np.datetime64(self.today or "today", "D") - np.timedelta64(self.latency_days, "D")
+        for first, last in _contiguous(todo):
+            # The reader is lazy; each day is pulled and written on its own
+            ds = self.reader(dataset_id, variables, aoi, first, last)[list(variables)]
+            day_of = ds["time"].values.astype("datetime64[D]")
+            span, pending = {str(d) for d in _days(first, last)}, set()
+            for day in _days(first, last):
+                sel = np.flatnonzero(day_of == day)
+                if sel.size:
+                    fn = os.path.join(path, f"{day}.nc")
+                    ds.isel(time=sel).to_netcdf(fn + ".tmp", format="NETCDF4")
+                    os.replace(fn + ".tmp", fn)
+                elif day > settled:
+                    pending.add(str(day))
+            # Older days without a file are done too: L3 products skip fully clouded days
+            manifest["days"] = sorted(set(manifest["days"]) | (span - pending))
+            manifest["pending"] = sorted((set(manifest.get("pending", [])) - span) | pending)
+            self._write_manifest(path, manifest)
+        return len(todo)
+
+    def open(self, dataset_id, variables, aoi, start, end):
+        """Return the ``[start, end]`` subset as a lazy Dataset, fetching only what is missing."""
+        self.fetch(dataset_id, variables, aoi, start, end)
+        name, _ = self.key(dataset_id, variables, aoi)
+        path = os.path.join(self.root, name)
+        files = [os.path.join(path, f"{d}.nc") for d in _days(start, end)]
+        files = [f for f in files if os.path.exists(f)]
+        if not files:
+            raise FileNotFoundError(f"No {dataset_id} data between {start} and {end}.")
+        return xr.open_mfdataset(files, combine="nested", concat_dim="time")
@@ -0,0 +1,213 @@
+"""
+Checkpoints and warm starts for the Step 5 planner.
+
+A checkpoint stores the population and Pareto archive as *pixel*
+selections (bit-packed over the flat grid indices of the candidate
+pixels), plus a key of the candidate inputs and planner settings and
+the generation count. For resuming it also keeps the run's own state:
+the genome (real-valued genes or bits), objective values, NSGA-II ranks
+and crowding distances, and the random generator state. On the next run:
+
+* same key     → resume: :func:`resume_minimize` restores that state and
+                 runs only the remaining generations, so an interrupted
+                 run ends where an uninterrupted one with the same seed
+                 would; when the checkpoint already has ``n_gen``
+                 generations (or more) the stored front is returned and
+                 nothing is run;
+* other key    → warm start: stored selections are remapped onto the new
+                 candidates (a patch is selected when most of its pixels
+                 were) and seed the initial population, topped up with
+                 random individuals;
+* no file      → cold start.
+"""
+
+import hashlib
+import json
+import os
+from types import SimpleNamespace
+
+import time
+
+import numpy as np
+from pymoo.core.callback import Callback
+from pymoo.core.population import Population
+
+from libuts.planner import THRESHOLD
+
+CHECKPOINT = "outputs/planner_checkpoint.npz"
+
+
+def candidate_key(A, weights=None, pixel_flat=None, labels=None, settings=None):
+    """
+    SHA-256 of the attribute matrix, weights, the pixel → candidate mapping
+    and the planner ``settings`` (e.g. encoding and population size).
+    """
+    h = hashlib.sha256()
+    for a in (A, weights, pixel_flat, labels):
+        if a is not None:
+            h.update(np.ascontiguousarray(a).tobytes())
+    if settings:
+        h.update(json.dumps(settings, sort_keys=True).encode())
+    return h.hexdigest()
+
+
+def _to_pixels(X, labels):
+    sel = np.asarray(X) > THRESHOLD
+    return sel if labels is None else sel[:, labels]
+
+
+def algorithm_state(algorithm):
+    """What :func:`resume_minimize` needs to continue ``algorithm``'s run exactly."""
+    pop = algorithm.pop
+    return {"genome": np.asarray(pop.get("X")), "genome_F": np.asarray(pop.get("F"), dtype=np.float64),
+            "rank": pop.get("rank"), "crowding": pop.get("crowding"),
+            "rng": json.dumps(algorithm.random_state.bit_generator.state)}
+
+
+def save_checkpoint(path, key, n_gen, pop_X, front_X, front_F, pixel_flat, labels=None, state=None):
+    """
+    Write population and front (as pixel selections) to ``path`` atomically,
+    with the run ``state`` from :func:`algorithm_state` when given.
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = path + ".tmp.npz"
+    np.savez_compressed(
+        tmp, key=key, n_gen=n_gen, pixel_flat=np.asarray(pixel_flat, dtype=np.int64),
+        n_pixels=len(pixel_flat),
+        pop=np.packbits(_to_pixels(pop_X, labels), axis=1),
+        front=np.packbits(_to_pixels(front_X, labels), axis=1),
+        front_F=np.asarray(front_F, dtype=np.float64),
+        **(state or {}),
+    )
+    os.replace(tmp, path)
+
+
+def load_checkpoint(path=CHECKPOINT):
+    if not os.path.exists(path):
+        return None
+    with np.load(path, allow_pickle=False) as z:
+        n = int(z["n_pixels"])
+        return SimpleNamespace(
+            key=str(z["key"]), n_gen=int(z["n_gen"]), pixel_flat=z["pixel_flat"],
+            pop=np.unpackbits(z["pop"], axis=1, count=n).astype(bool),
+            front=np.unpackbits(z["front"], axis=1, count=n).astype(bool),
+            front_F=z["front_F"],
+            state=SimpleNamespace(genome=z["genome"], F=z["genome_F"], rank=z["rank"],
+                                  crowding=z["crowding"], rng=str(z["rng"])) if "genome" in z else None,
+        )
+
+
+def remap(selections, old_flat, new_flat, labels=None, n_candidates=None):
+    """
+    Pixel selections over ``old_flat`` → candidate selections for the new set.
+
+    Pixels missing from the old set count as unselected; with ``labels``
+    a candidate is selected when more than half of its pixels were.
+    """
+    order = np.argsort(old_flat)
+    pos = np.clip(np.searchsorted(old_flat, new_flat, sorter=order), 0, len(old_flat) - 1)
+    found = old_flat[order[pos]] == new_flat
+    pix = np.zeros((len(selections), len(new_flat)), dtype=bool)
+    pix[:, found] = selections[:, order[pos[found]]]
+    if labels is None:
+        return pix
+    n_candidates = n_candidates or int(labels.max()) + 1
+    size = np.bincount(labels, minlength=n_candidates)
+    votes = np.stack([np.bincount(labels, weights=row, minlength=n_candidates) for row in pix])
+    return votes > 0.5 * size
+
+
+def seed_population(selections, pop_size, encoding="real", density=1 - THRESHOLD, seed=0):
+    """
+    Initial decision matrix from boolean ``selections`` (unique rows first),
+    topped up with random individuals to ``pop_size``.
+    """
+    rng = np.random.default_rng(seed)
+    n_var = selections.shape[1]
+    _, first = np.unique(np.packbits(selections, axis=1), axis=0, return_index=True)
+    sel = selections[np.sort(first)][:pop_size]
+    extra = rng.random((pop_size - len(sel), n_var)) < density
+    sel = np.vstack([sel, extra])
+    if encoding == "binary":
+        return sel
+    # Real encoding: selected genes above the threshold, the rest below
+    u = rng.random(sel.shape)
+    return np.where(sel, THRESHOLD + u * (1 - THRESHOLD), u * THRESHOLD)
+
+
+def plan_start(path, key, pixel_flat, labels, n_candidates, pop_size, n_gen, encoding="real",
+               warm_n_gen=None, seed=0):
+    """
+    Decide how Step 5 starts from the checkpoint at ``path``.
+
+    Returns ``mode`` (``"cold"``, ``"resume"``, ``"warm"`` or ``"done"``),
+    the initial ``sampling`` (``None`` for cold and done), the generations
+    already ``done`` and the generations still to run (``n_gen``). When
+    ``done``, ``X`` / ``F`` hold the checkpointed front over the candidates.
+    A resume carries the checkpointed run ``state`` (``None`` otherwise, or
+    for checkpoints written without one); its sampling is then the stored
+    genome itself.
+    """
+    ckpt = load_checkpoint(path)
+    if ckpt is None:
+        return SimpleNamespace(mode="cold", sampling=None, done=0, n_gen=n_gen, state=None)
+    pixel_flat = np.asarray(pixel_flat)
+    if ckpt.key == key and ckpt.n_gen >= n_gen:
+        X = remap(ckpt.front, ckpt.pixel_flat, pixel_flat, labels, n_candidates)
+        return SimpleNamespace(mode="done", sampling=None, done=ckpt.n_gen, n_gen=0, X=X, F=ckpt.front_F,
+                               state=None)
+    if ckpt.key == key:
+        if ckpt.state is not None:
+            sampling = ckpt.state.genome
+        else:
+            sampling = seed_population(remap(ckpt.pop, ckpt.pixel_flat, pixel_flat, labels, n_candidates),
+                                       pop_size, encoding, seed=seed)
+        return SimpleNamespace(mode="resume", sampling=sampling, done=ckpt.n_gen, n_gen=n_gen - ckpt.n_gen,
+                               state=ckpt.state)
+    X = remap(np.vstack([ckpt.front, ckpt.pop]), ckpt.pixel_flat, pixel_flat, labels, n_candidates)
+    return SimpleNamespace(mode="warm", sampling=seed_population(X, pop_size, encoding, seed=seed),
+                           done=0, n_gen=warm_n_gen or n_gen, state=None)
+
+
+def resume_minimize(problem, algorithm, start, **kwargs):
+    """
+    Like ``pymoo.optimize.minimize``, but continuing from ``start.state``
+    (a :func:`plan_start` resume): the population, ranks and random state
+    are restored and generations ``start.done + 1`` … ``start.done +
+    start.n_gen`` are run. ``kwargs`` go to ``algorithm.setup``.
+    """
+    state = start.state
+    algorithm.setup(problem, termination=("n_gen", start.done + start.n_gen), **kwargs)
+    algorithm.pop = Population.new(X=state.genome, F=state.F, rank=state.rank, crowding=state.crowding)
+    algorithm.random_state.bit_generator.state = json.loads(state.rng)
+    algorithm.n_iter, algorithm.is_initialized, algorithm.start_time = start.done + 1, True, time.time()
+    algorithm._set_optimum()
+    res = algorithm.run()
+    res.algorithm = algorithm
+    return res
+
+
+class PlannerCheckpoint(Callback):
+    """
+    pymoo callback writing a checkpoint every ``every`` generations.
+
+    ``offset`` counts generations run before this algorithm's first one
+    (0 when it continues a run through :func:`resume_minimize`).
+    """
+
+    def __init__(self, path, key, pixel_flat, labels=None, every=5, offset=0):
+        super().__init__()
+        self.path, self.key = path, key
+        self.pixel_flat, self.labels = pixel_flat, labels
+        self.every, self.offset = every, offset
+
+    def save(self, algorithm, n_gen=None):
+        """Checkpoint now; pass ``n_gen`` after a run (pymoo then counts one generation ahead)."""
+        n_gen = algorithm.n_gen if n_gen is None else n_gen
+        save_checkpoint(self.path, self.key, self.offset + n_gen, algorithm.pop.get("X"),
+                        algorithm.opt.get("X"), algorithm.opt.get("F"), self.pixel_flat, self.labels,
+                        state=algorithm_state(algorithm))
+
+    def notify(self, algorithm):
+        if algorithm.n_gen % self.every == 0:
+            self.save(algorithm)
@@ -0,0 +1,111 @@
+"""
+Sampled, cached SHAP explanations.
+
+SHAP values are computed once per model on a stratified sample of the
+training rows (optionally in parallel chunks) and saved as a compact
+``.npz`` artefact named after the model's data hash, the sample size and
+the sample seed. Step 3 and the dashboard read the artefact instead of
+re-running TreeExplainer; the dashboard picks the one for the model
+whose predictions are in the store.
+"""
+
+import glob
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import joblib
+import numpy as np
+import pandas as pd
+
+EXPLAIN_DIR = "outputs/explanations"
+
+
+def stratified_sample(y, n, bins=10, seed=42):
+    """Indices of about ``n`` rows drawn proportionally from quantile bins of ``y``."""
+    y = np.asarray(y)
+    if n >= len(y):
+        return np.arange(len(y))
+    rng = np.random.default_rng(seed)
+    edges = np.unique(np.quantile(y, np.linspace(0, 1, bins + 1)))
+    strata = np.clip(np.searchsorted(edges, y, side="right") - 1, 0, max(len(edges) - 2, 0))
+    picked = []
+    for s in np.unique(strata):
+        members = np.flatnonzero(strata == s)
+        k = max(1, int(round(n * len(members) / len(y))))
+        picked.append(rng.choice(members, size=min(k, len(members)), replace=False))
+    return np.sort(np.concatenate(picked))
+
+
+def explanation_path(model_hash, out_dir=EXPLAIN_DIR, n_samples=2000, seed=42):
+    return os.path.join(out_dir, f"shap-{model_hash[:12]}-n{n_samples}-s{seed}.npz")
+
+
+_explainer = {}
+
+
+def _init_worker(model_path):
+    import shap
+    _explainer["tree"] = shap.TreeExplainer(joblib.load(model_path))
+
+
+def _shap_chunk(X):
+    return np.asarray(_explainer["tree"].shap_values(X), dtype=np.float32)
+
+
+def compute_explanation(model_path, model_hash, X, y, features, n_samples=2000,
+                        n_workers=0, chunk=500, out_dir=EXPLAIN_DIR, seed=42):
+    """
+    SHAP values for a stratified sample of ``X``; reuses the artefact if present.
+
+    ``n_workers > 0`` splits the sample into ``chunk``-row pieces across a
+    process pool. Returns the explanation as a dict (see
+    :func:`load_explanation`).
+    """
+    path = explanation_path(model_hash, out_dir, n_samples, seed)
+    if os.path.exists(path):
+        return load_explanation(path)
+
+    idx = stratified_sample(y, n_samples, seed=seed)
+    Xs = np.asarray(X)[idx]
+    pieces = [Xs[i:i + chunk] for i in range(0, len(Xs), chunk)]
+    _init_worker(model_path)
+    if n_workers:
+        with ProcessPoolExecutor(n_workers, initializer=_init_worker, initargs=(model_path,)) as pool:
+            values = np.concatenate(list(pool.map(_shap_chunk, pieces)))
+    else:
+        values = np.concatenate([_shap_chunk(p) for p in pieces])
+    base = float(np.ravel(_explainer["tree"].expected_value)[0])
+
+    mean_abs = np.abs(values).mean(axis=0)
+    os.makedirs(out_dir, exist_ok=True)
+    np.savez_compressed(
+        path,
+        shap_values=values, base_value=base, X=Xs.astype(np.float32), index=idx,
+        features=np.array(features), mean_abs=mean_abs, model_hash=model_hash,
+    )
+    return load_explanation(path)
+
+
+def load_explanation(path):
+    """Read an artefact into ``shap_values``, ``base_value``, ``X`` (DataFrame) and ``ranking``."""
+    with np.load(path, allow_pickle=False) as z:
+        features = [str(f) for f in z["features"]]
+        ranking = pd.DataFrame({"Variable": features, "Mean |SHAP|": z["mean_abs"]})
+        return {
+            "shap_values": z["shap_values"],
+            "base_value": float(z["base_value"]),
+            "X": pd.DataFrame(z["X"], columns=features),
+            "index": z["index"],
+            "ranking": ranking.sort_values("Mean |SHAP|", ascending=False).reset_index(drop=True),
+            "model_hash": str(z["model_hash"]),
+            "path": path,
+        }
+
+
+def latest_explanation(out_dir=EXPLAIN_DIR, model_hash=None):
+    """
+    Most recently written artefact in ``out_dir`` (for the model ``model_hash``
+    when given), or ``None``.
+    """
+    files = glob.glob(os.path.join(out_dir, f"shap-{model_hash[:12] if model_hash else ''}*.npz"))
+    return load_explanation(max(files, key=os.path.getmtime)) if files else None
@@ -0,0 +1,115 @@
+"""
+Compact valid-pixel index shared by Steps 3–5.
+
+The index stores the flat (row-major) positions of the valid sea pixels
+as int32 together with the grid shape and coordinate vectors. ``gather``
+turns grid variables into a ``(pixels, variables)`` matrix and ``scatter``
+puts a per-pixel vector back on the grid, both by plain array indexing,
+so steps exchange tables without a pandas MultiIndex and stay aligned
+pixel for pixel. Step 3 saves it as ``outputs/greifswalder_valid_pixels.npz``;
+loading it against a dataset checks that both are on the same grid.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+import xarray as xr
+
+VALID_PIXELS = "outputs/greifswalder_valid_pixels.npz"
+
+
+class ValidPixelIndex:
+    """Flat int32 indices of valid pixels on a ``(lat, lon)`` grid."""
+
+    def __init__(self, flat, shape, lat, lon, dims=("lat", "lon")):
+        self.flat = np.asarray(flat, dtype=np.int32)
+        self.shape = tuple(int(s) for s in shape)
+        self.lat = np.asarray(lat)
+        self.lon = np.asarray(lon)
+        self.dims = tuple(dims)
+
+    @classmethod
+    def from_mask(cls, mask, lat, lon, dims=("lat", "lon")):
+        mask = np.asarray(mask, dtype=bool)
+        if mask.size >= np.iinfo(np.int32).max:
+            raise ValueError("Grid too large for an int32 pixel index.")
+        return cls(np.flatnonzero(mask), mask.shape, lat, lon, dims)
+
+    @classmethod
+    def from_dataset(cls, ds, variables, dims=("lat", "lon")):
+        """Pixels where every one of ``variables`` is finite."""
+        mask = np.ones([ds.sizes[d] for d in dims], dtype=bool)
+        for v in variables:
+            mask &= np.isfinite(ds[v].transpose(*dims).values)
+        return cls.from_mask(mask, ds[dims[0]].values, ds[dims[1]].values, dims)
+
+    def __len__(self):
+        return self.flat.size
+
+    @property
+    def rows(self):
+        return self.flat // self.shape[1]
+
+    @property
+    def cols(self):
+        return self.flat % self.shape[1]
+
+    def subset(self, keep):
+        """New index restricted to the pixels where the boolean vector ``keep`` is true."""
+        return ValidPixelIndex(self.flat[np.asarray(keep, dtype=bool)], self.shape, self.lat, self.lon, self.dims)
+
+    def gather(self, ds, variables, dtype=None):
+        """``(pixels, len(variables))`` matrix of ``ds[variables]`` at the valid pixels."""
+        cols = [ds[v].transpose(*self.dims).values.reshape(-1)[self.flat] for v in variables]
+        return np.stack(cols, axis=1).astype(dtype or np.result_type(*cols), copy=False)
+
+    def frame(self, ds, variables):
+        """Gathered variables as a DataFrame with ``lat`` / ``lon`` columns."""
+        out = pd.DataFrame(self.gather(ds, variables), columns=list(variables))
+        out.insert(0, "lon", self.lon[self.cols])
+        out.insert(0, "lat", self.lat[self.rows])
+        return out
+
+    def scatter(self, values, fill=np.nan, dtype=np.float32):
+        """Grid of ``shape`` with ``values`` at the valid pixels and ``fill`` elsewhere."""
+        grid = np.full(self.shape[0] * self.shape[1], fill, dtype=dtype)
+        grid[self.flat] = values
+        return grid.reshape(self.shape)
+
+    def to_dataarray(self, values, name=None, attrs=None, **kwargs):
+        return xr.DataArray(
+            self.scatter(values, **kwargs), dims=self.dims,
+            coords={self.dims[0]: self.lat, self.dims[1]: self.lon}, name=name, attrs=attrs or {},
+        )
+
+    def matches(self, ds):
+        """Whether ``ds`` is on the grid (shape and coordinates) this index was built for."""
+        if any(d not in ds.sizes for d in self.dims) or tuple(ds.sizes[d] for d in self.dims) != self.shape:
+            return False
+        return all(np.allclose(ds[d].values, c, rtol=0, atol=1e-9)
+                   for d, c in zip(self.dims, (self.lat, self.lon)))
+
+    def save(self, path=VALID_PIXELS):
+        np.savez_compressed(path, flat=self.flat, shape=np.array(self.shape),
+                            lat=self.lat, lon=self.lon, dims=np.array(self.dims))
+        return path
+
+    @classmethod
+    def load(cls, path=VALID_PIXELS, like=None):
+        """Saved index; with ``like``, a ``ValueError`` if that dataset is on another grid."""
+        with np.load(path, allow_pickle=False) as z:
+            pixels = cls(z["flat"], z["shape"], z["lat"], z["lon"], [str(d) for d in z["dims"]])
+        if like is not None and not pixels.matches(like):
+            raise ValueError(f"{path} was built for another grid ({pixels.shape[0]}×{pixels.shape[1]}).")
+        return pixels
+
+    @classmethod
+    def load_or_build(cls, path, ds, variables):
+        """The index saved at ``path`` if it fits ``ds``, else a new one from ``ds[variables]``."""
+        if os.path.exists(path):
+            try:
+                return cls.load(path, like=ds)
+            except ValueError as e:
+                print(f"⚠️ {e} Rebuilding the valid-pixel index.")
+        return cls.from_dataset(ds, variables)
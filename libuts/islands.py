@@ -0,0 +1,235 @@
+"""
+Multi-core execution of the Step 5 NSGA-II.
+
+``PooledRestorationProblem`` evaluates each population across a process
+pool. The attribute matrix and weights are placed once in shared memory;
+per generation the workers receive only bit-packed selections.
+
+:func:`run_islands` runs several NSGA-II populations with different seeds
+in separate processes (same shared candidate arrays). Every
+``migrate_every`` generations each island sends ``n_migrants`` members of
+its front to the next island in a ring, which re-evaluates them and keeps
+the best ``pop_size`` by rank and crowding. The islands' fronts are merged
+into one non-dominated set after every epoch and at the end.
+"""
+
+import contextlib
+import multiprocessing as mp
+import os
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from types import SimpleNamespace
+
+import numpy as np
+
+from libuts.planner import (THRESHOLD, RestorationProblem, attribute_matrix, make_algorithm,
+                            selection_objectives)
+
+
+def share(arr):
+    """Copy ``arr`` into a new shared memory block; returns ``(shm, spec)``."""
+    arr = np.ascontiguousarray(arr)
+    shm = shared_memory.SharedMemory(create=True, size=max(arr.nbytes, 1))
+    np.ndarray(arr.shape, arr.dtype, buffer=shm.buf)[...] = arr
+    return shm, (shm.name, arr.shape, arr.dtype.str)
+
+
+def attach(spec):
+    """Read-only view of a block created by :func:`share`; returns ``(shm, array)``."""
+    name, shape, dtype = spec
+    shm = shared_memory.SharedMemory(name=name)
+    view = np.ndarray(shape, np.dtype(dtype), buffer=shm.buf)
+    view.flags.writeable = False
+    return shm, view
+
+
+def _share_candidates(A, weights):
+    blocks = [share(A)] + ([share(weights)] if weights is not None else [])
+    return [b[0] for b in blocks], [b[1] for b in blocks] + ([None] if weights is None else [])
+
+
+def _attach_problem(specs, threshold, representation):
+    shms, arrays = [], []
+    for spec in specs:
+        if spec is None:
+            arrays.append(None)
+            continue
+        shm, arr = attach(spec)
+        shms.append(shm)
+        arrays.append(arr)
+    problem = RestorationProblem(arrays[0], threshold=threshold, representation=representation, weights=arrays[1])
+    return shms, problem
+
+
+def _release(shms, unlink=False):
+    for shm in shms:
+        shm.close()
+        if unlink:
+            shm.unlink()
+
+
+# ---------------------------------------------------------------------
+# Population evaluated across a process pool
+# ---------------------------------------------------------------------
+_worker = {}
+
+
+def _init_eval(specs, threshold, representation):
+    _worker["shms"], _worker["problem"] = _attach_problem(specs, threshold, representation)
+
+
+def _eval_packed(args):
+    packed, n_var = args
+    p = _worker["problem"]
+    M = packed if p.representation == "bitset" else np.unpackbits(packed, axis=1, count=n_var).astype(bool)
+    return selection_objectives(M, p.A, p.representation, p.lut, p.weights)
+
+
+class PooledRestorationProblem(RestorationProblem):
+    """
+    :class:`RestorationProblem` whose populations are split across ``n_workers`` processes.
+
+    Use as a context manager (or call :meth:`close`) to stop the pool and
+    free the shared memory.
+    """
+
+    def __init__(self, df, n_workers=None, **kwargs):
+        super().__init__(df, **kwargs)
+        self.n_workers = n_workers or os.cpu_count() or 1
+        self._shms, specs = _share_candidates(self.A, self.weights)
+        self.pool = ProcessPoolExecutor(self.n_workers, initializer=_init_eval,
+                                        initargs=(specs, self.threshold, self.representation))
+
+    def _evaluate(self, X, out, *args, **kwargs):
+        packed = np.packbits(X > self.threshold, axis=1)
+        chunks = [(c, self.n_var) for c in np.array_split(packed, self.n_workers) if len(c)]
+        out["F"] = np.vstack(list(self.pool.map(_eval_packed, chunks)))
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+            _release(self._shms, unlink=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# ---------------------------------------------------------------------
+# Island model
+# ---------------------------------------------------------------------
+def non_dominated(X, F):
+    """Unique non-dominated rows of ``(X, F)``."""
+    from pymoo.util.nds.non_dominated_sorting import NonDominatedSorting
+    front = NonDominatedSorting().do(F, only_non_dominated_front=True)
+    X, F = X[front], F[front]
+    key = np.packbits(X > THRESHOLD, axis=1) if X.dtype != bool else np.packbits(X, axis=1)
+    _, first = np.unique(key, axis=0, return_index=True)
+    first = np.sort(first)
+    return X[first], F[first]
+
+
+def _immigrate(algorithm, problem, X):
+    from pymoo.core.evaluator import Evaluator
+    from pymoo.core.population import Population
+    immigrants = Population.new(X=X)
+    Evaluator().eval(problem, immigrants)
+    merged = Population.merge(algorithm.pop, immigrants)
+    algorithm.pop = algorithm.survival.do(problem, merged, n_survive=len(algorithm.pop),
+                                          random_state=algorithm.random_state, algorithm=algorithm)
+
+
+def _island(conn, specs, threshold, representation, pop_size, encoding, seed, n_migrants, sampling):
+    from pymoo.core.termination import NoTermination
+    shms, problem = _attach_problem(specs, threshold, representation)
+    try:
+        algorithm = make_algorithm(pop_size, encoding, threshold, sampling=sampling)
+        algorithm.setup(problem, termination=NoTermination(), seed=seed)
+        rng = np.random.default_rng(seed)
+        while (msg := conn.recv()) is not None:
+            n_gen, migrants = msg
+            if migrants is not None and len(migrants):
+                _immigrate(algorithm, problem, migrants)
+            for _ in range(n_gen):
+                algorithm.next()
+            X, F = algorithm.opt.get("X"), algorithm.opt.get("F")
+            pick = rng.choice(len(X), size=min(n_migrants, len(X)), replace=False)
+            conn.send({"X": X, "F": F, "emigrants": X[pick], "pop": algorithm.pop.get("X")})
+    except Exception:
+        with contextlib.suppress(BrokenPipeError, OSError):
+            conn.send({"error": traceback.format_exc()})
+    finally:
+        _release(shms)
+        conn.close()
+
+
+def _receive(conn, proc, i):
+    """The next report of island ``i``; raises its error, or its exit if it died first."""
+    try:
+        msg = conn.recv()
+    except EOFError:
+        proc.join(timeout=10)
+        raise RuntimeError(f"Island {i} exited with code {proc.exitcode} before reporting.") from None
+    if "error" in msg:
+        raise RuntimeError(f"Island {i} failed:\n{msg['error']}")
+    return msg
+
+
+def run_islands(df, weights=None, n_islands=4, n_gen=50, migrate_every=10, n_migrants=5,
+                pop_size=100, encoding="real", representation="dense", threshold=THRESHOLD, seed=42,
+                sampling=None, callback=None):
+    """
+    Island-model NSGA-II on the candidates ``df`` (DataFrame or attribute matrix).
+
+    ``sampling`` (e.g. a warm-start decision matrix) seeds every island.
+    ``callback(n_gen, pop_X, X, F)`` is called after every migration epoch
+    with the generations run so far, the islands' populations (stacked) and
+    the merged front, e.g. to write a checkpoint. Returns a namespace with the merged front ``X`` / ``F`` and ``history``:
+    one entry per migration epoch with ``n_gen``, elapsed ``seconds`` and
+    the merged front ``F`` at that point.
+    """
+    A = df if isinstance(df, np.ndarray) else attribute_matrix(df)
+    shms, specs = _share_candidates(A, None if weights is None else np.asarray(weights, dtype=np.float64))
+    ctx = mp.get_context()
+    pipes, procs = [], []
+    t0 = time.perf_counter()
+    try:
+        for i in range(n_islands):
+            parent, child = ctx.Pipe()
+            p = ctx.Process(target=_island, daemon=True,
+                            args=(child, specs, threshold, representation, pop_size, encoding, seed + i, n_migrants,
+                                  sampling))
+            p.start()
+            pipes.append(parent)
+            procs.append(p)
+
+        migrants, done, history = [None] * n_islands, 0, []
+        while done < n_gen:
+            k = min(migrate_every, n_gen - done)
+            for i, (conn, m) in enumerate(zip(pipes, migrants)):
+                try:
+                    conn.send((k, m))
+                except (BrokenPipeError, OSError):      # the island stopped: raise its own error
+                    _receive(conn, procs[i], i)
+                    raise
+            results = [_receive(conn, p, i) for i, (conn, p) in enumerate(zip(pipes, procs))]
+            done += k
+            migrants = [results[(i - 1) % n_islands]["emigrants"] for i in range(n_islands)]   # ring
+            X, F = non_dominated(np.concatenate([r["X"] for r in results]),
+                                 np.concatenate([r["F"] for r in results]))
+            history.append({"n_gen": done, "seconds": time.perf_counter() - t0, "F": F})
+            if callback is not None:
+                callback(done, np.concatenate([r["pop"] for r in results]), X, F)
+    finally:
+        for conn in pipes:
+            with contextlib.suppress(BrokenPipeError, OSError):     # the island already stopped
+                conn.send(None)
+        for p in procs:
+            p.join(timeout=10)
+        _release(shms, unlink=True)
+    return SimpleNamespace(X=X, F=F, history=history)
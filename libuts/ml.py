@@ -0,0 +1,140 @@
+"""
+Random Forest persistence and chunked grid inference for Step 3.
+
+Models are saved as versioned joblib artefacts named after a hash of the
+training data and hyper-parameters, so unchanged inputs skip training.
+Prediction walks the grid in row bands across a process pool; each worker
+reads its own band from the feature NetCDF and the parent writes the band
+into a memory-mapped ``SSI_ML`` grid, so the full feature matrix is never
+built.
+"""
+
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import joblib
+import numpy as np
+import sklearn
+import xarray as xr
+from sklearn.ensemble import RandomForestRegressor
+
+FEATURES = ["KD490", "ADG443", "APH443", "BBP443"]
+RF_PARAMS = dict(n_estimators=300, max_depth=10, min_samples_leaf=3, random_state=42, n_jobs=-1)
+MODEL_VERSION = 1
+MODEL_DIR = "outputs/models"
+
+
+def data_hash(X, y, params):
+    """SHA-256 of the training matrix, target and hyper-parameters."""
+    h = hashlib.sha256()
+    h.update(np.ascontiguousarray(X, dtype=np.float64).tobytes())
+    h.update(np.ascontiguousarray(y, dtype=np.float64).tobytes())
+    h.update(json.dumps({"params": params, "version": MODEL_VERSION}, sort_keys=True).encode())
+    return h.hexdigest()
+
+
+def load_or_train(X, y, params=RF_PARAMS, model_dir=MODEL_DIR, name="rf_ssi", features=FEATURES):
+    """
+    Return ``(model, meta)``, reusing a saved model when the data hash matches.
+
+    ``meta`` holds the artefact ``path``, ``data_hash`` and whether the
+    model was ``trained`` in this call.
+    """
+    digest = data_hash(X, y, params)
+    path = os.path.join(model_dir, f"{name}-v{MODEL_VERSION}-{digest[:12]}.joblib")
+    meta_path = path.replace(".joblib", ".json")
+    if os.path.exists(path) and os.path.exists(meta_path):
+        with open(meta_path) as f:
+            meta = json.load(f)
+        return joblib.load(path), dict(meta, path=path, trained=False)
+
+    model = RandomForestRegressor(**params)
+    t0 = time.perf_counter()
+    model.fit(X, y)
+    meta = {
+        "name": name, "version": MODEL_VERSION, "data_hash": digest,
+        "params": params, "features": list(features), "n_samples": int(len(y)),
+        "sklearn": sklearn.__version__, "fit_seconds": round(time.perf_counter() - t0, 2),
+    }
+    os.makedirs(model_dir, exist_ok=True)
+    joblib.dump(model, path + ".tmp")
+    os.replace(path + ".tmp", path)
+    with open(meta_path, "w") as f:
+        json.dump(meta, f, indent=1)
+    return model, dict(meta, path=path, trained=True)
+
+
+# ---------------------------------------------------------------------
+# Chunked inference
+# ---------------------------------------------------------------------
+_worker = {}
+
+
+def _open_source(src):
+    if isinstance(src, xr.Dataset):
+        return src
+    # chunks=None: lazy band reads without dask, whose thread pool does not survive a fork
+    return xr.open_zarr(src, consolidated=True, chunks=None) if os.path.isdir(src) else xr.open_dataset(src)
+
+
+def _init_worker(model_path, src, features, n_jobs=1):
+    model = joblib.load(model_path)
+    if n_jobs is not None:
+        model.n_jobs = n_jobs    # 1 in pool workers: parallelism comes from the pool
+    ds = _open_source(src)
+    _worker.update(model=model, ds=ds, features=features)
+
+
+def _predict_band(rows):
+    ds, model = _worker["ds"], _worker["model"]
+    y_dim = ds[_worker["features"][0]].dims[0]
+    band = ds[_worker["features"]].isel({y_dim: slice(*rows)})
+    X = np.stack([band[v].values.ravel() for v in _worker["features"]], axis=1)
+    out = np.full(len(X), np.nan, dtype=np.float32)
+    valid = ~np.isnan(X).any(axis=1)
+    if valid.any():
+        out[valid] = model.predict(X[valid])
+    return rows, out.reshape(band[_worker["features"][0]].shape)
+
+
+def predict_grid(model_path, src_path, out_path, features=FEATURES, rows_per_chunk=128, n_workers=None):
+    """
+    Predict every pixel of ``src_path`` (NetCDF or Zarr store) into a float32 ``.npy`` memmap at ``out_path``.
+
+    ``n_workers=0`` runs in-process; ``None`` uses one worker per CPU.
+    ``src_path`` may also be an in-memory ``xarray.Dataset``: bands are then
+    predicted in-process (the model keeps its own ``n_jobs``), and with
+    ``out_path=None`` the grid is returned as a plain array.
+    Returns the memory-mapped ``(rows, cols)`` grid.
+    """
+    in_memory = isinstance(src_path, xr.Dataset)
+    if in_memory:
+        shape = src_path[features[0]].shape
+    else:
+        with _open_source(src_path) as ds:
+            shape = ds[features[0]].shape
+    bands = [(r, min(r + rows_per_chunk, shape[0])) for r in range(0, shape[0], rows_per_chunk)]
+    if out_path is None:
+        grid = np.empty(shape, dtype=np.float32)
+    else:
+        grid = np.lib.format.open_memmap(out_path, mode="w+", dtype=np.float32, shape=shape)
+
+    if in_memory or n_workers == 0:
+        _init_worker(model_path, src_path, features, n_jobs=None if in_memory else 1)
+        for (r0, r1), band in map(_predict_band, bands):
+            grid[r0:r1] = band
+        if not in_memory:
+            _worker["ds"].close()
+        _worker.clear()
+    else:
+        with ProcessPoolExecutor(n_workers, initializer=_init_worker,
+                                 initargs=(model_path, src_path, features)) as pool:
+            for (r0, r1), band in pool.map(_predict_band, bands):
+                grid[r0:r1] = band
+    if out_path is None:
+        return grid
+    grid.flush()
+    return np.load(out_path, mmap_mode="r")
@@ -0,0 +1,122 @@
+"""
+Patch aggregation of restoration candidates (Step 5).
+
+Feasible pixels are first split into connected components on the grid;
+components larger than ``patch_size`` pixels are subdivided with k-means
+on standardised depth / SSI / uncertainty plus grid position (a SLIC-like
+superpixel), so each patch is spatially compact and internally similar.
+Large components are tiled before clustering to keep k-means cheap.
+k-means works in feature space, so a cluster (or a component's part of a
+tile) can fall apart on the grid: such patches are split into their
+connected pieces, so every patch is one 4-connected region.
+The optimiser then chooses patches: attributes are pixel means per patch
+and each patch is weighted by its pixel count, so a patch selection has
+exactly the objectives of its expanded pixel selection.
+"""
+
+import numpy as np
+from scipy import ndimage
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+from sklearn.cluster import KMeans
+
+PATCH_FEATURES = ["depth", "SSI", "uncertainty"]
+
+
+def _standardise(F):
+    sd = F.std(axis=0)
+    return (F - F.mean(axis=0)) / np.where(sd > 0, sd, 1)
+
+
+def _connected_pieces(rows, cols, labels):
+    """
+    Relabel so that each patch id is one 4-connected region of the grid.
+
+    The largest piece of each label keeps it; smaller pieces join an
+    adjacent patch (as in SLIC's connectivity step), or become patches of
+    their own where no such patch touches them.
+    """
+    r, c = rows - rows.min(), cols - cols.min()
+    index = np.full((r.max() + 1, c.max() + 1), -1, dtype=np.int64)
+    index[r, c] = np.arange(len(rows))
+    pairs = []
+    for a, b in ((index[:, :-1], index[:, 1:]), (index[:-1], index[1:])):
+        both = (a >= 0) & (b >= 0)
+        pairs.append((a[both], b[both]))
+    a, b = (np.concatenate(p) for p in zip(*pairs))
+    same = labels[a] == labels[b]
+    graph = coo_matrix((np.ones(same.sum(), dtype=np.int8), (a[same], b[same])), shape=(len(rows),) * 2)
+    n_pieces, piece = connected_components(graph, directed=False)
+
+    owner = np.empty(n_pieces, dtype=labels.dtype)
+    owner[piece] = labels
+    by_size = np.lexsort((-np.bincount(piece, minlength=n_pieces), owner))
+    main = np.zeros(n_pieces, dtype=bool)
+    main[by_size[np.unique(owner[by_size], return_index=True)[1]]] = True
+    # Pieces touching a main piece (directly or through absorbed ones) join it
+    pa, pb = piece[a[~same]], piece[b[~same]]
+    pa, pb = np.concatenate([pa, pb]), np.concatenate([pb, pa])
+    target = np.arange(n_pieces)
+    while True:
+        ta, tb = target[pa], target[pb]
+        join = ~main[ta] & main[tb]
+        if not join.any():
+            break
+        minor, first = np.unique(ta[join], return_index=True)
+        target[minor] = tb[join][first]
+    return np.unique(target[piece], return_inverse=True)[1].astype(np.int32)
+
+
+def label_patches(rows, cols, features, shape, patch_size=50, compactness=1.0, seed=42):
+    """
+    Patch id (0 … n_patches-1) for each candidate pixel at ``(rows, cols)``.
+
+    ``features`` is the ``(pixels, k)`` attribute matrix used for
+    similarity; ``compactness`` weights grid position against it. Large
+    components are cut into square tiles of about 16 patches first, so
+    each k-means run stays small. Every patch is contiguous on the grid.
+    """
+    rows, cols = np.asarray(rows), np.asarray(cols)
+    mask = np.zeros(shape, dtype=bool)
+    mask[rows, cols] = True
+    components, _ = ndimage.label(mask)
+    span = np.sqrt(patch_size)
+    tile_side = int(np.ceil(4 * span))
+    n_tile_cols = shape[1] // tile_side + 1
+    tile = (rows // tile_side) * n_tile_cols + cols // tile_side
+    group = components[rows, cols].astype(np.int64) * (tile.max() + 1) + tile
+    Z = _standardise(np.asarray(features, dtype=np.float64))
+    # Grid position scaled so a patch of patch_size pixels spans ~1 unit
+    xy = np.column_stack([rows, cols]) / span * compactness
+
+    labels = np.empty(len(rows), dtype=np.int32)
+    next_id = 0
+    order = np.argsort(group, kind="stable")
+    bounds = np.flatnonzero(np.diff(group[order])) + 1
+    for members in np.split(order, bounds):
+        k = int(np.ceil(len(members) / patch_size))
+        if k <= 1:
+            labels[members] = next_id
+            next_id += 1
+            continue
+        km = KMeans(n_clusters=k, n_init=1, random_state=seed).fit(np.hstack([Z[members], xy[members]]))
+        _, local = np.unique(km.labels_, return_inverse=True)
+        labels[members] = next_id + local
+        next_id += local.max() + 1
+    return _connected_pieces(rows, cols, labels)
+
+
+def patch_table(df, labels, columns):
+    """Per-patch pixel count, centroid and mean of ``columns`` (one row per patch id)."""
+    g = df[columns + ["lat", "lon"]].groupby(np.asarray(labels))
+    table = g.mean()
+    table.insert(0, "n_pixels", g.size())
+    return table.reset_index(names="patch")
+
+
+def expand(labels, chosen):
+    """Boolean pixel mask for the selected patch ids (or boolean patch vector)."""
+    chosen = np.asarray(chosen)
+    if chosen.dtype == bool:
+        chosen = np.flatnonzero(chosen)
+    return np.isin(labels, chosen)
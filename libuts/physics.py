@@ -0,0 +1,201 @@
+"""
+Light-budget physics (Step 2) as reusable, chunk-friendly functions.
+
+Every function works on plain or dask-backed xarray objects. With dask
+inputs nothing is loaded until the result is written: the normalisation
+bounds come from one shared streaming pass and the SSI tiles are written
+straight to disk by ``to_netcdf``.
+"""
+
+import numpy as np
+import xarray as xr
+
+ZEU_COEF = 4.6          # ln(100): depth of the 1 % light level in units of 1/KD490
+ZEU_MAX = 30.0
+SSI_WEIGHTS = (0.5, 0.3, 0.2)   # PAR_bed, Zeu, |depth|
+LIGHT_THRESHOLD = 3.0   # E m⁻² d⁻¹ at the bed, approx. daily need of Zostera marina
+
+
+def euphotic_depth(kd):
+    """Euphotic depth (1 % light level) from KD490."""
+    zeu = (ZEU_COEF / kd).clip(min=0, max=ZEU_MAX)
+    zeu.name = "Zeu"
+    zeu.attrs.update({"units": "m", "long_name": "Euphotic depth (1% light level)"})
+    return zeu
+
+
+def par_at_bed(par_surface, kd, depth):
+    """PAR reaching the seabed; ``depth`` is negative below sea level."""
+    par_bed = par_surface * np.exp(kd * depth)
+    par_bed.name = "PAR_bed"
+    par_bed.attrs.update({"units": "E m⁻² d⁻¹",
+                          "long_name": "Photosynthetically Active Radiation at seabed"})
+    return par_bed
+
+
+def minmax(*arrays):
+    """``[(min, max), ...]`` for each array, computed in a single pass."""
+    import dask
+    reductions = [r for a in arrays for r in (a.min(), a.max())]
+    values = [float(v) for v in dask.compute(*reductions)]
+    return list(zip(values[::2], values[1::2]))
+
+
+def normalize(da, bounds=None):
+    """Scale ``da`` to 0–1 using precomputed ``(min, max)`` bounds."""
+    lo, hi = bounds if bounds is not None else minmax(da)[0]
+    return (da - lo) / (hi - lo)
+
+
+def suitability(par_bed, zeu, depth, weights=SSI_WEIGHTS, bounds=None):
+    """
+    Seagrass Suitability Index from bottom light, euphotic depth and depth.
+
+    ``bounds`` are the ``(min, max)`` of PAR_bed, Zeu and |depth|; they are
+    computed in one pass when not given.
+    """
+    w_par, w_zeu, w_depth = weights
+    abs_depth = abs(depth)
+    if bounds is None:
+        bounds = minmax(par_bed, zeu, abs_depth)
+    ssi = (
+        w_par * normalize(par_bed, bounds[0]) +
+        w_zeu * normalize(zeu, bounds[1]) -
+        w_depth * normalize(abs_depth, bounds[2])
+    )
+    ssi = ssi.clip(min=0, max=1)
+    ssi.name = "SSI"
+    ssi.attrs.update({"long_name": "Seagrass Suitability Index (0–1)",
+                      "comment": "0=unsuitable, 1=highly suitable"})
+    return ssi
+
+
+def light_budget(ds, weights=SSI_WEIGHTS):
+    """Zeu, PAR_bed and SSI for a Step 1 dataset, alongside KD490 and depth."""
+    zeu = euphotic_depth(ds["KD490"])
+    par_bed = par_at_bed(ds["PAR_surface"], ds["KD490"], ds["depth"])
+    ssi = suitability(par_bed, zeu, ds["depth"], weights=weights)
+    out = xr.Dataset({
+        "KD490": ds["KD490"],
+        "depth": ds["depth"],
+        "Zeu": zeu,
+        "PAR_bed": par_bed,
+        "SSI": ssi,
+    })
+    out.attrs.update(ds.attrs)
+    out.attrs["step"] = "Physics-based seagrass suitability"
+    return out
+
+
+def run_physics(in_path, out_path, tile=1024, weights=SSI_WEIGHTS):
+    """
+    Tiled, out-of-core Step 2: ``in_path`` (Step 1 NetCDF) → ``out_path``.
+
+    Inputs are read in ``tile`` × ``tile`` chunks; peak memory is a few
+    tiles per dask worker thread regardless of the grid size.
+    """
+    ds = xr.open_dataset(in_path)
+    spatial = [d for d in ds["KD490"].dims if d != "time"]
+    ds = ds.chunk({d: tile for d in spatial})
+    out = light_budget(ds, weights=weights)
+    out.to_netcdf(out_path)
+    ds.close()
+    return out_path
+
+
+# ---------------------------------------------------------------------
+# Time-resolved (daily) light budget
+# ---------------------------------------------------------------------
+def _fill_gaps(a):
+    """Carry the last observation over NaN gaps along the last axis (first one for leading gaps)."""
+    valid = np.isfinite(a)
+    idx = np.where(valid, np.arange(a.shape[-1]), -1)
+    np.maximum.accumulate(idx, axis=-1, out=idx)
+    first = valid.argmax(axis=-1)[..., None]
+    idx = np.where(idx < 0, first, idx)
+    return np.take_along_axis(a, idx, axis=-1)
+
+
+def _longest_run(mask):
+    """Length of the longest run of True along the last axis."""
+    m = mask.astype(np.int32)
+    c = np.cumsum(m, axis=-1)
+    reset = np.where(m == 0, c, 0)
+    np.maximum.accumulate(reset, axis=-1, out=reset)
+    return (c - reset).max(axis=-1)
+
+
+def _daily_metrics(par_bed, threshold):
+    filled = _fill_gaps(par_bed)
+    limited = filled < threshold            # NaN (never observed) compares False
+    return filled.sum(axis=-1), _longest_run(limited).astype(np.float32)
+
+
+def daily_light_budget(par_surface, kd, depth, threshold=LIGHT_THRESHOLD, time_dim="time"):
+    """
+    Evaluate PAR_bed per day and summarise it per pixel.
+
+    ``kd`` carries a ``time_dim`` axis with NaN on cloud-masked L3 days;
+    ``par_surface`` and ``depth`` may be static or daily. Gaps take the
+    last observed day (the first one for leading gaps) when accumulating
+    light and counting runs; day fractions use observed days only. All
+    reductions are vectorised over time, and dask inputs are processed
+    per spatial chunk with the full time axis.
+    """
+    par_bed = par_at_bed(par_surface, kd, depth)
+    if par_bed.chunks is not None:
+        par_bed = par_bed.chunk({time_dim: -1})
+    n_valid = par_bed.notnull().sum(time_dim)
+    observed = n_valid > 0
+
+    cumulative, longest = xr.apply_ufunc(
+        _daily_metrics, par_bed, kwargs={"threshold": threshold},
+        input_core_dims=[[time_dim]], output_core_dims=[[], []],
+        dask="parallelized", output_dtypes=[par_bed.dtype, np.float32],
+    )
+    above = (par_bed >= threshold).sum(time_dim) / n_valid.where(observed)
+
+    out = xr.Dataset({
+        "PAR_bed_daily_mean": par_bed.mean(time_dim),
+        "PAR_bed_cumulative": cumulative.where(observed),
+        "frac_days_above": above,
+        "max_light_limited_run": longest.where(observed),
+        "n_valid_days": n_valid,
+    })
+    out["PAR_bed_daily_mean"].attrs.update({"units": "E m⁻² d⁻¹", "long_name": "Mean of daily PAR at seabed"})
+    out["PAR_bed_cumulative"].attrs.update({"units": "E m⁻²", "long_name": "Cumulative PAR at seabed (gap-filled)"})
+    out["frac_days_above"].attrs.update({"units": "1", "long_name": f"Fraction of observed days with PAR_bed ≥ {threshold}"})
+    out["max_light_limited_run"].attrs.update({"units": "days", "long_name": f"Longest run of days with PAR_bed < {threshold}"})
+    out["n_valid_days"].attrs["long_name"] = "Cloud-free observations"
+    out.attrs["light_threshold"] = threshold
+    return out
+
+
+def daily_physics(ds, daily, tile=256, threshold=LIGHT_THRESHOLD):
+    """
+    Lazy time-resolved Step 2 for in-memory (or lazily opened) datasets.
+
+    ``ds`` holds the Step 1 static layers and ``daily`` the KD490 cube;
+    both are chunked ``tile`` × ``tile`` over the full time axis.
+    """
+    spatial = [d for d in daily["KD490"].dims if d != "time"]
+    kd = daily["KD490"].chunk({"time": -1, **{d: tile for d in spatial}})
+    static = ds[["PAR_surface", "depth"]].chunk({d: tile for d in spatial})
+    out = daily_light_budget(static["PAR_surface"], kd, static["depth"], threshold=threshold)
+    out.attrs.update(ds.attrs)
+    out.attrs["step"] = "Time-resolved light budget"
+    return out
+
+
+def run_daily_physics(in_path, daily_path, out_path, tile=256, threshold=LIGHT_THRESHOLD):
+    """
+    Time-resolved Step 2: daily KD490 cube + Step 1 static layers → per-pixel light metrics.
+
+    Chunks are ``tile`` × ``tile`` pixels over the full time axis, so a year
+    of daily 300 m grids is processed without loading the cube.
+    """
+    ds = xr.open_dataset(in_path)
+    daily = xr.open_dataset(daily_path)
+    daily_physics(ds, daily, tile=tile, threshold=threshold).to_netcdf(out_path)
+    ds.close(); daily.close()
+    return out_path
@@ -0,0 +1,340 @@
+"""
+Content-hash DAG runner for the pipeline steps.
+
+Each :class:`Step` declares its script, input files, parameters and output
+files. Dependencies follow from the files: a step depends on every step
+that produces one of its inputs. A step's fingerprint is the SHA-256 of
+
+* the script and every ``libuts`` module it imports (transitively; of
+  ``libuts/steps.py`` only the step's own function and shared helpers),
+* the content of its input files (directories: every file inside; Zarr
+  store variables are one directory each, so a step only sees the
+  variables it reads),
+* its ``params``.
+
+A step is skipped (a cache hit) when its fingerprint matches the one
+recorded after its last successful run and all its outputs exist.
+Fingerprints are taken only once upstream steps have finished, so a step
+whose upstream reran but produced identical files is still skipped.
+Steps run one at a time as subprocesses, each once its upstream has
+finished (Steps 1–5 form a chain: every step reads the previous one's
+store variables); per-step status, start and finish times, duration and
+fingerprint are appended to a JSON-lines run log.
+
+Command line (from the repository root)::
+
+    python -m libuts.pipeline                 # everything that changed
+    python -m libuts.pipeline ml              # "ml" and its upstream steps
+    python -m libuts.pipeline --force inputs  # refetch, then what changed
+    python -m libuts.pipeline --dry-run
+"""
+
+import argparse
+import ast
+import hashlib
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+import uuid
+from datetime import datetime, timezone
+
+from libuts.stats import file_sha256
+from libuts.store import STEP_VARIABLES, variables_through
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STATE = "outputs/.pipeline_state.json"
+RUN_LOG = "outputs/pipeline_runs.jsonl"
+
+
+class Step:
+    """
+    One pipeline step.
+
+    ``optional`` lists files the step writes only in some configurations
+    (e.g. the daily KD490 cube): they wire up dependencies and are hashed
+    when present, but are not required for a cache hit. ``entry`` names
+    the step's function in :data:`STEP_MODULE`. ``params`` are settings
+    the fingerprint cannot see in the code (e.g. passed in from outside).
+    """
+
+    def __init__(self, name, script, inputs=(), outputs=(), optional=(), params=None, entry=None):
+        self.name, self.script, self.entry = name, script, entry
+        self.inputs, self.outputs, self.optional = list(inputs), list(outputs), list(optional)
+        self.params = params or {}
+
+    def __repr__(self):
+        return f"Step({self.name!r})"
+
+
+# ---------------------------------------------------------------------
+# LiBuTS pipeline (Steps 1–5)
+# ---------------------------------------------------------------------
+STORE = "outputs/greifswalder_store.zarr"
+
+
+def _store(step):
+    """Store variables written by ``step`` (one directory each, see :mod:`libuts.store`)."""
+    return [f"{STORE}/{v}" for v in STEP_VARIABLES[step]]
+
+
+# No params: every setting (AOI, period, RF and NSGA-II settings …) is a literal in the
+# step's notebook or a default in the libuts code it calls, and both are hashed, so a
+# changed setting already invalidates the step; copies here could only drift from them.
+# What the code cannot see is the remote Step 1 data: refetch with --force inputs.
+STEPS = [
+    Step("inputs", "notebooks/01_inputs_retrieval.py",
+         inputs=["data/gebco_2025.nc"],
+         outputs=_store("inputs"),
+         optional=_store("inputs_daily") + ["outputs/greifswalder_inputs_stats.nc"],
+         entry="retrieve_inputs"),
+    Step("physics", "notebooks/02_physics_suitability.py",
+         inputs=[f"{STORE}/{v}" for v in ("KD490", "PAR_surface", "depth")] + _store("inputs_daily"),
+         outputs=_store("physics"),
+         optional=_store("physics_daily"), entry="physics_step"),
+    Step("ml", "notebooks/03_ml_rf_shap.py",
+         inputs=[f"{STORE}/{v}" for v in ("KD490", "ADG443", "APH443", "BBP443", "depth")] + _store("physics"),
+         outputs=_store("ml") + ["outputs/greifswalder_valid_pixels.npz",
+                                 "outputs/greifswalder_pyramid.zarr", "outputs/shap_summary.png"],
+         entry="ml_step"),
+    Step("uncertainty", "notebooks/04_uncertainty_enrichment.py",
+         inputs=[f"{STORE}/{v}" for v in variables_through("ml")] + ["outputs/greifswalder_valid_pixels.npz"],
+         outputs=_store("uncertainty") + ["outputs/greifswalder_uncertainty.csv"],
+         entry="uncertainty_step"),
+    Step("optimize", "notebooks/05_restoration_planner.py",
+         inputs=[f"{STORE}/{v}" for v in ("SSI", "SSI_ML", "depth", "uncertainty", "shear_stress")]
+         + ["outputs/greifswalder_valid_pixels.npz"],
+         outputs=["outputs/restoration_sites.gpkg", "outputs/restoration_summary.csv",
+                  "outputs/pareto_front.png", "outputs/restoration_map.png"], entry="optimize_step"),
+]
+
+
+# ---------------------------------------------------------------------
+# Fingerprints
+# ---------------------------------------------------------------------
+_IMPORT = re.compile(r"^\s*(?:from|import)\s+libuts\.(\w+)", re.MULTILINE)
+STEP_MODULE = "libuts/steps.py"
+
+
+def _without_functions(source, names):
+    """``source`` with the top-level functions ``names`` removed."""
+    if not names:
+        return source
+    lines = source.splitlines(keepends=True)
+    for node in reversed(ast.parse(source).body):
+        if isinstance(node, ast.FunctionDef) and node.name in names:
+            start = min([node.lineno] + [d.lineno for d in node.decorator_list]) - 1
+            del lines[start:node.end_lineno]
+    return "".join(lines)
+
+
+def code_files(script, root=ROOT, skip=None):
+    """
+    ``{path: source}`` of ``script`` and the ``libuts`` modules it imports, transitively.
+
+    ``skip`` maps a module path to top-level functions left out of its
+    source (and of the import scan), e.g. the other steps' entry points.
+    """
+    skip = skip or {}
+    sources, todo = {}, [script]
+    while todo:
+        rel = todo.pop()
+        path = os.path.join(root, rel)
+        if rel in sources or not os.path.exists(path):
+            continue
+        with open(path, encoding="utf-8") as f:
+            sources[rel] = _without_functions(f.read(), skip.get(rel))
+        todo += [f"libuts/{m}.py" for m in _IMPORT.findall(sources[rel])]
+    return dict(sorted(sources.items()))
+
+
+class FileHashes:
+    """``file_sha256`` memoised on (size, mtime), persisted with the pipeline state."""
+
+    def __init__(self, known=None):
+        self.known = known or {}
+
+    def __call__(self, path):
+        st = os.stat(path)
+        entry = self.known.get(path)
+        if entry and entry["size"] == st.st_size and entry["mtime"] == st.st_mtime:
+            return entry["sha256"]
+        digest = file_sha256(path)
+        self.known[path] = {"size": st.st_size, "mtime": st.st_mtime, "sha256": digest}
+        return digest
+
+
+def _path_digest(path, file_hash):
+    if os.path.isdir(path):
+        h = hashlib.sha256()
+        for base, _, files in sorted(os.walk(path)):
+            for fn in sorted(files):
+                p = os.path.join(base, fn)
+                h.update(os.path.relpath(p, path).encode())
+                h.update(file_hash(p).encode())
+        return h.hexdigest()
+    return file_hash(path) if os.path.exists(path) else "missing"
+
+
+def fingerprint(step, root=ROOT, file_hash=None, steps=()):
+    """
+    SHA-256 over the step's code, input contents and parameters.
+
+    The entry functions of the other ``steps`` are left out of
+    :data:`STEP_MODULE`, so editing one step does not invalidate the rest.
+    """
+    file_hash = file_hash or FileHashes()
+    others = {s.entry for s in steps if s.entry and s.entry != step.entry} | {"run_all", "main"}
+    h = hashlib.sha256()
+    for rel, source in code_files(step.script, root, {STEP_MODULE: others}).items():
+        h.update(f"code:{rel}:{hashlib.sha256(source.encode()).hexdigest()}\n".encode())
+    for rel in sorted(step.inputs):
+        h.update(f"input:{rel}:{_path_digest(os.path.join(root, rel), file_hash)}\n".encode())
+    h.update(json.dumps(step.params, sort_keys=True, default=str).encode())
+    return h.hexdigest()
+
+
+# ---------------------------------------------------------------------
+# Graph
+# ---------------------------------------------------------------------
+def dependencies(steps):
+    """``{name: set of upstream step names}`` from matching inputs to outputs."""
+    producer = {}
+    for s in steps:
+        for out in s.outputs + s.optional:
+            producer[out] = s.name
+    return {s.name: {producer[i] for i in s.inputs if i in producer and producer[i] != s.name}
+            for s in steps}
+
+
+def select(steps, targets):
+    """The ``targets`` and all their upstream steps, in declaration order."""
+    if not targets:
+        return list(steps)
+    names = {s.name for s in steps}
+    unknown = set(targets) - names
+    if unknown:
+        raise ValueError(f"Unknown step(s) {sorted(unknown)}; choose from {[s.name for s in steps]}.")
+    deps = dependencies(steps)
+    keep, todo = set(), list(targets)
+    while todo:
+        n = todo.pop()
+        if n not in keep:
+            keep.add(n)
+            todo += deps[n]
+    return [s for s in steps if s.name in keep]
+
+
+# ---------------------------------------------------------------------
+# Runner
+# ---------------------------------------------------------------------
+def _load_state(path):
+    if os.path.exists(path):
+        with open(path) as f:
+            return json.load(f)
+    return {"steps": {}, "files": {}}
+
+
+def _write_json(path, obj):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path + ".tmp", "w") as f:
+        json.dump(obj, f, indent=1)
+    os.replace(path + ".tmp", path)
+
+
+def run_script(step, root=ROOT):
+    """Default executor: run the step's script with this interpreter from ``root``."""
+    return subprocess.run([sys.executable, step.script], cwd=root).returncode
+
+
+def run(steps=STEPS, targets=None, force=(), dry_run=False, root=ROOT,
+        state_path=STATE, log_path=RUN_LOG, execute=run_script):
+    """
+    Run the invalidated steps among ``targets`` (default: all) and their upstream.
+
+    ``force`` names steps to rerun regardless of their fingerprint (their
+    downstream then reruns only if the outputs changed). ``execute(step,
+    root)`` returns an exit code. Returns one record per step with
+    ``status`` (``"ran"``, ``"cached"``, ``"failed"``, ``"blocked"`` or
+    ``"would run"`` for dry runs), ``seconds`` and ``fingerprint``.
+    """
+    steps = select(steps, targets)
+    deps = dependencies(steps)
+    state_file, log_file = os.path.join(root, state_path), os.path.join(root, log_path)
+    state = _load_state(state_file)
+    hashes = FileHashes({os.path.join(root, k): v for k, v in state.get("files", {}).items()})
+    run_id = uuid.uuid4().hex[:12]
+    records, pending = {}, {s.name: s for s in steps}
+
+    def fresh(step, fp):
+        outputs = [os.path.join(root, o) for o in step.outputs]
+        return (step.name not in force and state["steps"].get(step.name, {}).get("fingerprint") == fp
+                and all(os.path.exists(o) for o in outputs))
+
+    def now():
+        return datetime.now(timezone.utc).isoformat(timespec="milliseconds")
+
+    def finish(step, status, fp, seconds, started=None):
+        finished = now()
+        records[step.name] = {"run_id": run_id, "step": step.name, "status": status,
+                              "seconds": round(seconds, 3), "fingerprint": fp,
+                              "started": started or finished, "finished": finished}
+        print(f"{'✅' if status in ('ran', 'cached') else '🔹' if status == 'would run' else '❌'} "
+              f"{step.name:<12} {status:<9} {seconds:7.1f} s")
+
+    while pending:
+        name = next(n for n in pending if all(d in records for d in deps[n]))
+        step = pending.pop(name)
+        if any(records[d]["status"] in ("failed", "blocked") for d in deps[name]):
+            finish(step, "blocked", None, 0.0)
+            continue
+        t0 = time.perf_counter()
+        fp = fingerprint(step, root, hashes, steps)
+        if dry_run and any(records[d]["status"] == "would run" for d in deps[name]):
+            finish(step, "would run", None, 0.0)
+        elif fresh(step, fp):
+            finish(step, "cached", fp, time.perf_counter() - t0)
+        elif dry_run:
+            finish(step, "would run", fp, 0.0)
+        else:
+            started, t0 = now(), time.perf_counter()
+            try:
+                ok = execute(step, root) == 0
+            except Exception as exc:
+                print(f"❌ {step.name}: {exc}")
+                ok = False
+            if ok:
+                state["steps"][step.name] = {"fingerprint": fp}
+            else:
+                state["steps"].pop(step.name, None)
+            finish(step, "ran" if ok else "failed", fp, time.perf_counter() - t0, started)
+
+    result = [records[s.name] for s in steps]
+    if not dry_run:
+        state["files"] = {os.path.relpath(k, root): v for k, v in hashes.known.items()}
+        _write_json(state_file, state)
+        os.makedirs(os.path.dirname(log_file) or ".", exist_ok=True)
+        with open(log_file, "a") as f:
+            for rec in result:
+                f.write(json.dumps(rec) + "\n")
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m libuts.pipeline", description=__doc__.split("\n\n")[0])
+    parser.add_argument("targets", nargs="*", help=f"steps to bring up to date ({', '.join(s.name for s in STEPS)})")
+    parser.add_argument("--force", action="append", default=[], metavar="STEP",
+                        help="rerun this step regardless (repeatable)")
+    parser.add_argument("-n", "--dry-run", action="store_true", help="only report what would run")
+    args = parser.parse_args(argv)
+    t0 = time.perf_counter()
+    records = run(targets=args.targets, force=set(args.force), dry_run=args.dry_run)
+    counts = {s: sum(r["status"] == s for r in records) for s in dict.fromkeys(r["status"] for r in records)}
+    print(f"🔹 Pipeline: {', '.join(f'{n} {s}' for s, n in counts.items())} in {time.perf_counter() - t0:.1f} s")
+    return int(any(r["status"] in ("failed", "blocked") for r in records))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,144 @@
+"""
+Per-cell NASA POWER PAR grid.
+
+One POWER point request per ~0.5° node over the AOI, sent through a pooled
+``requests.Session`` with bounded concurrency, retries and an on-disk
+response cache, then interpolated onto the OLCI grid.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import requests
+import xarray as xr
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+POWER_URL = "https://power.larc.nasa.gov/api/temporal/daily/point"
+SWRAD_TO_PAR = 0.45
+FILL_VALUE = -999.0
+
+
+def power_nodes(aoi, step=0.5):
+    """Node latitudes and longitudes spanning the AOI at roughly ``step`` degrees."""
+    def axis(lo, hi):
+        n = max(2, int(np.ceil((hi - lo) / step)) + 1)
+        return np.round(np.linspace(lo, hi, n), 4)
+    return axis(aoi["lat_min"], aoi["lat_max"]), axis(aoi["lon_min"], aoi["lon_max"])
+
+
+class PowerClient:
+    """
+    Pooled, cached client for the POWER daily point API.
+
+    With ``offline=True`` requests missing from the cache raise instead of
+    being sent.
+    """
+
+    def __init__(self, base_url=POWER_URL, cache_dir="data/cache/power",
+                 max_workers=8, retries=3, backoff=0.5, timeout=30, offline=False):
+        self.base_url = base_url
+        self.cache_dir = cache_dir
+        self.offline = offline
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=1, pool_maxsize=max_workers,
+            max_retries=Retry(total=retries, backoff_factor=backoff,
+                              status_forcelist=(429, 500, 502, 503, 504)),
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.stats = {"requests": 0, "cache_hits": 0, "seconds": 0.0}
+        self._lock = threading.Lock()
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def _params(self, lat, lon, start, end):
+        return {
+            "parameters": "ALLSKY_SFC_SW_DWN", "community": "AG",
+            "longitude": f"{lon:.4f}", "latitude": f"{lat:.4f}",
+            "start": start.replace("-", ""), "end": end.replace("-", ""),
+            "format": "JSON",
+        }
+
+    def _get(self, params):
+        key = hashlib.sha1(json.dumps([self.base_url, params], sort_keys=True).encode()).hexdigest()
+        fn = os.path.join(self.cache_dir, f"{key}.json") if self.cache_dir else None
+        if fn and os.path.exists(fn):
+            with self._lock:
+                self.stats["cache_hits"] += 1
+            with open(fn) as f:
+                return json.load(f)
+        if self.offline:
+            raise RuntimeError(
+                f"POWER request for ({params['latitude']}, {params['longitude']}) "
+                f"{params['start']}–{params['end']} not cached and the client is offline."
+            )
+
+        r = self.session.get(self.base_url, params=params, timeout=self.timeout)
+        r.raise_for_status()
+        payload = r.json()
+        with self._lock:
+            self.stats["requests"] += 1
+        if fn:
+            with open(fn + ".tmp", "w") as f:
+                json.dump(payload, f)
+            os.replace(fn + ".tmp", fn)
+        return payload
+
+    def mean_par(self, lat, lon, start, end):
+        """Period-mean PAR (E m⁻² d⁻¹) at one point."""
+        payload = self._get(self._params(lat, lon, start, end))
+        daily = np.array(list(payload["properties"]["parameter"]["ALLSKY_SFC_SW_DWN"].values()), float)
+        daily = daily[daily > FILL_VALUE]
+        return float(daily.mean()) * SWRAD_TO_PAR if daily.size else np.nan
+
+    def par_grid(self, aoi, start, end, step=0.5):
+        """PAR on the POWER node grid as a ``(lat, lon)`` DataArray."""
+        lats, lons = power_nodes(aoi, step)
+        jobs = [(la, lo) for la in lats for lo in lons]
+        t0 = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            vals = list(pool.map(lambda p: self.mean_par(p[0], p[1], start, end), jobs))
+        self.stats["seconds"] += time.perf_counter() - t0
+        return xr.DataArray(
+            np.array(vals).reshape(len(lats), len(lons)),
+            dims=("lat", "lon"), coords={"lat": lats, "lon": lons},
+            name="PAR_surface", attrs={"units": "E m⁻² d⁻¹"},
+        )
+
+    def summary(self):
+        """Requests per second and cache hit rate since the client was created."""
+        s = self.stats
+        total = s["requests"] + s["cache_hits"]
+        return {
+            "requests": s["requests"],
+            "cache_hits": s["cache_hits"],
+            "requests_per_s": s["requests"] / s["seconds"] if s["seconds"] else 0.0,
+            "cache_hit_rate": s["cache_hits"] / total if total else 0.0,
+        }
+
+
+def interp_to_grid(par, lat, lon):
+    """
+    Bilinearly interpolate a node grid onto the target ``lat``/``lon`` vectors.
+
+    Targets outside the node hull take the nearest edge value. The result
+    uses the target coordinate names (e.g. ``latitude``/``longitude``).
+    """
+    lat_t = np.clip(lat.values, float(par.lat.min()), float(par.lat.max()))
+    lon_t = np.clip(lon.values, float(par.lon.min()), float(par.lon.max()))
+    out = par.interp(
+        lat=xr.DataArray(lat_t, dims=lat.dims),
+        lon=xr.DataArray(lon_t, dims=lon.dims),
+        method="linear",
+    )
+    out = out.drop_vars(["lat", "lon"], errors="ignore")
+    return out.assign_coords({lat.dims[0]: lat.values, lon.dims[0]: lon.values})
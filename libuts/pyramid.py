@@ -0,0 +1,109 @@
+"""
+Multi-resolution tile pyramid for the Spatial Explorer.
+
+Each variable is written at full resolution and at successive 2× mean
+overviews into one chunked Zarr store (one group per level). The map picks
+the coarsest level that still has at least one cell per screen pixel for
+the current viewport and reads only the chunks it covers, so pan and zoom
+cost stays roughly constant as the dataset grows.
+"""
+
+import os
+import shutil
+
+import numpy as np
+import xarray as xr
+
+CHUNK = 256
+
+
+def _spatial_dims(da):
+    lat = [d for d in da.dims if "lat" in d.lower()][0]
+    lon = [d for d in da.dims if "lon" in d.lower()][0]
+    return lat, lon
+
+
+def build_pyramid(ds, path, variables=None, chunk=CHUNK, min_size=CHUNK):
+    """
+    Write ``ds[variables]`` and its 2× overviews to the Zarr store at ``path``.
+
+    Levels are added until both dimensions fit in ``min_size`` cells. Each
+    overview is coarsened from the previous level, read back lazily from
+    the store. Returns the level metadata also kept in the root attributes.
+    """
+    import zarr
+
+    variables = variables or [v for v in ds.data_vars if ds[v].ndim == 2]
+    lat, lon = _spatial_dims(ds[variables[0]])
+    if os.path.exists(path):
+        shutil.rmtree(path)
+
+    levels = []
+    level = ds[variables]
+    factor = 1
+    while True:
+        name = f"level_{len(levels)}"
+        level = level.chunk({lat: chunk, lon: chunk})
+        level.to_zarr(path, group=name, mode="w", consolidated=False)
+        levels.append({
+            "group": name, "factor": factor,
+            "shape": [level.sizes[lat], level.sizes[lon]],
+            "dlat": float(abs(np.diff(level[lat].values[:2])[0])) if level.sizes[lat] > 1 else 0.0,
+            "dlon": float(abs(np.diff(level[lon].values[:2])[0])) if level.sizes[lon] > 1 else 0.0,
+        })
+        if max(level.sizes[lat], level.sizes[lon]) <= min_size:
+            break
+        prev = xr.open_zarr(path, group=name, consolidated=False)
+        level = prev.coarsen({lat: 2, lon: 2}, boundary="trim").mean()
+        factor *= 2
+
+    root = zarr.open_group(path, mode="a")
+    root.attrs.update({"levels": levels, "variables": variables, "dims": [lat, lon]})
+    return levels
+
+
+class Pyramid:
+    """Read side of :func:`build_pyramid`: lazy levels plus viewport selection."""
+
+    def __init__(self, path):
+        import zarr
+        self.path = path
+        attrs = dict(zarr.open_group(path, mode="r").attrs)
+        self.levels = attrs["levels"]
+        self.variables = attrs["variables"]
+        self.lat, self.lon = attrs["dims"]
+        self._open = {}
+
+    def level(self, i):
+        if i not in self._open:
+            self._open[i] = xr.open_zarr(self.path, group=self.levels[i]["group"], consolidated=False)
+        return self._open[i]
+
+    def select_level(self, x_range, y_range, width, height):
+        """Coarsest level whose cells are no larger than one screen pixel."""
+        px_lon = abs(x_range[1] - x_range[0]) / max(width, 1)
+        px_lat = abs(y_range[1] - y_range[0]) / max(height, 1)
+        best = 0
+        for i, lv in enumerate(self.levels):
+            if lv["dlon"] <= px_lon and lv["dlat"] <= px_lat:
+                best = i
+        return best
+
+    def view(self, var, x_range=None, y_range=None, width=850, height=600):
+        """``var`` over the viewport at the matching level (full extent when ranges are None)."""
+        base = self.level(0)
+        if x_range is None or y_range is None:
+            x_range = (float(base[self.lon].min()), float(base[self.lon].max()))
+            y_range = (float(base[self.lat].min()), float(base[self.lat].max()))
+        i = self.select_level(x_range, y_range, width, height)
+        lv = self.levels[i]
+        da = self.level(i)[var]
+        # One cell of padding so edge pixels are not clipped while panning
+        x0, x1 = sorted(x_range)
+        y0, y1 = sorted(y_range)
+        xs = slice(x0 - lv["dlon"], x1 + lv["dlon"])
+        lat_v = da[self.lat].values
+        ys = slice(y0 - lv["dlat"], y1 + lv["dlat"])
+        if lat_v[0] > lat_v[-1]:
+            ys = slice(ys.stop, ys.start)
+        return da.sel({self.lon: xs, self.lat: ys}).load(), i
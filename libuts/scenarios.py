@@ -0,0 +1,83 @@
+"""
+Batched what-if scenarios for the Step 2 light budget.
+
+N scenarios (SSI weight sets, KD490 scale factors, depth offsets) are
+evaluated in one vectorised broadcast along a ``scenario`` dimension.
+Normalisation bounds are taken per scenario, so scenario 0 with the
+default settings reproduces Step 2 exactly.
+"""
+
+import numpy as np
+import xarray as xr
+
+from .physics import SSI_WEIGHTS, euphotic_depth, par_at_bed, suitability
+
+SUITABLE_SSI = 0.15   # same cut-off as the Step 4 classification target
+
+
+def scenario_table(weights=None, kd_scale=1.0, depth_offset=0.0):
+    """
+    Build a scenario table as a Dataset along ``scenario``.
+
+    ``weights`` is an ``(N, 3)`` array of (PAR_bed, Zeu, |depth|) weights;
+    ``kd_scale`` multiplies KD490 (0.8 = 20 % less turbid) and
+    ``depth_offset`` is added to the (negative) depth in metres, so a
+    negative offset deepens the water column. Scalars broadcast to N.
+    """
+    weights = np.atleast_2d(SSI_WEIGHTS if weights is None else weights).astype(float)
+    kd_scale = np.atleast_1d(kd_scale).astype(float)
+    depth_offset = np.atleast_1d(depth_offset).astype(float)
+    n = max(len(weights), len(kd_scale), len(depth_offset))
+    weights = np.broadcast_to(weights, (n, 3))
+    return xr.Dataset(
+        {
+            "w_par": ("scenario", weights[:, 0]),
+            "w_zeu": ("scenario", weights[:, 1]),
+            "w_depth": ("scenario", weights[:, 2]),
+            "kd_scale": ("scenario", np.broadcast_to(kd_scale, n)),
+            "depth_offset": ("scenario", np.broadcast_to(depth_offset, n)),
+        },
+        coords={"scenario": np.arange(n)},
+    )
+
+
+def evaluate_scenarios(ds, scenarios, chunk=None):
+    """
+    Zeu, PAR_bed and SSI for every scenario of ``scenarios`` at once.
+
+    ``ds`` holds the Step 1 layers KD490, PAR_surface and depth. With
+    ``chunk`` the scenario axis is split into dask chunks of that size and
+    the result stays lazy, which keeps thousands of scenarios in bounded
+    memory.
+    """
+    if chunk:
+        scenarios = scenarios.chunk({"scenario": chunk})
+    spatial = [d for d in ds["KD490"].dims if d != "scenario"]
+
+    kd = ds["KD490"] * scenarios["kd_scale"]
+    depth = ds["depth"] + scenarios["depth_offset"]
+    zeu = euphotic_depth(kd)
+    par_bed = par_at_bed(ds["PAR_surface"], kd, depth)
+    abs_depth = abs(depth)
+    bounds = [(x.min(spatial), x.max(spatial)) for x in (par_bed, zeu, abs_depth)]
+    weights = (scenarios["w_par"], scenarios["w_zeu"], scenarios["w_depth"])
+    ssi = suitability(par_bed, zeu, depth, weights=weights, bounds=bounds)
+
+    order = ["scenario", *spatial]
+    out = xr.Dataset({
+        "Zeu": zeu.transpose(*order),
+        "PAR_bed": par_bed.transpose(*order),
+        "SSI": ssi.transpose(*order),
+    })
+    return out.assign_coords({k: scenarios[k] for k in scenarios.data_vars})
+
+
+def scenario_summary(result, cutoff=SUITABLE_SSI):
+    """Per-scenario mean SSI and share of valid pixels with SSI above ``cutoff``."""
+    spatial = [d for d in result["SSI"].dims if d != "scenario"]
+    ssi = result["SSI"]
+    valid = ssi.notnull().sum(spatial)
+    return xr.Dataset({
+        "SSI_mean": ssi.mean(spatial),
+        "suitable_fraction": (ssi > cutoff).sum(spatial) / valid,
+    }).to_dataframe()
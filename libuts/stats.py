@@ -0,0 +1,223 @@
+"""
+Streaming, mergeable statistics cache for the dashboard.
+
+Moments (Welford/Chan), the correlation co-moment matrix over complete
+rows and fixed-bin histograms for quantiles are accumulated over row bands
+of a NetCDF file, so no full ``to_dataframe()`` copy is made. The result is
+stored as ``<file>.stats.json`` next to the NetCDF (or Zarr store) and
+refreshed only when the source's hash changes.
+"""
+
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import xarray as xr
+
+QUANTILES = (0.25, 0.5, 0.75)
+
+
+class Moments:
+    """Mergeable count / mean / M2 / min / max for ``k`` columns (NaN skipped per column)."""
+
+    def __init__(self, k):
+        self.n = np.zeros(k)
+        self.mean = np.zeros(k)
+        self.m2 = np.zeros(k)
+        self.min = np.full(k, np.inf)
+        self.max = np.full(k, -np.inf)
+
+    def update(self, X):
+        valid = np.isfinite(X)
+        nb = valid.sum(axis=0).astype(float)
+        safe = np.where(nb > 0, nb, 1)
+        mean_b = np.where(valid, X, 0).sum(axis=0) / safe
+        m2_b = (np.where(valid, X - mean_b, 0) ** 2).sum(axis=0)
+        self.merge_parts(nb, mean_b, m2_b)
+        self.min = np.fmin(self.min, np.where(valid, X, np.inf).min(axis=0))
+        self.max = np.fmax(self.max, np.where(valid, X, -np.inf).max(axis=0))
+
+    def merge_parts(self, nb, mean_b, m2_b):
+        n = self.n + nb
+        safe = np.where(n > 0, n, 1)
+        delta = mean_b - self.mean
+        self.mean = self.mean + delta * nb / safe
+        self.m2 = self.m2 + m2_b + delta ** 2 * self.n * nb / safe
+        self.n = n
+
+    def std(self):
+        return np.sqrt(self.m2 / np.where(self.n > 1, self.n - 1, np.nan))
+
+
+class CoMoments:
+    """Mergeable mean vector and co-moment matrix over rows complete in every column."""
+
+    def __init__(self, k):
+        self.n = 0
+        self.mean = np.zeros(k)
+        self.c = np.zeros((k, k))
+
+    def update(self, X):
+        X = X[np.isfinite(X).all(axis=1)]
+        if len(X) == 0:
+            return
+        nb, mean_b = len(X), X.mean(axis=0)
+        d = X - mean_b
+        n = self.n + nb
+        delta = mean_b - self.mean
+        self.c += d.T @ d + np.outer(delta, delta) * self.n * nb / n
+        self.mean += delta * nb / n
+        self.n = n
+
+    def corr(self):
+        sd = np.sqrt(np.diag(self.c))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return self.c / np.outer(sd, sd)
+
+
+def _bands(ds, variables, rows):
+    y_dim = ds[variables[0]].dims[0]
+    for r0 in range(0, ds.sizes[y_dim], rows):
+        band = ds[variables].isel({y_dim: slice(r0, r0 + rows)}).load()
+        yield np.stack([band[v].values.ravel() for v in variables], axis=1).astype(float)
+
+
+def _hist_quantiles(counts, lo, hi, qs):
+    """Quantiles from a fixed-bin histogram by linear interpolation within bins."""
+    total = counts.sum()
+    if total == 0:
+        return [np.nan] * len(qs)
+    edges = np.linspace(lo, hi, len(counts) + 1)
+    cdf = np.concatenate([[0], np.cumsum(counts)]) / total
+    return [float(np.interp(q, cdf, edges)) for q in qs]
+
+
+def _open(path):
+    return xr.open_zarr(path, consolidated=True) if os.path.isdir(path) else xr.open_dataset(path)
+
+
+def compute_stats(path, variables=None, rows=256, bins=4096):
+    """Summary table and correlation matrix of the 2-D variables in ``path`` (NetCDF or Zarr store)."""
+    with _open(path) as ds:
+        if variables is None:
+            variables = [v for v in ds.data_vars if ds[v].ndim == 2]
+        k = len(variables)
+        mom, com = Moments(k), CoMoments(k)
+        for X in _bands(ds, variables, rows):
+            mom.update(X)
+            com.update(X)
+
+        # Second pass: histograms on the now known per-variable range
+        lo = np.where(np.isfinite(mom.min), mom.min, 0.0)
+        hi = np.where(mom.max > lo, mom.max, lo + 1.0)
+        hist = np.zeros((k, bins))
+        for X in _bands(ds, variables, rows):
+            for j in range(k):
+                col = X[:, j]
+                hist[j] += np.histogram(col[np.isfinite(col)], bins=bins, range=(lo[j], hi[j]))[0]
+
+    std = mom.std()
+    summary = {}
+    for j, v in enumerate(variables):
+        q = _hist_quantiles(hist[j], lo[j], hi[j], QUANTILES)
+        summary[v] = {
+            "count": float(mom.n[j]), "mean": float(mom.mean[j]) if mom.n[j] else np.nan,
+            "std": float(std[j]), "min": float(mom.min[j]) if mom.n[j] else np.nan,
+            "25%": q[0], "50%": q[1], "75%": q[2],
+            "max": float(mom.max[j]) if mom.n[j] else np.nan,
+        }
+    return {
+        "variables": variables,
+        "summary": summary,
+        "corr": com.corr().tolist(),
+        "complete_rows": int(com.n),
+    }
+
+
+def file_sha256(path, block=1 << 20):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(block), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def stats_path(path):
+    return os.path.splitext(path)[0] + ".stats.json"
+
+
+def _source_files(path, variables=None):
+    if not os.path.isdir(path):
+        return [path]
+    roots = [os.path.join(path, v) for v in variables] if variables else [path]
+    return sorted(os.path.join(b, f) for r in roots for b, _, files in os.walk(r) for f in files)
+
+
+def source_state(path, variables=None):
+    """``(size, mtime)`` of a file, or of the ``variables`` of a Zarr store (total / latest)."""
+    st = [os.stat(f) for f in _source_files(path, variables)]
+    return sum(s.st_size for s in st), max((s.st_mtime for s in st), default=0.0)
+
+
+def source_sha256(path, variables=None):
+    """Content hash of a file, or of the ``variables`` of a Zarr store."""
+    if not os.path.isdir(path):
+        return file_sha256(path)
+    h = hashlib.sha256()
+    for f in _source_files(path, variables):
+        h.update(os.path.relpath(f, path).encode())
+        h.update(file_sha256(f).encode())
+    return h.hexdigest()
+
+
+def load_or_compute_stats(path, **kwargs):
+    """
+    Cached :func:`compute_stats` for ``path``.
+
+    The cache is reused while the source hash matches; size and mtime are
+    checked first so an untouched file is not rehashed on every read. For
+    a Zarr store only the requested ``variables`` count, so other steps
+    appending to the store do not invalidate the cache.
+    """
+    cache = stats_path(path)
+    variables = kwargs.get("variables")
+    size, mtime = source_state(path, variables)
+    if os.path.exists(cache):
+        with open(cache) as f:
+            cached = json.load(f)
+        src = cached.get("source", {})
+        same_vars = variables is None or cached.get("variables") == list(variables)
+        if same_vars and src.get("size") == size and src.get("mtime") == mtime:
+            return cached
+        digest = source_sha256(path, variables)
+        if same_vars and src.get("sha256") == digest:
+            cached["source"].update(size=size, mtime=mtime)
+            _write(cache, cached)
+            return cached
+    else:
+        digest = source_sha256(path, variables)
+
+    stats = compute_stats(path, **kwargs)
+    stats["source"] = {"path": os.path.basename(path), "sha256": digest, "size": size, "mtime": mtime}
+    _write(cache, stats)
+    return stats
+
+
+def _write(fn, obj):
+    with open(fn + ".tmp", "w") as f:
+        json.dump(obj, f, indent=1, allow_nan=True)
+    os.replace(fn + ".tmp", fn)
+
+
+def summary_frame(stats):
+    """``describe()``-style table: one row per variable."""
+    df = pd.DataFrame(stats["summary"]).T
+    return df.reset_index().rename(columns={"index": "Variable"})
+
+
+def corr_frame(stats):
+    """Correlation matrix as a square DataFrame."""
+    v = stats["variables"]
+    return pd.DataFrame(stats["corr"], index=v, columns=v)
@@ -0,0 +1,644 @@
+"""
+Steps 1–5 as importable functions.
+
+Each step takes the previous step's results either in memory (an
+``xarray.Dataset``) or as a path, and returns a namespace with its
+results. ``save`` makes the step append the variables it produces to the
+shared Zarr store (:mod:`libuts.store`) and write its other outputs under
+the paths of :func:`step_paths`; ``netcdf`` additionally writes the
+legacy per-step NetCDFs. Without ``save`` nothing is written except the
+model, SHAP and planner-checkpoint caches. :func:`run_all` chains the
+steps in one process, so datasets pass between steps without disk
+round-trips, and Step 3 merges the already aligned Step 1 and Step 2
+grids without re-interpolating them.
+
+The ``notebooks/`` scripts are thin wrappers around these functions;
+``python -m libuts.steps`` runs the whole chain.
+"""
+
+import argparse
+import os
+import time
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import xarray as xr
+
+from libuts.store import (STEP_VARIABLES, ML_DATASET, open_store, store_variables, variables_through,
+                          write_variables)
+from libuts.streaming import peak_rss_mb
+
+OUT_DIR = "outputs"
+PREFIX = "greifswalder"
+STEP_NAMES = ("inputs", "physics", "ml", "uncertainty", "optimize")
+
+AOI = dict(lon_min=13.3, lon_max=13.7, lat_min=54.0, lat_max=54.4)
+START, END = "2024-07-01", "2024-07-31"
+GEBCO = "data/gebco_2025.nc"
+
+
+def step_paths(out_dir=OUT_DIR, prefix=PREFIX):
+    """Output paths of every step for one output directory and file prefix."""
+    def p(name):
+        return os.path.join(out_dir, name)
+    return SimpleNamespace(
+        out_dir=out_dir, store=p(f"{prefix}_store.zarr"),
+        inputs=p(f"{prefix}_inputs.nc"), kd_daily=p(f"{prefix}_kd490_daily.nc"),
+        inputs_stats=p(f"{prefix}_inputs_stats.nc"),
+        physics=p(f"{prefix}_step2_physics.nc"), physics_daily=p(f"{prefix}_step2_daily.nc"),
+        ml=p(f"{prefix}_step3_ml.nc"), ssi_ml=p(f"{prefix}_ssi_ml.npy"),
+        valid_pixels=p(f"{prefix}_valid_pixels.npz"), pyramid=p(f"{prefix}_pyramid.zarr"),
+        models=p("models"), explanations=p("explanations"), shap_summary=p("shap_summary.png"),
+        enriched=p(f"{prefix}_step4_physics_uncertainty.nc"), uncertainty_csv=p(f"{prefix}_uncertainty.csv"),
+        checkpoint=p("planner_checkpoint.npz"), pareto=p("pareto_front.png"),
+        sites=p("restoration_sites.gpkg"), summary=p("restoration_summary.csv"), map=p("restoration_map.png"),
+    )
+
+
+def _open(obj, variables=None):
+    """Dataset, NetCDF path or (lazily, only ``variables``) Zarr store path."""
+    if not isinstance(obj, (str, os.PathLike)):
+        return obj
+    if os.path.isdir(obj):
+        return open_store(obj, variables)
+    return xr.open_dataset(obj)
+
+
+def _stored(inputs, store):
+    """
+    The store as read after a skipped step, with the Step 1 variables of
+    ``inputs`` merged in when they were given rather than retrieved.
+    """
+    if isinstance(inputs, (str, os.PathLike)) and os.path.abspath(inputs) == os.path.abspath(store):
+        return store
+    step1 = harmonize_coords(_open(inputs, STEP_VARIABLES["inputs"])[STEP_VARIABLES["inputs"]])
+    return xr.merge([step1, open_store(store)], join="override", compat="override")
+
+
+def _daily_cube(obj):
+    ds = _open(obj, ["KD490_daily"])
+    return ds.rename(KD490_daily="KD490") if "KD490_daily" in ds else ds
+
+
+def _figure(fig, path, save, show):
+    import matplotlib.pyplot as plt
+    fig.tight_layout()
+    if save:
+        fig.savefig(path, dpi=300)
+    if show:
+        plt.show()
+    plt.close(fig)
+
+
+# ---------------------------------------------------------------------
+# Step 1 — inputs
+# ---------------------------------------------------------------------
+def retrieve_inputs(aoi=AOI, start=START, end=END, username=None, password=None, gebco_path=GEBCO,
+                    cache_dir="data/cache/cmems", power_cache_dir="data/cache/power",
+                    streaming=True, budget_mb=512, save_daily=True, offline=False, title="Greifswalder Bodden",
+                    save=True, netcdf=False, paths=None):
+    """
+    Copernicus Marine optics, NASA POWER PAR and GEBCO depth on the OLCI grid.
+
+    ``offline`` reads only from the subset and POWER caches and raises on
+    anything not cached. Returns ``ds`` (temporal means + PAR_surface + depth), ``daily`` (the
+    daily KD490 cube, lazily read from the subset cache) and ``stats``
+    (per-pixel valid-day count / min / max; streaming mode only).
+    """
+    from libuts.bathymetry import gebco_on_grid
+    from libuts.cache import SubsetCache, copernicus_reader
+    from libuts.power import PowerClient, interp_to_grid
+    from libuts.streaming import stream_reduce
+
+    paths = paths or step_paths()
+    cache = SubsetCache(cache_dir, reader=copernicus_reader(username, password), offline=offline)
+
+    print("🔹 Fetching KD490 + optical coefficients from Copernicus Marine …")
+    kd_ds = cache.open("cmems_obs-oc_bal_bgc-transp_nrt_l3-olci-300m_P1D", ["KD490"], aoi, start, end)
+    optics_ds = cache.open("cmems_obs-oc_bal_bgc-optics_nrt_l3-olci-300m_P1D",
+                           ["ADG443", "APH443", "BBP443"], aoi, start, end)
+    stats = None
+    if streaming:
+        kd_stats = stream_reduce(kd_ds, ["KD490"], budget_mb=budget_mb)
+        optics_stats = stream_reduce(optics_ds, ["ADG443", "APH443", "BBP443"], budget_mb=budget_mb)
+        kd = kd_stats["KD490"]
+        adg, aph, bbp = (optics_stats[v] for v in ["ADG443", "APH443", "BBP443"])
+        print(f"   streamed in blocks of {optics_stats.attrs['block']} — peak RSS {peak_rss_mb():.0f} MB")
+        stats = xr.merge([kd_stats.drop_vars("KD490"), optics_stats.drop_vars(["ADG443", "APH443", "BBP443"])])
+    else:
+        kd = kd_ds["KD490"].mean("time").rename("KD490")
+        adg, aph, bbp = (optics_ds[v].mean("time").rename(v) for v in ["ADG443", "APH443", "BBP443"])
+
+    print("🔹 Fetching PAR_surface from NASA POWER …")
+    lon_name = [c for c in kd.coords if "lon" in c.lower()][0]
+    lat_name = [c for c in kd.coords if "lat" in c.lower()][0]
+    power = PowerClient(cache_dir=power_cache_dir, max_workers=8, offline=offline)
+    par_nodes = power.par_grid(aoi, start, end, step=0.5)
+    par_surface = interp_to_grid(par_nodes, kd[lat_name], kd[lon_name]).rename("PAR_surface")
+    par_surface.attrs["units"] = "E m⁻² d⁻¹"
+    power_stats = power.summary()
+    print(f"   {par_nodes.size} POWER nodes — {power_stats['requests_per_s']:.1f} req/s, "
+          f"cache hit rate {power_stats['cache_hit_rate']:.0%}")
+
+    print("🔹 Reading and clipping GEBCO 2025 bathymetry …")
+    depth = gebco_on_grid(gebco_path, kd[lat_name], kd[lon_name]).rename("depth")
+    depth.attrs.update({"units": "m", "long_name": "Seafloor elevation (GEBCO 2025)"})
+    depth = depth.where(depth < 0)
+    depth.attrs["comment"] = "Positive values masked (land)"
+
+    print("🔹 Merging all layers …")
+    ds = xr.merge([kd, adg, aph, bbp, par_surface, depth])
+    ds.attrs.update({
+        "AOI": title,
+        "period": f"{start} – {end} (real data)",
+        "source": "Copernicus Marine OLCI + NASA POWER + GEBCO 2025",
+        "note": "Clean harmonized dataset (land masked, single output)",
+    })
+    daily = kd_ds[["KD490"]] if save_daily else None
+
+    if save:
+        os.makedirs(paths.out_dir, exist_ok=True)
+        write_variables(ds, paths.store, STEP_VARIABLES["inputs"], step="inputs", replace_grid=True)
+        print(f"✅ Saved clean harmonized dataset → {paths.store}")
+        if daily is not None:
+            write_variables(daily.rename(KD490="KD490_daily"), paths.store, STEP_VARIABLES["inputs_daily"],
+                            step="inputs", replace_grid=True)
+            print(f"✅ Saved daily KD490 cube → {paths.store}/KD490_daily")
+        if netcdf:
+            ds.to_netcdf(paths.inputs)
+            if daily is not None:
+                daily.to_netcdf(paths.kd_daily)
+        if stats is not None:
+            stats.to_netcdf(paths.inputs_stats)
+            print(f"✅ Saved temporal statistics → {paths.inputs_stats}")
+    print(f"🔹 Peak RSS: {peak_rss_mb():.0f} MB")
+    return SimpleNamespace(ds=ds, daily=daily, stats=stats)
+
+
+# ---------------------------------------------------------------------
+# Step 2 — physics
+# ---------------------------------------------------------------------
+def physics_step(inputs, daily=None, tile=1024, time_resolved=True, save=True, netcdf=False, show=False,
+                 paths=None):
+    """
+    Zeu, PAR_bed and SSI (tiled with dask, ``tile`` × ``tile``) for the Step 1 dataset.
+
+    With ``time_resolved`` and a daily KD490 cube (``KD490`` or the store's
+    ``KD490_daily``), also the per-pixel daily light metrics. Returns
+    ``ds`` and ``daily`` (or ``None``), both lazy (dask-backed).
+    """
+    import dask
+
+    from libuts.physics import daily_physics, light_budget
+
+    paths = paths or step_paths()
+    ds = _open(inputs, ["KD490", "PAR_surface", "depth"])
+    spatial = [d for d in ds["KD490"].dims if d != "time"]
+    # Lazy: the store (and NetCDF) writes stream tile by tile, downstream steps compute what they read
+    out = light_budget(ds.chunk({d: tile for d in spatial}))
+    if save:
+        write_variables(out, paths.store, STEP_VARIABLES["physics"], step="physics")
+        if netcdf:
+            out.to_netcdf(paths.physics)
+    print(f"✅ Step 2 completed → {os.path.basename(paths.store)}")
+
+    light = None
+    daily = _daily_cube(daily) if daily is not None else None
+    if time_resolved and daily is not None:
+        # Lazy like ``out``: written per spatial chunk over the full time axis
+        light = daily_physics(ds, daily)
+        means = light["PAR_bed_daily_mean"], out["PAR_bed"]
+        if save:
+            write_variables(light, paths.store, STEP_VARIABLES["physics_daily"], step="physics")
+            if netcdf:
+                light.to_netcdf(paths.physics_daily)
+            stored = open_store(paths.store, ["PAR_bed_daily_mean", "PAR_bed"])    # no second pass over the cube
+            means = stored["PAR_bed_daily_mean"], stored["PAR_bed"]
+        print(f"✅ Time-resolved light budget → {os.path.basename(paths.store)}")
+        daily_mean, static_mean = (float(v) for v in dask.compute(*(m.mean() for m in means)))
+        print(f"   mean of daily PAR_bed {daily_mean:.2f} vs PAR_bed of mean KD490 {static_mean:.2f} E m⁻² d⁻¹")
+
+    if show:
+        import matplotlib.pyplot as plt
+        fig, axs = plt.subplots(1, 3, figsize=(15, 4))
+        out["Zeu"].plot(ax=axs[0], cmap="viridis")
+        axs[0].set_title("Euphotic Depth (m)")
+        out["PAR_bed"].plot(ax=axs[1], cmap="plasma")
+        axs[1].set_title("PAR at Bed (E m⁻² d⁻¹)")
+        out["SSI"].plot(ax=axs[2], cmap="YlGn")
+        axs[2].set_title("Seagrass Suitability Index")
+        _figure(fig, None, False, show)
+    return SimpleNamespace(ds=out, daily=light)
+
+
+# ---------------------------------------------------------------------
+# Step 3 — ML + SHAP
+# ---------------------------------------------------------------------
+def harmonize_coords(ds):
+    """Short ``lat`` / ``lon`` names, without duplicate coordinates or ``crs``."""
+    if "lat" in ds.coords and "latitude" in ds.coords:
+        ds = ds.drop_vars("lat")
+    if "lon" in ds.coords and "longitude" in ds.coords:
+        ds = ds.drop_vars("lon")
+    ds = ds.rename({k: v for k, v in {"latitude": "lat", "longitude": "lon"}.items() if k in ds.dims or k in ds.coords})
+    return ds.drop_vars(["crs"], errors="ignore")
+
+
+def align(ds, like):
+    """``ds`` on the grid of ``like``; nearest-neighbour only when the coordinates differ."""
+    if all(np.array_equal(ds[c].values, like[c].values) for c in ("lat", "lon")):
+        return ds
+    return ds.interp(lat=like["lat"], lon=like["lon"], method="nearest")
+
+
+def ml_step(inputs, physics, rows_per_chunk=128, n_workers=None, shap_samples=2000, rf_params=None,
+            save=True, netcdf=False, show=False, paths=None):
+    """
+    Random Forest SSI_ML, valid-pixel index and SHAP explanation.
+
+    ``inputs`` / ``physics`` are the Step 1 / Step 2 datasets or paths.
+    Inference runs across a process pool on the Step 1 NetCDF (or store)
+    when ``inputs`` is a path, and in-process on the merged grid otherwise.
+    Returns ``ds`` (Step 1 optics + Step 2 fields + SSI_ML), ``pixels``,
+    ``meta`` (model) and ``explanation``.
+    """
+    from sklearn.metrics import mean_absolute_error, r2_score
+
+    from libuts.explain import compute_explanation
+    from libuts.grid import ValidPixelIndex
+    from libuts.ml import FEATURES, RF_PARAMS, load_or_train, predict_grid
+
+    paths = paths or step_paths()
+    optics, fields = ["KD490", "ADG443", "APH443", "BBP443"], ["SSI", "Zeu", "PAR_bed"]
+    opt = harmonize_coords(_open(inputs, optics + ["depth"])[optics + ["depth"]])
+    phy = harmonize_coords(_open(physics, fields)[fields])
+    ds = xr.merge([opt, align(phy, opt)])[ML_DATASET[:-1]]
+    print("✅ Merged dataset dims:", dict(ds.sizes))
+
+    # Valid sea pixels, shared with Steps 4–5 so they gather/scatter on the same pixels
+    pixels = ValidPixelIndex.from_dataset(ds, FEATURES + ["SSI"])
+    if save:
+        pixels.save(paths.valid_pixels)
+    print(f"Training samples available: {len(pixels)}")
+    X = pixels.gather(ds, FEATURES)
+    y = pixels.gather(ds, ["SSI"])[:, 0]
+
+    rf, meta = load_or_train(X, y, params=rf_params or RF_PARAMS, model_dir=paths.models)
+    print(("🔹 Trained" if meta["trained"] else "🔹 Reused") + f" model → {meta['path']}")
+    y_pred = rf.predict(X)
+    print(f"🔹 R² = {r2_score(y, y_pred):.3f}")
+    print(f"🔹 MAE = {mean_absolute_error(y, y_pred):.3f}")
+
+    if isinstance(inputs, (str, os.PathLike)):
+        grid = predict_grid(meta["path"], inputs, paths.ssi_ml, features=FEATURES,
+                            rows_per_chunk=rows_per_chunk, n_workers=n_workers)
+    else:
+        grid = predict_grid(meta["path"], opt, None, features=FEATURES, rows_per_chunk=rows_per_chunk)
+    ssi_ml = xr.DataArray(
+        np.asarray(grid), dims=("lat", "lon"), coords={"lat": ds["lat"], "lon": ds["lon"]}, name="SSI_ML",
+        attrs={"long_name": "AI-predicted Seagrass Suitability Index", "units": "0–1",
+               "comment": "Predicted via Random Forest from OLCI optical features",
+               "model_hash": meta["data_hash"]},
+    )
+    ds = ds.merge(ssi_ml)
+
+    if save:
+        from libuts.pyramid import build_pyramid
+        from libuts.stats import load_or_compute_stats
+        write_variables(ds, paths.store, STEP_VARIABLES["ml"], step="ml")
+        if netcdf:
+            ds.to_netcdf(paths.ml)
+        # Dashboard statistics cache (over what the store holds of the Step 3 dataset) and tile pyramid
+        load_or_compute_stats(paths.store, variables=list(open_store(paths.store, ML_DATASET).data_vars))
+        build_pyramid(ds, paths.pyramid)
+    print(f"✅ Step 3 completed → {os.path.basename(paths.store)}")
+
+    expl = compute_explanation(meta["path"], meta["data_hash"], X, y, FEATURES,
+                               n_samples=shap_samples, n_workers=0, out_dir=paths.explanations)
+    print(f"🔹 SHAP artefact → {expl['path']}")
+    print(expl["ranking"].to_string(index=False))
+
+    if save or show:
+        import matplotlib.pyplot as plt
+        import shap
+        shap.summary_plot(expl["shap_values"], expl["X"], show=False, plot_size=(8, 5))
+        _figure(plt.gcf(), paths.shap_summary, save, show)
+    if show:
+        import matplotlib.pyplot as plt
+        fig, axs = plt.subplots(1, 2, figsize=(12, 4))
+        ds["SSI"].plot(ax=axs[0], cmap="YlGn", vmin=0, vmax=1)
+        axs[0].set_title("Physics-based SSI")
+        ds["SSI_ML"].plot(ax=axs[1], cmap="YlGn", vmin=0, vmax=1)
+        axs[1].set_title("AI-predicted SSI (RF)")
+        _figure(fig, None, False, show)
+    return SimpleNamespace(ds=ds, pixels=pixels, meta=meta, explanation=expl)
+
+
+# ---------------------------------------------------------------------
+# Step 4 — drivers + uncertainty
+# ---------------------------------------------------------------------
+UNCERTAINTY_FEATURES = ["KD490", "ADG443", "APH443", "BBP443", "depth", "temp_bottom", "nutrients", "shear_stress"]
+UNCERTAINTY_RF = dict(n_estimators=300, max_depth=12, random_state=42)
+
+
+def uncertainty_step(ml, pixels=None, method="bootstrap", n_boot=20, boot_workers=None, cv_block=32, n_splits=5,
+                     cv_workers=None, rf_params=None, save=True, netcdf=False, paths=None):
+    """
+    Synthetic physical drivers, spatial-block CV of the suitability classifier
+    and per-pixel prediction uncertainty.
+
+    ``ml`` is the Step 3 dataset or path; ``pixels`` defaults to the saved
+    Step 3 index. ``method`` is one of :data:`libuts.uncertainty.METHODS`:
+    the default refits ``n_boot`` forests across ``boot_workers`` processes
+    (0: in this one); the single-fit estimators are faster. ``rf_params``
+    replaces :data:`UNCERTAINTY_RF` for the classifier of both the
+    ``n_splits`` CV folds and the final fit. Returns ``ds`` (with drivers
+    and ``uncertainty``), ``df`` (per-pixel table), ``pixels`` and ``cv``
+    (fold scores).
+    """
+    from sklearn.ensemble import RandomForestClassifier
+
+    from libuts.cv import cross_validate, spatial_block_folds
+    from libuts.grid import ValidPixelIndex
+    from libuts.uncertainty import prediction_std
+
+    paths = paths or step_paths()
+    ds = _open(ml, variables_through("ml")).copy()
+    lat, lon = ds["lat"], ds["lon"]
+    shape = ds["SSI"].shape
+
+    np.random.seed(42)
+    grid = dict(dims=("lat", "lon"), coords={"lat": lat, "lon": lon})
+    ds["temp_bottom"] = xr.DataArray(10 + 5 * np.random.rand(*shape), **grid,
+                                     attrs={"units": "°C", "long_name": "Bottom temperature"})
+    ds["nutrients"] = xr.DataArray(np.random.gamma(2, 0.3, shape), **grid,
+                                   attrs={"units": "mmol m⁻³", "long_name": "Nutrient concentration proxy"})
+    ds["shear_stress"] = xr.DataArray(np.abs(np.random.normal(0.15, 0.05, shape)), **grid,
+                                      attrs={"units": "Pa", "long_name": "Bottom shear stress proxy"})
+
+    features = UNCERTAINTY_FEATURES
+    if pixels is None:
+        pixels = ValidPixelIndex.load_or_build(paths.valid_pixels, ds, features + ["SSI"])
+    table = pixels.gather(ds, features + ["SSI"])
+    valid = np.isfinite(table).all(axis=1)    # e.g. pixels without depth
+    pixels = pixels.subset(valid)
+    df = pd.DataFrame(table[valid], columns=features + ["SSI"])
+    df["target"] = (df["SSI"] > 0.15).astype(int)
+    X = df.drop(["SSI", "target"], axis=1)
+    y = df["target"]
+
+    # Whole cv_block × cv_block tiles per fold (no spatial leakage), folds in parallel
+    rf_params = rf_params or UNCERTAINTY_RF
+    folds = spatial_block_folds(pixels.rows, pixels.cols, block=cv_block, n_splits=n_splits)
+    cv = cross_validate(
+        RandomForestClassifier(**rf_params),
+        X.values, y.values, folds, scoring="f1", n_workers=cv_workers,
+    )
+    print(cv.to_string(index=False))
+    print(f"Mean F1 ({n_splits}-fold spatial blocks): {cv['score'].mean():.3f}")
+
+    rf = RandomForestClassifier(**dict(rf_params, n_jobs=-1))
+    if method != "bootstrap":
+        rf.fit(X, y)
+    df["uncertainty"] = prediction_std(rf, X.values, method=method, y=y.values, n_boot=n_boot,
+                                       n_workers=boot_workers)
+    print(f"🔹 Uncertainty ({method}): mean std = {np.nanmean(df['uncertainty']):.3f}")
+
+    ds["uncertainty"] = pixels.to_dataarray(
+        df["uncertainty"].values, name="uncertainty", dtype=float,
+        attrs={"long_name": "Model uncertainty (std of predicted probability)", "method": method,
+               "units": "(0–1)"},
+    )
+    if save:
+        write_variables(ds, paths.store, STEP_VARIABLES["uncertainty"], step="uncertainty")
+        if netcdf:
+            ds.to_netcdf(paths.enriched)
+        df.to_csv(paths.uncertainty_csv, index=False)
+    print("✅ Step 4 completed → enriched physics + uncertainty" + (" saved." if save else "."))
+    return SimpleNamespace(ds=ds, df=df, pixels=pixels, cv=cv)
+
+
+# ---------------------------------------------------------------------
+# Step 5 — restoration planner
+# ---------------------------------------------------------------------
+def optimize_step(enriched, pixels=None, use_patches=True, patch_size=50, representation="dense",
+                  encoding="real", n_gen=50, execution="serial", n_workers=None, n_islands=4,
+                  migrate_every=10, migrants=5, checkpoint_every=5, warm_n_gen=15,
+                  save=True, show=False, paths=None):
+    """
+    NSGA-II over the feasible restoration candidates (see ``libuts.planner``).
+
+    ``enriched`` is the Step 4 dataset or path. Returns ``df`` (candidate
+    pixels), ``candidates``, ``res`` (merged front in ``X`` / ``F``),
+    ``pareto``, ``best_idx`` and ``selected`` (the knee-point pixels).
+    """
+    from pymoo.optimize import minimize
+    from pymoo.termination import get_termination
+
+    from libuts.checkpoint import PlannerCheckpoint, candidate_key, plan_start, resume_minimize, save_checkpoint
+    from libuts.grid import ValidPixelIndex
+    from libuts.islands import PooledRestorationProblem, run_islands
+    from libuts.patches import PATCH_FEATURES, expand, label_patches, patch_table
+    from libuts.planner import OBJECTIVES, RestorationProblem, attribute_matrix, make_algorithm
+
+    paths = paths or step_paths()
+    ds = _open(enriched, variables_through("uncertainty"))
+    print("✅ Loaded:", list(ds.data_vars))
+
+    cols = ["SSI", "SSI_ML", "depth", "uncertainty"]
+    if pixels is None:
+        pixels = ValidPixelIndex.load_or_build(paths.valid_pixels, ds, cols)
+    pixels = pixels.subset(np.isfinite(pixels.gather(ds, cols)).all(axis=1))
+    df = pixels.frame(ds, cols)
+
+    df["CO2_potential"] = df["SSI"] * np.abs(df["depth"]) * 1.2
+    df["ALAN_risk"] = 1 - df["SSI_ML"]
+    if "shear_stress" in ds:
+        df["shear_stress"] = pixels.gather(ds, ["shear_stress"])[:, 0]
+    else:
+        df["shear_stress"] = np.abs(np.random.normal(0.15, 0.05, len(df)))
+    df = df.query("-12 <= depth <= -2")
+    print(f"Feasible restoration candidates: {len(df)}")
+
+    if use_patches:
+        t0 = time.perf_counter()
+        df["patch"] = label_patches(pixels.rows[df.index], pixels.cols[df.index],
+                                    df[PATCH_FEATURES].values, pixels.shape, patch_size)
+        candidates = patch_table(df, df["patch"].values, OBJECTIVES)
+        weights = candidates["n_pixels"].values
+        print(f"Patches: {len(df)} pixels → {len(candidates)} candidates ({time.perf_counter() - t0:.1f} s)")
+    else:
+        candidates, weights = df, None
+
+    pixel_flat = pixels.flat[df.index]
+    labels = df["patch"].values if use_patches else None
+    key = candidate_key(attribute_matrix(candidates), weights, pixel_flat, labels,
+                        settings={"encoding": encoding, "pop_size": 100})
+    start = plan_start(paths.checkpoint, key, pixel_flat, labels, len(candidates), pop_size=100,
+                       n_gen=n_gen, encoding=encoding, warm_n_gen=warm_n_gen)
+    print(f"🔹 Planner start: {start.mode} ({start.done} generations done, {start.n_gen} to run)")
+    algorithm = make_algorithm(pop_size=100, encoding=encoding, sampling=start.sampling)
+    # A resume with a stored run state continues that run exactly (and its generation count)
+    exact = start.state is not None and execution != "islands"
+    checkpoint = PlannerCheckpoint(paths.checkpoint, key, pixel_flat, labels, every=checkpoint_every,
+                                   offset=0 if exact else start.done)
+
+    def solve(problem):
+        if exact:
+            res = resume_minimize(problem, algorithm, start, seed=42, callback=checkpoint, verbose=True)
+        else:
+            res = minimize(problem, algorithm, get_termination("n_gen", start.n_gen), seed=42,
+                           callback=checkpoint, verbose=True)
+        checkpoint.save(res.algorithm, n_gen=res.algorithm.n_gen - 1)
+        return res
+
+    t0 = time.perf_counter()
+    if start.mode == "done":
+        # The checkpoint already holds n_gen generations of this plan: reuse its front
+        res = SimpleNamespace(X=start.X.astype(float), F=start.F)
+    elif execution == "islands":
+        # Checkpoint after every migration epoch (islands resume from island 0's genome, not its run state)
+        res = run_islands(candidates, weights=weights, n_islands=n_islands, n_gen=start.n_gen,
+                          migrate_every=migrate_every, n_migrants=migrants, pop_size=100,
+                          encoding=encoding, representation=representation, seed=42,
+                          sampling=start.sampling,
+                          callback=lambda done, pop, X, F: save_checkpoint(
+                              paths.checkpoint, key, start.done + done, pop, X, F, pixel_flat, labels))
+    elif execution == "pool":
+        with PooledRestorationProblem(candidates, n_workers=n_workers, weights=weights,
+                                      representation=representation) as problem:
+            res = solve(problem)
+    else:
+        res = solve(RestorationProblem(candidates, representation=representation, weights=weights))
+    print(f"✅ Optimization completed ({execution}, {len(candidates)} candidates, {time.perf_counter() - t0:.1f} s)")
+
+    pareto = pd.DataFrame(res.F, columns=["-CO2", "Uncertainty", "ALAN"])
+    pareto["CO2"] = -pareto["-CO2"]
+    best_idx = int(np.argmin(
+        (pareto["Uncertainty"] - pareto["Uncertainty"].min())**2 +
+        (pareto["ALAN"] - pareto["ALAN"].min())**2 -
+        (pareto["CO2"] - pareto["CO2"].max())**2
+    ))
+    print("Chosen solution index:", best_idx)
+    mask_opt = res.X[best_idx] > 0.8
+    if use_patches:
+        mask_opt = expand(df["patch"].values, mask_opt)     # chosen patches → pixels
+    selected = df[mask_opt].copy()
+    print(f"Selected {len(selected)} optimal restoration pixels")
+
+    if save or show:
+        import matplotlib.pyplot as plt
+        fig = plt.figure(figsize=(7, 5))
+        plt.scatter(pareto["Uncertainty"], pareto["CO2"], c=pareto["ALAN"], cmap="viridis", s=50, edgecolor="k")
+        plt.colorbar(label="ALAN risk")
+        plt.xlabel("Uncertainty ↓"); plt.ylabel("CO₂ potential ↑")
+        plt.title("Pareto Front — Restoration Trade-offs")
+        _figure(fig, paths.pareto, save, show)
+    if save:
+        import geopandas as gpd
+        from shapely.geometry import Point
+        os.makedirs(paths.out_dir, exist_ok=True)
+        geometry = [Point(xy) for xy in zip(selected["lon"], selected["lat"])]
+        gpd.GeoDataFrame(selected, geometry=geometry, crs="EPSG:4326").to_file(paths.sites, driver="GPKG")
+        selected[["CO2_potential", "uncertainty", "ALAN_risk"]].describe().to_csv(paths.summary)
+        print("✅ Step 5 completed → GeoPackage + summary exported")
+    if save or show:
+        import matplotlib.pyplot as plt
+        fig = plt.figure(figsize=(7, 6))
+        plt.scatter(df["lon"], df["lat"], s=5, color="lightgrey", alpha=0.3)
+        plt.scatter(selected["lon"], selected["lat"], s=12, c=selected["CO2_potential"], cmap="YlGn", edgecolor="k")
+        plt.colorbar(label="CO₂ potential")
+        plt.title("Optimal Restoration Cells (NSGA-II result)")
+        plt.xlabel("Longitude"); plt.ylabel("Latitude")
+        _figure(fig, paths.map, save, show)
+    return SimpleNamespace(df=df, candidates=candidates, res=res, pareto=pareto, best_idx=best_idx,
+                           selected=selected)
+
+
+# ---------------------------------------------------------------------
+# Entry point
+# ---------------------------------------------------------------------
+def run_all(inputs=None, out_dir=OUT_DIR, prefix=PREFIX, save=True, until="optimize", daily=None,
+            netcdf=False, retrieve=None, physics=None, ml=None, uncertainty=None, optimize=None,
+            skip=(), on_step=None):
+    """
+    Run Steps 1–5 (or up to ``until``) in one process.
+
+    ``inputs`` (a Step 1 dataset or path, with an optional ``daily`` KD490
+    cube) skips the retrieval. ``save`` is ``True`` / ``False`` or the step
+    names whose outputs are persisted (``netcdf``: also as per-step
+    NetCDFs). ``retrieve`` … ``optimize`` are
+    keyword arguments for the step functions. Steps in ``skip`` already
+    ran with their outputs saved: they are not run, and the next step
+    reads the store (and valid-pixel index) instead. ``on_step(name)`` is
+    called as each step completes. Returns the results of the last step
+    run plus ``timings`` (seconds per step) and ``peak_rss_mb``.
+    """
+    if until not in STEP_NAMES:
+        raise ValueError(f"Unknown step {until!r}; choose from {STEP_NAMES}.")
+    names = STEP_NAMES[:STEP_NAMES.index(until) + 1]
+    persist = set(STEP_NAMES if save is True else () if save is False else save)
+    paths = step_paths(out_dir, prefix)
+    os.makedirs(out_dir, exist_ok=True)
+    timings, result = {}, None
+
+    def timed(name, fn, *args, **kwargs):
+        t0 = time.perf_counter()
+        if name != "optimize":
+            kwargs.setdefault("netcdf", netcdf)
+        out = fn(*args, save=name in persist, paths=paths, **kwargs)
+        timings[name] = round(time.perf_counter() - t0, 2)
+        return out
+
+    def run(name, fn, *args, **kwargs):
+        out = timed(name, fn, *args, **kwargs)
+        if on_step is not None:
+            on_step(name)
+        return out
+
+    todo = [n for n in names if n not in set(skip)]
+    if inputs is None and "inputs" in todo:
+        step1 = run("inputs", retrieve_inputs, **(retrieve or {}))
+        inputs, daily, result = step1.ds, step1.daily, step1
+    elif inputs is None:
+        inputs = paths.store
+        daily = daily or (paths.store if "KD490_daily" in store_variables(paths.store) else None)
+    # What the next step reads: in memory when the step ran here, the store when it was skipped
+    step2 = step3 = step4 = _stored(inputs, paths.store) if set(names) & set(skip) - {"inputs"} else None
+    pixels = None
+    if "physics" in todo:
+        result = run("physics", physics_step, inputs, daily=daily, **(physics or {}))
+        step2 = result.ds
+    if "ml" in todo:
+        result = run("ml", ml_step, inputs, step2, **(ml or {}))
+        step2, step3, pixels = None, result.ds, result.pixels
+    if "uncertainty" in todo:
+        result = run("uncertainty", uncertainty_step, step3, pixels=pixels, **(uncertainty or {}))
+        step3, step4, pixels = None, result.ds, result.pixels
+    if "optimize" in todo:
+        result = run("optimize", optimize_step, step4, pixels=pixels, **(optimize or {}))
+    result = result or SimpleNamespace()
+    result.timings, result.peak_rss_mb = timings, peak_rss_mb()
+    print("🔹 Step timings (s): " + ", ".join(f"{k} {v}" for k, v in timings.items())
+          + f" — peak RSS {result.peak_rss_mb:.0f} MB")
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m libuts.steps",
+                                     description="Run the LiBuTS Steps 1–5 in one process.")
+    parser.add_argument("--inputs", help="existing Step 1 NetCDF or store (skips the retrieval)")
+    parser.add_argument("--daily", help="daily KD490 cube for the time-resolved light budget")
+    parser.add_argument("--out-dir", default=OUT_DIR)
+    parser.add_argument("--prefix", default=PREFIX)
+    parser.add_argument("--until", default="optimize", choices=STEP_NAMES)
+    parser.add_argument("--no-save", action="store_true", help="keep results in memory only")
+    parser.add_argument("--netcdf", action="store_true", help="also write the per-step NetCDFs")
+    args = parser.parse_args(argv)
+    run_all(args.inputs, args.out_dir, args.prefix, save=not args.no_save, until=args.until, daily=args.daily,
+            netcdf=args.netcdf)
+
+
+if __name__ == "__main__":
+    main()
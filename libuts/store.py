@@ -0,0 +1,131 @@
+"""
+Chunked Zarr store shared by the pipeline steps.
+
+Instead of each step re-saving the upstream variables in its own NetCDF,
+every step writes only the variables it produces (:data:`STEP_VARIABLES`)
+into one Zarr store: float32, ``chunk`` × ``chunk`` spatial chunks,
+Zstandard-compressed, with consolidated metadata so opening the store is
+a single metadata read. Rerunning a step overwrites its own variables;
+Step 1 replaces the variables of a store on another grid (or period).
+Readers open the store lazily and load only the chunks they touch.
+
+Each variable is a sub-directory of the store, so the pipeline runner
+can fingerprint inputs and outputs per variable.
+"""
+
+import os
+import shutil
+import warnings
+
+import numpy as np
+import xarray as xr
+
+STORE = "outputs/greifswalder_store.zarr"
+CHUNK = 256
+TIME_CHUNK = 32
+
+# Variables written by each step (in pipeline order)
+STEP_VARIABLES = {
+    "inputs": ["KD490", "ADG443", "APH443", "BBP443", "PAR_surface", "depth"],
+    "inputs_daily": ["KD490_daily"],
+    "physics": ["Zeu", "PAR_bed", "SSI"],
+    "physics_daily": ["PAR_bed_daily_mean", "PAR_bed_cumulative", "frac_days_above",
+                      "max_light_limited_run", "n_valid_days"],
+    "ml": ["SSI_ML"],
+    "uncertainty": ["temp_bottom", "nutrients", "shear_stress", "uncertainty"],
+}
+
+# The Step 3 dataset: what the dashboard reads
+ML_DATASET = ["KD490", "ADG443", "APH443", "BBP443", "SSI", "depth", "Zeu", "PAR_bed", "SSI_ML"]
+
+
+def variables_through(step):
+    """Grid variables available once ``step`` (and everything before it) has run."""
+    names = [s for s in STEP_VARIABLES if not s.endswith("_daily")]
+    return [v for s in names[:names.index(step) + 1] for v in STEP_VARIABLES[s]]
+
+
+def _harmonize(ds):
+    renames = {k: v for k, v in {"latitude": "lat", "longitude": "lon"}.items() if k in ds.dims}
+    return ds.rename(renames).drop_vars(["crs"], errors="ignore")
+
+
+def _encode(da, chunk):
+    """float32 ``da`` and its Zarr encoding; in-memory arrays are chunked by Zarr itself, not dask."""
+    from zarr.codecs import ZstdCodec
+
+    if np.issubdtype(da.dtype, np.floating) or np.issubdtype(da.dtype, np.integer):
+        da = da.astype(np.float32)
+    chunks = {d: min(TIME_CHUNK if d == "time" else chunk, n) for d, n in da.sizes.items()}
+    encoding = {"compressors": (ZstdCodec(level=3),)}
+    if da.chunks is not None:
+        return da.chunk(chunks), encoding
+    return da, dict(encoding, chunks=tuple(chunks[d] for d in da.dims))
+
+
+def _drop(path, names):
+    """Remove ``names`` (variables / coordinates) from the store and re-consolidate."""
+    import zarr
+
+    for name in names:
+        shutil.rmtree(os.path.join(path, name), ignore_errors=True)
+    with warnings.catch_warnings():
+        warnings.filterwarnings("ignore", message="Consolidated metadata")
+        zarr.consolidate_metadata(path)
+
+
+def write_variables(ds, path=STORE, variables=None, step=None, chunk=CHUNK, new=False, replace_grid=False):
+    """
+    Write ``ds[variables]`` (default: all data variables) into the store at ``path``.
+
+    Variables already in the store are overwritten and the others are left
+    as they are; the grid must match the one the store was created with.
+    ``replace_grid`` (Step 1) instead drops every variable on the old grid
+    (or, for a new ``time`` axis, every variable along it), so downstream
+    variables survive a rerun with identical inputs but not a new AOI.
+    ``new`` always starts a fresh store. Returns the written names.
+    """
+    ds = _harmonize(ds)
+    variables = list(variables or ds.data_vars)
+    encoded = {v: _encode(ds[v], chunk) for v in variables}
+    out = xr.Dataset({v: da for v, (da, _) in encoded.items()})
+    for v, (_, encoding) in encoded.items():
+        out[v].attrs = dict(ds[v].attrs, **({"step": step} if step else {}))
+        out[v].encoding = encoding
+    exists = not new and os.path.exists(os.path.join(path, "zarr.json"))
+    if exists:
+        with xr.open_zarr(path, consolidated=True) as current:
+            changed = {dim for dim in set(out.dims) & set(current.dims)
+                       if dim in current.coords and not np.array_equal(current[dim].values, out[dim].values)}
+            stale = [v for v in current.variables if changed & set(current[v].dims)]
+            kept = [v for v in current.data_vars if v not in stale]
+        if changed and not replace_grid:
+            raise ValueError(f"Grid of {variables} does not match the store at {path} ({sorted(changed)}).")
+        if changed and not kept:
+            exists = False
+        elif changed:
+            _drop(path, stale)
+    with warnings.catch_warnings():
+        # Consolidated metadata is not (yet) part of the Zarr v3 spec; we rely on it for fast opens
+        warnings.filterwarnings("ignore", message="Consolidated metadata")
+        out.to_zarr(path, mode="a" if exists else "w", consolidated=True)
+    return variables
+
+
+def open_store(path=STORE, variables=None):
+    """Lazy dataset of ``variables`` (default: all) from the store."""
+    ds = xr.open_zarr(path, consolidated=True)
+    return ds[[v for v in variables if v in ds]] if variables is not None else ds
+
+
+def store_variables(path=STORE):
+    """``{variable: step}`` of what the store currently holds."""
+    with xr.open_zarr(path, consolidated=True) as ds:
+        return {v: ds[v].attrs.get("step") for v in ds.data_vars}
+
+
+def disk_usage(path):
+    """Bytes on disk of a file or directory."""
+    if not os.path.isdir(path):
+        return os.path.getsize(path)
+    return sum(os.path.getsize(os.path.join(b, f)) for b, _, files in os.walk(path) for f in files)
@@ -0,0 +1,112 @@
+"""
+Streaming temporal reduction for Copernicus Marine subsets.
+
+The cube is read in (time, row-band) blocks sized to a memory budget and
+folded into per-pixel running statistics, so a full season or a whole
+basin is never held in memory at once.
+"""
+
+import resource
+import sys
+
+import numpy as np
+import xarray as xr
+
+# Working copies made per block (data, validity mask, masked fill)
+_BLOCK_OVERHEAD = 3
+
+
+def peak_rss_mb():
+    """Peak resident set size of the current process in MB."""
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS and kilobytes on Linux
+    return rss / 1024**2 if sys.platform == "darwin" else rss / 1024
+
+
+class RunningStats:
+    """Per-pixel count, mean, min and max, updated one block at a time."""
+
+    def __init__(self, shape):
+        self.count = np.zeros(shape, dtype=np.int32)
+        self.mean = np.zeros(shape, dtype=np.float64)
+        self.min = np.full(shape, np.inf)
+        self.max = np.full(shape, -np.inf)
+
+    def update(self, block, window=(slice(None), slice(None))):
+        """Fold a ``(time, y, x)`` block into the pixels at ``window``."""
+        block = np.asarray(block, dtype=np.float64)
+        valid = np.isfinite(block)
+        n = valid.sum(axis=0)
+        s = np.where(valid, block, 0.0).sum(axis=0)
+
+        count = self.count[window] + n
+        mean = self.mean[window]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            self.mean[window] = np.where(count > 0, mean + (s - n * mean) / count, 0.0)
+        self.count[window] = count
+        self.min[window] = np.minimum(self.min[window], np.where(valid, block, np.inf).min(axis=0))
+        self.max[window] = np.maximum(self.max[window], np.where(valid, block, -np.inf).max(axis=0))
+
+    def finalize(self):
+        """Return ``(mean, count, min, max)`` with never-observed pixels as NaN."""
+        empty = self.count == 0
+        mean = np.where(empty, np.nan, self.mean)
+        vmin = np.where(empty, np.nan, self.min)
+        vmax = np.where(empty, np.nan, self.max)
+        return mean, self.count.copy(), vmin, vmax
+
+
+def plan_blocks(n_time, n_rows, n_cols, itemsize, n_vars=1, budget_mb=512):
+    """Choose ``(time_steps, rows)`` per block so a block fits ``budget_mb``."""
+    per_pixel = itemsize * n_vars * _BLOCK_OVERHEAD
+    cap = max(1, int(budget_mb * 1024**2 // per_pixel))
+    t = min(n_time, max(1, cap // (n_rows * n_cols)))
+    rows = min(n_rows, max(1, cap // (t * n_cols)))
+    return t, rows
+
+
+def stream_reduce(ds, variables, budget_mb=512, time_dim="time"):
+    """
+    Reduce ``ds[variables]`` over ``time_dim`` without loading the full cube.
+
+    ``ds`` is expected to be lazy (as returned by
+    ``copernicusmarine.open_dataset`` or ``xr.open_dataset``); each block is
+    sliced and loaded on its own. Returns a Dataset holding ``<var>`` (mean),
+    ``<var>_count``, ``<var>_min`` and ``<var>_max`` per pixel.
+
+    The budget covers the blocks in flight; the per-pixel accumulators
+    (~28 bytes per pixel and variable) come on top.
+    """
+    variables = list(variables)
+    sub = ds[variables]
+    if time_dim not in sub.dims:
+        sub = sub.expand_dims(time_dim)
+
+    ref = sub[variables[0]]
+    y_dim, x_dim = [d for d in ref.dims if d != time_dim]
+    n_time, n_rows, n_cols = sub.sizes[time_dim], sub.sizes[y_dim], sub.sizes[x_dim]
+    itemsize = max(sub[v].dtype.itemsize for v in variables)
+    t_step, row_step = plan_blocks(n_time, n_rows, n_cols, itemsize, len(variables), budget_mb)
+
+    stats = {v: RunningStats((n_rows, n_cols)) for v in variables}
+    for r0 in range(0, n_rows, row_step):
+        rows = slice(r0, min(r0 + row_step, n_rows))
+        for t0 in range(0, n_time, t_step):
+            block = sub.isel({time_dim: slice(t0, t0 + t_step), y_dim: rows}).load()
+            for v in variables:
+                arr = block[v].transpose(time_dim, y_dim, x_dim).values
+                stats[v].update(arr, (rows, slice(None)))
+            del block
+
+    coords = {y_dim: ref[y_dim], x_dim: ref[x_dim]}
+    out = xr.Dataset(coords=coords)
+    for v in variables:
+        mean, count, vmin, vmax = stats[v].finalize()
+        dims = (y_dim, x_dim)
+        dtype = np.promote_types(sub[v].dtype, np.float32)
+        out[v] = xr.DataArray(mean.astype(dtype), dims=dims, attrs=sub[v].attrs)
+        out[f"{v}_count"] = xr.DataArray(count, dims=dims, attrs={"long_name": f"Valid observations of {v}"})
+        out[f"{v}_min"] = xr.DataArray(vmin.astype(dtype), dims=dims, attrs=sub[v].attrs)
+        out[f"{v}_max"] = xr.DataArray(vmax.astype(dtype), dims=dims, attrs=sub[v].attrs)
+    out.attrs["block"] = f"{t_step} time steps x {row_step} rows"
+    return out
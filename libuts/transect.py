@@ -0,0 +1,143 @@
+"""
+Polyline transects through the gridded outputs.
+
+A transect is clipped to the grid extent, densified to about one sample
+per grid cell and mapped to row/column indices once with a
+nearest-neighbour lookup on the 1-D coordinates. Profiles are memoised per geometry and variable set, and the
+variables are held as in-memory arrays, so a slider or drawing change
+costs an index gather rather than an ``xarray.sel`` call.
+"""
+
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from libuts.bathymetry import nearest_index
+
+KM_PER_DEG_LAT = 110.57
+KM_PER_DEG_LON = 111.32
+
+
+def _vertices(vertices):
+    v = np.asarray(vertices, dtype=float).reshape(-1, 2)
+    if len(v) < 2:
+        raise ValueError("A transect needs at least two vertices.")
+    return v
+
+
+def _n_samples(x0, y0, x1, y1, dx, dy):
+    return max(int(np.ceil(max(abs(x1 - x0) / dx, abs(y1 - y0) / dy) - 1e-6)) + 1, 2)
+
+
+def densify(vertices, dx, dy):
+    """Points along the polyline ``[(lon, lat), ...]`` spaced at most one cell apart."""
+    v = _vertices(vertices)
+    pieces = []
+    for (x0, y0), (x1, y1) in zip(v[:-1], v[1:]):
+        t = np.linspace(0.0, 1.0, _n_samples(x0, y0, x1, y1, dx, dy))
+        seg = np.column_stack([x0 + t * (x1 - x0), y0 + t * (y1 - y0)])
+        pieces.append(seg if not pieces else seg[1:])
+    return np.concatenate(pieces)
+
+
+def clip_segment(p0, p1, bbox):
+    """
+    Parameters ``(t0, t1)`` of the part of segment ``p0``–``p1`` inside
+    ``bbox = (lon_min, lon_max, lat_min, lat_max)``, or ``None`` (Liang–Barsky).
+    """
+    t0, t1 = 0.0, 1.0
+    d = (p1[0] - p0[0], p1[1] - p0[1])
+    for axis, lo, hi in ((0, bbox[0], bbox[1]), (1, bbox[2], bbox[3])):
+        if d[axis] == 0:
+            if not lo <= p0[axis] <= hi:
+                return None
+            continue
+        a, b = (lo - p0[axis]) / d[axis], (hi - p0[axis]) / d[axis]
+        t0, t1 = max(t0, min(a, b)), min(t1, max(a, b))
+        if t0 > t1:
+            return None
+    return t0, t1
+
+
+def along_track_km(lon, lat):
+    """Cumulative distance (km) along the points, local equirectangular approximation."""
+    dx = np.diff(lon) * KM_PER_DEG_LON * np.cos(np.deg2rad((lat[1:] + lat[:-1]) / 2))
+    dy = np.diff(lat) * KM_PER_DEG_LAT
+    return np.concatenate([[0.0], np.cumsum(np.hypot(dx, dy))])
+
+
+class TransectSampler:
+    """
+    Sample any 2-D ``(lat, lon)`` variable of ``ds`` along arbitrary polylines.
+
+    ``maxsize`` bounds the number of memoised geometries.
+    """
+
+    def __init__(self, ds, lat="lat", lon="lon", maxsize=128):
+        self.ds = ds
+        self.lat = ds[lat].values
+        self.lon = ds[lon].values
+        self.dims = (lat, lon)
+        self.dx = float(np.ptp(self.lon)) / max(self.lon.size - 1, 1) or 1.0
+        self.dy = float(np.ptp(self.lat)) / max(self.lat.size - 1, 1) or 1.0
+        self._arrays = {}
+        self.path = lru_cache(maxsize)(self._path)
+        self.profile_cached = lru_cache(maxsize)(self._profile)
+
+    def array(self, var):
+        """``var`` as a ``(lat, lon)`` numpy array, loaded once."""
+        if var not in self._arrays:
+            self._arrays[var] = self.ds[var].transpose(*self.dims).values
+        return self._arrays[var]
+
+    def _path(self, vertices):
+        """
+        Grid indices, points and along-track distance of the polyline parts inside the grid.
+
+        Distances are measured along the whole polyline from its first
+        vertex, so a line that leaves and re-enters the grid keeps the
+        length of the part outside. A line that misses the grid gives no points.
+        """
+        v = _vertices(vertices)
+        bbox = (self.lon.min(), self.lon.max(), self.lat.min(), self.lat.max())
+        pts, dist, start_km = [], [], 0.0
+        for p0, p1 in zip(v[:-1], v[1:]):
+            seg_km = along_track_km(np.array([p0[0], p1[0]]), np.array([p0[1], p1[1]]))[-1]
+            clip = clip_segment(p0, p1, bbox)
+            if clip is not None:
+                a, b = p0 + clip[0] * (p1 - p0), p0 + clip[1] * (p1 - p0)
+                t = np.linspace(clip[0], clip[1], _n_samples(*a, *b, self.dx, self.dy))
+                if pts and clip[0] == 0.0 and np.allclose(pts[-1][-1], p0):
+                    t = t[1:]                           # shared vertex with the previous segment
+                pts.append(p0 + t[:, None] * (p1 - p0))
+                dist.append(start_km + t * seg_km)
+            start_km += seg_km
+        if not pts:
+            return np.zeros(0, int), np.zeros(0, int), np.zeros((0, 2)), np.zeros(0)
+        pts, dist = np.concatenate(pts), np.concatenate(dist)
+        rows = nearest_index(self.lat, pts[:, 1])
+        cols = nearest_index(self.lon, pts[:, 0])
+        return rows, cols, pts, dist
+
+    def _profile(self, vertices, variables):
+        rows, cols, pts, dist = self.path(vertices)
+        out = {"distance_km": dist, "lon": pts[:, 0], "lat": pts[:, 1]}
+        for v in variables:
+            out[v] = self.array(v)[rows, cols]
+        return pd.DataFrame(out)
+
+    def profile(self, vertices, variables):
+        """
+        DataFrame of ``distance_km``, ``lon``, ``lat`` and each of ``variables``
+        (empty when the polyline does not cross the grid).
+
+        Vertices are rounded to 1e-6° so repeated geometries hit the cache;
+        the returned frame is shared and should be treated as read-only.
+        """
+        key = tuple((round(float(x), 6), round(float(y), 6)) for x, y in vertices)
+        return self.profile_cached(key, tuple(variables))
+
+    def latitude_line(self, lat):
+        """Vertices of a west–east transect at ``lat`` across the full grid."""
+        return [(float(self.lon.min()), lat), (float(self.lon.max()), lat)]
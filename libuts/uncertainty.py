@@ -0,0 +1,178 @@
+"""
+Per-pixel uncertainty for Random Forest predictions from a single fit.
+
+``"trees"``      spread of the individual tree predictions;
+``"oob"``        spread over the trees for which the row was out-of-bag;
+``"ij"``         bias-corrected infinitesimal jackknife (Wager, Hastie &
+                 Efron 2014), using the in-bag counts of the fitted forest
+                 (read in blocks of training rows, see :func:`ij_std`);
+``"bootstrap"``  the classic refit-on-resample estimate (Step 4's default),
+                 run across a process pool that reads the features from one
+                 shared memory map.
+
+All estimators return a standard deviation on the prediction scale
+(class-1 probability for classifiers). Predictions are processed in row
+chunks so the ``(trees, rows)`` matrix never covers the whole grid.
+"""
+
+import os
+import tempfile
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from sklearn.base import clone, is_classifier
+
+METHODS = ("trees", "oob", "ij", "bootstrap")
+
+
+def tree_predictions(forest, X):
+    """``(n_trees, n_rows)`` matrix of per-tree predictions (class-1 probability for classifiers)."""
+    X = np.asarray(X, dtype=np.float32)
+    if is_classifier(forest):
+        return np.stack([est.predict_proba(X)[:, 1] for est in forest.estimators_])
+    return np.stack([est.predict(X) for est in forest.estimators_])
+
+
+def _drawn_rows(forest):
+    """Each tree's bootstrap draws, one tree at a time (regenerated from the tree's seed)."""
+    per_tree = getattr(forest, "_get_estimators_indices", None)
+    return per_tree() if per_tree is not None else iter(forest.estimators_samples_)
+
+
+def inbag_counts(forest, n_train, rows=None):
+    """
+    ``(n_trees, n_rows)`` number of times each training row was drawn per
+    tree, for the training rows in the slice ``rows`` (default: all).
+    """
+    if not getattr(forest, "bootstrap", False):
+        raise ValueError("In-bag counts require a forest fitted with bootstrap=True.")
+    lo, hi = (0, n_train) if rows is None else (rows.start, rows.stop)
+    out = np.empty((len(forest.estimators_), hi - lo))
+    for b, drawn in enumerate(_drawn_rows(forest)):
+        if lo > 0 or hi < n_train:
+            drawn = drawn[(drawn >= lo) & (drawn < hi)] - lo
+        out[b] = np.bincount(drawn, minlength=hi - lo)
+    return out
+
+
+def _chunks(n, chunk):
+    for start in range(0, n, chunk):
+        yield slice(start, min(start + chunk, n))
+
+
+def tree_std(forest, X, chunk=50_000):
+    out = np.empty(len(X))
+    for sl in _chunks(len(X), chunk):
+        out[sl] = tree_predictions(forest, X[sl]).std(axis=0)
+    return out
+
+
+def oob_std(forest, X_train, chunk=50_000):
+    """Spread of the out-of-bag tree predictions for each training row (NaN if never out-of-bag)."""
+    oob = inbag_counts(forest, len(X_train)) == 0
+    out = np.empty(len(X_train))
+    for sl in _chunks(len(X_train), chunk):
+        t = np.where(oob[:, sl], tree_predictions(forest, X_train[sl]), np.nan)
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)    # rows never out-of-bag
+            out[sl] = np.nanstd(t, axis=0)
+    return out
+
+
+def ij_std(forest, X, n_train, chunk=50_000, budget_mb=256):
+    """
+    Bias-corrected infinitesimal jackknife standard deviation.
+
+    ``V_IJ(x) = Σ_i Cov_b(N_bi, t_b(x))²`` is evaluated as ``t_cᵀ G t_c / B²``
+    with the ``B × B`` Gram matrix ``G`` of the centred in-bag counts, so
+    the cost per prediction row is independent of the training-set size.
+    ``G`` is accumulated over blocks of training rows whose in-bag counts
+    take at most ``budget_mb``; each block regenerates the trees' draws,
+    so a training set over the budget costs one pass over them per block.
+    """
+    B = len(forest.estimators_)
+    rows = max(1, int(budget_mb * 2 ** 20) // (8 * B))
+    G, total, squares = np.zeros((B, B)), np.zeros(B), np.zeros(B)
+    for sl in _chunks(n_train, rows):
+        N = inbag_counts(forest, n_train, sl)
+        total += N.sum(axis=1)
+        squares += np.einsum("bn,bn->b", N, N)
+        N -= N.mean(axis=0)
+        G += N @ N.T
+        del N                           # before the next block is allocated
+    n_var = np.mean(squares / n_train - (total / n_train) ** 2)
+    out = np.empty(len(X))
+    for sl in _chunks(len(X), chunk):
+        tc = tree_predictions(forest, X[sl])
+        tc -= tc.mean(axis=0)
+        v_ij = np.einsum("bn,bn->n", G @ tc, tc) / B ** 2
+        bias = n_train * n_var * (tc ** 2).sum(axis=0) / B ** 2
+        out[sl] = np.sqrt(np.clip(v_ij - bias, 0, None))
+    return out
+
+
+# ---------------------------------------------------------------------
+# Parallel bootstrap (parity with the refit approach)
+# ---------------------------------------------------------------------
+_worker = {}
+
+
+def _init_worker(x_path, y_path, xp_path):
+    _worker.update(X=np.load(x_path, mmap_mode="r"), y=np.load(y_path, mmap_mode="r"),
+                   Xp=np.load(xp_path, mmap_mode="r"))
+
+
+def _fit_one(args):
+    model, seed = args
+    X, y = _worker["X"], _worker["y"]
+    idx = np.random.default_rng(seed).integers(0, len(y), len(y))
+    model.fit(X[idx], y[idx])
+    Xp = _worker["Xp"]
+    return model.predict_proba(Xp)[:, 1] if is_classifier(model) else model.predict(Xp)
+
+
+def bootstrap_std(model, X, y, X_pred=None, n_boot=20, n_workers=None, seed=0):
+    """
+    Standard deviation over ``n_boot`` refits of ``model`` on resampled ``(X, y)``.
+
+    Features are written once to a temporary ``.npy`` and memory-mapped by
+    every worker. ``n_workers=0`` runs in-process; ``None`` uses one worker
+    per CPU (each model is then fitted with ``n_jobs=1``).
+    """
+    X = np.asarray(X, dtype=np.float32)
+    X_pred = X if X_pred is None else np.asarray(X_pred, dtype=np.float32)
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = [os.path.join(tmp, f"{k}.npy") for k in ("X", "y", "Xp")]
+        for p, a in zip(paths, (X, np.asarray(y), X_pred)):
+            np.save(p, a)
+        if n_workers == 0:
+            _init_worker(*paths)
+            preds = [_fit_one((clone(model), seed + i)) for i in range(n_boot)]
+            _worker.clear()
+        else:
+            jobs = [(clone(model).set_params(n_jobs=1), seed + i) for i in range(n_boot)]
+            with ProcessPoolExecutor(n_workers, initializer=_init_worker, initargs=paths) as pool:
+                preds = list(pool.map(_fit_one, jobs))
+    return np.vstack(preds).std(axis=0)
+
+
+def prediction_std(forest, X, method="ij", y=None, n_boot=20, n_workers=None, chunk=50_000):
+    """
+    Per-row uncertainty of ``forest`` on ``X`` with the chosen ``method``.
+
+    ``"oob"`` and ``"ij"`` assume ``X`` are the rows ``forest`` was fitted
+    on; ``"bootstrap"`` also needs ``y`` and refits unfitted clones.
+    """
+    X = np.asarray(X, dtype=np.float32)
+    if method == "trees":
+        return tree_std(forest, X, chunk)
+    if method == "oob":
+        return oob_std(forest, X, chunk)
+    if method == "ij":
+        return ij_std(forest, X, len(X), chunk)
+    if method == "bootstrap":
+        if y is None:
+            raise ValueError("method='bootstrap' needs the training target y.")
+        return bootstrap_std(forest, X, y, n_boot=n_boot, n_workers=n_workers)
+    raise ValueError(f"Unknown method {method!r}; choose from {METHODS}.")
@@ -1,67 +1,30 @@
-import numpy as np
-import xarray as xr
-import matplotlib.pyplot as plt
+import os, sys
 
-# Load cleaned dataset
-ds = xr.open_dataset("outputs/greifswalder_inputs.nc")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from libuts.steps import physics_step, step_paths
+from libuts.store import store_variables
 
-# ---------------------------------------------------------------------
-# 1️⃣ Compute Euphotic Depth (Zeu)
-# ---------------------------------------------------------------------
-Zeu = (4.6 / ds["KD490"]).clip(min=0, max=30)
-Zeu.name = "Zeu"
-Zeu.attrs["units"] = "m"
-Zeu.attrs["long_name"] = "Euphotic depth (1% light level)"
-
-# ---------------------------------------------------------------------
-# 2️⃣ Compute PAR at seabed
-# ---------------------------------------------------------------------
-PAR_bed = ds["PAR_surface"] * np.exp(ds["KD490"] * ds["depth"])
-PAR_bed.name = "PAR_bed"
-PAR_bed.attrs["units"] = "E m⁻² d⁻¹"
-PAR_bed.attrs["long_name"] = "Photosynthetically Active Radiation at seabed"
-
-# ---------------------------------------------------------------------
-# 3️⃣ Normalize key layers (0–1) and compute Suitability Index (SSI)
-# ---------------------------------------------------------------------
-def normalize(da):
-    return (da - da.min()) / (da.max() - da.min())
+OUT_DIR, PREFIX = "outputs", "greifswalder"
+paths = step_paths(OUT_DIR, PREFIX)
 
-ssi = (
-    0.5 * normalize(PAR_bed) +
-    0.3 * normalize(Zeu) -
-    0.2 * normalize(abs(ds["depth"]))
-)
-ssi = ssi.clip(min=0, max=1)
-ssi.name = "SSI"
-ssi.attrs["long_name"] = "Seagrass Suitability Index (0–1)"
-ssi.attrs["comment"] = "0=unsuitable, 1=highly suitable"
+# Variables go to one Zarr store (<OUT_DIR>/<PREFIX>_store.zarr); True also writes the legacy NetCDF
+WRITE_NETCDF = False
 
-# ---------------------------------------------------------------------
-# 4️⃣ Combine & save
-# ---------------------------------------------------------------------
-out = xr.Dataset({
-    "KD490": ds["KD490"],
-    "depth": ds["depth"],
-    "Zeu": Zeu,
-    "PAR_bed": PAR_bed,
-    "SSI": ssi
-})
-out.attrs.update(ds.attrs)
-out.attrs["step"] = "Physics-based seagrass suitability"
-out.to_netcdf("outputs/greifswalder_step2_physics.nc")
+# Tile edge (pixels) for the dask pass; a few tiles per thread are processed at once
+TILE = 1024
 
-print("✅ Step 2 completed → greifswalder_step2_physics.nc")
+# Time-resolved mode: PAR_bed per day from the daily KD490 cube saved by Step 1
+TIME_RESOLVED = True
 
 # ---------------------------------------------------------------------
-# 5️⃣ Visualize key outputs
+# 1️⃣–3️⃣ Euphotic depth, PAR at seabed and SSI (libuts.steps.physics_step)
+#   Zeu     = 4.6 / KD490                      (clipped 0–30 m)
+#   PAR_bed = PAR_surface · exp(KD490 · depth)
+#   SSI     = 0.5·norm(PAR_bed) + 0.3·norm(Zeu) − 0.2·norm(|depth|)
+# 4️⃣ Visualize key outputs
 # ---------------------------------------------------------------------
-fig, axs = plt.subplots(1, 3, figsize=(15, 4))
-Zeu.plot(ax=axs[0], cmap="viridis")
-axs[0].set_title("Euphotic Depth (m)")
-PAR_bed.plot(ax=axs[1], cmap="plasma")
-axs[1].set_title("PAR at Bed (E m⁻² d⁻¹)")
-ssi.plot(ax=axs[2], cmap="YlGn")
-axs[2].set_title("Seagrass Suitability Index")
-plt.tight_layout()
-plt.show()
+physics_step(
+    paths.store,
+    daily=paths.store if "KD490_daily" in store_variables(paths.store) else None,
+    tile=TILE, time_resolved=TIME_RESOLVED, netcdf=WRITE_NETCDF, paths=paths, show=True,
+)
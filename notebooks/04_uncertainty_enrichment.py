@@ -1,105 +1,31 @@
 # ==============================================================
 # LiBuTS Step 4 — Enrich with Physics Drivers & Uncertainty (fixed reshape)
+# Implementation: libuts.steps.uncertainty_step
 # ==============================================================
 
-import numpy as np
-import pandas as pd
-import xarray as xr
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.model_selection import KFold
-from sklearn.metrics import f1_score
-from sklearn.utils import resample
+import os, sys
 
-# ---------------------------------------------------------------------
-# 1️⃣ Load dataset
-# ---------------------------------------------------------------------
-ds = xr.open_dataset("outputs/greifswalder_step3_ml.nc")
-lat, lon = ds["lat"], ds["lon"]
-shape = ds["SSI"].shape
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from libuts.steps import uncertainty_step, step_paths
 
-# ---------------------------------------------------------------------
-# 2️⃣ Add synthetic physical drivers
-# ---------------------------------------------------------------------
-np.random.seed(42)
-ds["temp_bottom"] = xr.DataArray(
-    10 + 5*np.random.rand(*shape),
-    dims=("lat", "lon"), coords={"lat": lat, "lon": lon},
-    attrs={"units": "°C", "long_name": "Bottom temperature"}
-)
-ds["nutrients"] = xr.DataArray(
-    np.random.gamma(2, 0.3, shape),
-    dims=("lat", "lon"), coords={"lat": lat, "lon": lon},
-    attrs={"units": "mmol m⁻³", "long_name": "Nutrient concentration proxy"}
-)
-ds["shear_stress"] = xr.DataArray(
-    np.abs(np.random.normal(0.15, 0.05, shape)),
-    dims=("lat", "lon"), coords={"lat": lat, "lon": lon},
-    attrs={"units": "Pa", "long_name": "Bottom shear stress proxy"}
-)
-
-# ---------------------------------------------------------------------
-# 3️⃣ Prepare dataframe for ML classification
-# ---------------------------------------------------------------------
-df = (
-    ds[["KD490","ADG443","APH443","BBP443",
-        "depth","temp_bottom","nutrients","shear_stress","SSI"]]
-    .to_dataframe()
-    .dropna()
-)
-df["target"] = (df["SSI"] > 0.15).astype(int)
-X = df.drop(["SSI","target"], axis=1)
-y = df["target"]
-
-# ---------------------------------------------------------------------
-# 4️⃣ Cross-validated F1
-# ---------------------------------------------------------------------
-kf = KFold(n_splits=5, shuffle=True, random_state=42)
-scores=[]
-for tr, te in kf.split(X):
-    rf = RandomForestClassifier(n_estimators=300, max_depth=12, n_jobs=-1)
-    rf.fit(X.iloc[tr], y.iloc[tr])
-    scores.append(f1_score(y.iloc[te], rf.predict(X.iloc[te])))
-print(f"Mean F1 (5-fold): {np.mean(scores):.3f}")
+OUT_DIR, PREFIX = "outputs", "greifswalder"
+paths = step_paths(OUT_DIR, PREFIX)
 
-# ---------------------------------------------------------------------
-# 5️⃣ Bootstrap-based uncertainty
-# ---------------------------------------------------------------------
-rf = RandomForestClassifier(n_estimators=300, max_depth=12, n_jobs=-1)
-probs = np.vstack([
-    rf.fit(*resample(X, y, random_state=i)).predict_proba(X)[:,1]
-    for i in range(20)
-])
-uncertainty = probs.std(axis=0)
-df["uncertainty"] = uncertainty
+# Variables go to one Zarr store (<OUT_DIR>/<PREFIX>_store.zarr); True also writes the legacy NetCDF
+WRITE_NETCDF = False
 
-# ---------------------------------------------------------------------
-# 6️⃣ Map uncertainty back to 2D grid safely
-# ---------------------------------------------------------------------
-# Start with NaN grid
-uncert_grid = np.full(shape, np.nan, dtype=float)
+# Uncertainty estimator: "bootstrap" (the shipped results) refits N_BOOT forests across
+# BOOT_WORKERS processes (None → one per CPU); "ij" (infinitesimal jackknife), "trees" and
+# "oob" need one forest and are much faster, but estimate a different spread
+UNCERTAINTY_METHOD = "bootstrap"
+N_BOOT = 20
+BOOT_WORKERS = None
 
-# Match DataFrame indices (lat, lon) to DataArray positions
-lat_vals = df.index.get_level_values("lat").values
-lon_vals = df.index.get_level_values("lon").values
-lat_index = {v: i for i,v in enumerate(ds["lat"].values)}
-lon_index = {v: i for i,v in enumerate(ds["lon"].values)}
+# Spatial CV: tile size in grid cells and worker processes (None → one per fold/CPU)
+CV_BLOCK = 32
+CV_WORKERS = None
 
-for la, lo, val in zip(lat_vals, lon_vals, df["uncertainty"].values):
-    if la in lat_index and lo in lon_index:
-        uncert_grid[lat_index[la], lon_index[lo]] = val
-
-ds["uncertainty"] = xr.DataArray(
-    uncert_grid,
-    dims=("lat","lon"),
-    coords={"lat": lat, "lon": lon},
-    name="uncertainty",
-    attrs={"long_name":"Model uncertainty (bootstrapped std)",
-           "units":"(0–1)"}
+uncertainty_step(
+    paths.store, method=UNCERTAINTY_METHOD, n_boot=N_BOOT, boot_workers=BOOT_WORKERS,
+    cv_block=CV_BLOCK, cv_workers=CV_WORKERS, netcdf=WRITE_NETCDF, paths=paths,
 )
-
-# ---------------------------------------------------------------------
-# 7️⃣ Save results
-# ---------------------------------------------------------------------
-ds.to_netcdf("outputs/greifswalder_step4_physics_uncertainty.nc")
-df.to_csv("outputs/greifswalder_uncertainty.csv", index=False)
-print("✅ Step 4 completed → enriched physics + uncertainty saved.")
@@ -0,0 +1,4 @@
+# Make the ``libuts`` package importable when running ``pytest vignettes/``
+import os, sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
@@ -1,10 +1,12 @@
 import os, xarray as xr
+from libuts.store import STORE, open_store
 
 def test_inputs_retrieval():
-    assert os.path.exists("outputs/greifswalder_inputs.nc"), \
+    fn = "outputs/greifswalder_inputs.nc"
+    assert os.path.exists(STORE) or os.path.exists(fn), \
         "Expected clean dataset not found."
 
-    ds = xr.open_dataset("outputs/greifswalder_inputs.nc")
+    ds = open_store(STORE) if os.path.exists(STORE) else xr.open_dataset(fn)
     expected_vars = {"KD490","ADG443","APH443","BBP443","PAR_surface","depth"}
     assert expected_vars.issubset(ds.data_vars), "Missing variables in dataset."
     assert (ds["depth"] < 0).any(), "Depth masking seems incorrect."
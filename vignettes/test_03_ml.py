@@ -1,9 +1,10 @@
 import os, xarray as xr
+from libuts.store import STORE, open_store
 
 def test_ml_rf_results():
     fn = "outputs/greifswalder_step3_ml.nc"
-    assert os.path.exists(fn), "ML step output missing."
-    ds = xr.open_dataset(fn)
+    assert os.path.exists(STORE) or os.path.exists(fn), "ML step output missing."
+    ds = open_store(STORE) if os.path.exists(STORE) else xr.open_dataset(fn)
     assert "SSI_ML" in ds, "Predicted SSI_ML missing."
     import numpy as np
     ssi = ds["SSI"].values.flatten()
@@ -0,0 +1,31 @@
+import numpy as np, xarray as xr
+from libuts.streaming import stream_reduce, plan_blocks, peak_rss_mb
+
+def _cube(nt=31, ny=40, nx=30):
+    rng = np.random.default_rng(0)
+    data = rng.random((nt, ny, nx)).astype("float32")
+    data[rng.random(data.shape) < 0.3] = np.nan      # cloud-masked L3 pixels
+    data[:, 0, 0] = np.nan                            # never observed
+    return xr.Dataset(
+        {"KD490": (("time", "latitude", "longitude"), data)},
+        coords={"time": np.arange(nt), "latitude": np.linspace(54.0, 54.4, ny),
+                "longitude": np.linspace(13.3, 13.7, nx)},
+    )
+
+def test_stream_reduce_matches_in_memory_mean():
+    ds = _cube()
+    # Tiny budget forces many (time, row) blocks
+    out = stream_reduce(ds, ["KD490"], budget_mb=0.01)
+    ref = ds["KD490"]
+    np.testing.assert_allclose(out["KD490"], ref.mean("time"), rtol=1e-5)
+    np.testing.assert_array_equal(out["KD490_count"], ref.count("time"))
+    np.testing.assert_allclose(out["KD490_min"], ref.min("time"))
+    np.testing.assert_allclose(out["KD490_max"], ref.max("time"))
+    assert np.isnan(out["KD490"][0, 0]), "Unobserved pixel should stay NaN."
+    assert peak_rss_mb() > 0
+    print("✅ Streaming blocks:", out.attrs["block"])
+
+def test_plan_blocks_respects_budget():
+    t, rows = plan_blocks(365, 2000, 2000, itemsize=4, n_vars=3, budget_mb=256)
+    assert t * rows * 2000 * 4 * 3 * 3 <= 256 * 1024**2
+    assert plan_blocks(31, 10, 10, 4) == (31, 10), "Small cubes should be one block."
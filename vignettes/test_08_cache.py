@@ -0,0 +1,65 @@
+import numpy as np, pandas as pd, xarray as xr, pytest
+from libuts.cache import SubsetCache
+
+AOI = dict(lon_min=13.3, lon_max=13.7, lat_min=54.0, lat_max=54.4)
+DATASET = "cmems_obs-oc_bal_bgc-transp_nrt_l3-olci-300m_P1D"
+
+class StandInReader:
+    """Local replacement for Copernicus Marine that records every call."""
+    def __init__(self, published=None):
+        self.calls = []
+        self.published = published                   # last day available (near-real-time lag)
+
+    def __call__(self, dataset_id, variables, aoi, start, end):
+        self.calls.append((start, end))
+        time = pd.date_range(start, end, freq="D")
+        time = time[time.day != 10]                  # a fully clouded day
+        if self.published:
+            time = time[time <= self.published]
+        data = time.day.values[:, None, None] * np.ones((1, 4, 5), "float32")
+        return xr.Dataset(
+            {"KD490": (("time", "latitude", "longitude"), data)},
+            coords={"time": time, "latitude": np.linspace(54.0, 54.4, 4),
+                    "longitude": np.linspace(13.3, 13.7, 5)},
+        )
+
+def test_cache_fetches_only_missing_days(tmp_path):
+    reader = StandInReader()
+    cache = SubsetCache(tmp_path, reader=reader)
+
+    ds = cache.open(DATASET, ["KD490"], AOI, "2024-07-01", "2024-07-15")
+    assert ds.sizes["time"] == 14 and reader.calls == [("2024-07-01", "2024-07-15")]
+
+    # Unchanged config → no reader calls
+    cache.open(DATASET, ["KD490"], AOI, "2024-07-01", "2024-07-15")
+    assert len(reader.calls) == 1, "Rerun should be served from disk."
+
+    # Widened period → only the new days are fetched
+    ds = cache.open(DATASET, ["KD490"], AOI, "2024-06-28", "2024-07-31")
+    assert reader.calls[1:] == [("2024-06-28", "2024-06-30"), ("2024-07-16", "2024-07-31")]
+    assert ds.sizes["time"] == 33
+    assert float(ds["KD490"].isel(time=-1).mean()) == 31.0
+    print("✅ Cache calls:", reader.calls)
+
+def test_offline_cache_refuses_missing_days(tmp_path):
+    SubsetCache(tmp_path, reader=StandInReader()).open(DATASET, ["KD490"], AOI, "2024-07-01", "2024-07-05")
+    offline = SubsetCache(tmp_path, reader=StandInReader(), offline=True)
+    assert offline.open(DATASET, ["KD490"], AOI, "2024-07-01", "2024-07-05").sizes["time"] == 5
+    with pytest.raises(RuntimeError):
+        offline.open(DATASET, ["KD490"], AOI, "2024-07-01", "2024-07-06")
+
+def test_days_published_late_are_fetched_again(tmp_path):
+    reader = StandInReader(published="2024-07-14")
+    cache = SubsetCache(tmp_path, reader=reader, today="2024-07-16", latency_days=3)
+    assert cache.open(DATASET, ["KD490"], AOI, "2024-07-08", "2024-07-16").sizes["time"] == 6
+    assert [str(d) for d in cache.missing(DATASET, ["KD490"], AOI, "2024-07-08", "2024-07-16")] \
+        == ["2024-07-15", "2024-07-16"], "Recent empty days stay pending; the clouded 10th is done."
+    offline = SubsetCache(tmp_path, reader=reader, offline=True, today="2024-07-16", latency_days=3)
+    assert offline.open(DATASET, ["KD490"], AOI, "2024-07-08", "2024-07-16").sizes["time"] == 6
+
+    reader.published = "2024-07-16"                  # the 15th and 16th appear
+    ds = cache.open(DATASET, ["KD490"], AOI, "2024-07-08", "2024-07-16")
+    assert reader.calls[-1] == ("2024-07-15", "2024-07-16") and ds.sizes["time"] == 8
+    assert float(ds["KD490"].isel(time=-1).mean()) == 16.0
+    assert not cache.missing(DATASET, ["KD490"], AOI, "2024-07-08", "2024-07-16")
+    print("✅ Late near-real-time days fetched on the next run:", reader.calls)
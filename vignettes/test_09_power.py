@@ -0,0 +1,59 @@
+import json, threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+import numpy as np, xarray as xr, pytest
+from libuts.power import PowerClient, interp_to_grid, power_nodes
+
+AOI = dict(lon_min=13.3, lon_max=13.7, lat_min=54.0, lat_max=54.4)
+
+@pytest.fixture
+def power_server():
+    """Local stand-in for the POWER point API (SWRAD = 10·lat + lon)."""
+    hits = {"n": 0, "fail_next": 1}
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if hits["fail_next"]:
+                hits["fail_next"] -= 1
+                self.send_response(503); self.end_headers(); return
+            hits["n"] += 1
+            q = parse_qs(urlparse(self.path).query)
+            sw = 10 * float(q["latitude"][0]) + float(q["longitude"][0])
+            body = {"properties": {"parameter": {"ALLSKY_SFC_SW_DWN":
+                    {"20240701": sw, "20240702": sw, "20240703": -999.0}}}}
+            self.send_response(200); self.end_headers()
+            self.wfile.write(json.dumps(body).encode())
+
+        def log_message(self, *args):
+            pass
+
+    srv = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{srv.server_port}/point", hits
+    srv.shutdown()
+
+def test_par_grid_is_pooled_cached_and_interpolated(power_server, tmp_path):
+    url, hits = power_server
+    client = PowerClient(base_url=url, cache_dir=tmp_path, max_workers=4, backoff=0)
+    par = client.par_grid(AOI, "2024-07-01", "2024-07-03", step=0.2)
+    lats, lons = power_nodes(AOI, 0.2)
+    assert par.shape == (len(lats), len(lons)) == (3, 3)
+    np.testing.assert_allclose(par.sel(lat=54.0, lon=13.3), (540 + 13.3) * 0.45)
+    assert hits["n"] == 9, "One request per node (503 retried)."
+
+    again = PowerClient(base_url=url, cache_dir=tmp_path)
+    again.par_grid(AOI, "2024-07-01", "2024-07-03", step=0.2)
+    assert hits["n"] == 9 and again.summary()["cache_hit_rate"] == 1.0
+    offline = PowerClient(base_url=url, cache_dir=tmp_path, offline=True)
+    offline.par_grid(AOI, "2024-07-01", "2024-07-03", step=0.2)
+    with pytest.raises(RuntimeError):
+        offline.par_grid(AOI, "2024-07-01", "2024-07-04", step=0.2)
+    assert hits["n"] == 9, "Offline clients never hit the network."
+    assert client.summary()["requests_per_s"] > 0
+
+    lat = xr.DataArray(np.linspace(53.95, 54.45, 6), dims="latitude")
+    lon = xr.DataArray(np.linspace(13.3, 13.7, 4), dims="longitude")
+    grid = interp_to_grid(par, lat, lon)
+    assert grid.dims == ("latitude", "longitude") and np.isfinite(grid).all()
+    assert float(grid[-1, 0] - grid[0, 0]) == pytest.approx(10 * 0.4 * 0.45)
+    print("✅ POWER summary:", client.summary())
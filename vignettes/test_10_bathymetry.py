@@ -0,0 +1,33 @@
+import numpy as np, xarray as xr
+from libuts.bathymetry import gebco_on_grid, read_gebco_window, nearest_index
+
+def _gebco(path, descending=False):
+    lat = np.arange(50.0, 60.0, 1 / 240)                 # 15 arc-second spacing
+    lon = np.arange(10.0, 20.0, 1 / 240)
+    if descending:
+        lat = lat[::-1]
+    elev = (100 * np.sin(lat)[:, None] + lon[None, :] - 60).astype("int16")
+    xr.Dataset({"elevation": (("lat", "lon"), elev)},
+               coords={"lat": lat, "lon": lon}).to_netcdf(path)
+    return xr.open_dataset(path)["elevation"]
+
+def test_windowed_read_matches_nearest_interp(tmp_path):
+    for descending in (False, True):
+        fn = tmp_path / f"gebco_{descending}.nc"
+        full = _gebco(fn, descending)
+        lat = xr.DataArray(np.linspace(54.0, 54.4, 134), dims="latitude")
+        lon = xr.DataArray(np.linspace(13.3, 13.7, 90), dims="longitude")
+
+        depth = gebco_on_grid(fn, lat, lon)
+        ref = full.interp(lat=lat, lon=lon, method="nearest")
+        np.testing.assert_array_equal(depth.values, ref.values)
+        assert depth.dims == ("latitude", "longitude")
+
+        slab = read_gebco_window(fn, (54.0, 54.4), (13.3, 13.7))
+        assert slab.size < full.size / 500, "Only the AOI window should be loaded."
+    print("✅ GEBCO slab shape:", slab.shape)
+
+def test_nearest_index_handles_both_directions():
+    src = np.array([0.0, 1.0, 2.0, 3.0])
+    assert nearest_index(src, [-1, 0.4, 0.6, 2.5, 9]).tolist() == [0, 0, 1, 2, 3]
+    assert nearest_index(src[::-1], [0.4, 2.6]).tolist() == [3, 0]
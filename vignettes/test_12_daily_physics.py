@@ -0,0 +1,33 @@
+import numpy as np, xarray as xr
+from libuts.physics import daily_light_budget, par_at_bed
+
+def test_daily_metrics_with_cloud_gaps():
+    # One pixel, 10 days; NaN = cloud-masked L3 day
+    kd = xr.DataArray(
+        np.array([0.1, 0.1, 1.0, np.nan, np.nan, 1.0, 0.1, 1.0, 1.0, 0.1])[:, None, None],
+        dims=("time", "lat", "lon"),
+    )
+    par = xr.DataArray([[20.0]], dims=("lat", "lon"))
+    depth = xr.DataArray([[-3.0]], dims=("lat", "lon"))
+    out = daily_light_budget(par, kd, depth, threshold=3.0).squeeze()
+
+    # exp(-0.3)·20 ≈ 14.8 (light) and exp(-3)·20 ≈ 1.0 (limited)
+    assert int(out["n_valid_days"]) == 8
+    assert float(out["frac_days_above"]) == 4 / 8
+    # days 2–5 are limited (gaps carry day 2), i.e. a run of 4
+    assert float(out["max_light_limited_run"]) == 4
+    filled = [0.1, 0.1, 1.0, 1.0, 1.0, 1.0, 0.1, 1.0, 1.0, 0.1]
+    assert np.isclose(float(out["PAR_bed_cumulative"]), (20 * np.exp(-3 * np.array(filled))).sum())
+    # Jensen: mean of daily bottom light ≠ bottom light of mean KD490
+    assert float(out["PAR_bed_daily_mean"]) > float(par_at_bed(par, kd.mean("time"), depth).squeeze())
+
+def test_daily_metrics_dask_matches_numpy():
+    rng = np.random.default_rng(1)
+    kd = rng.uniform(0.1, 1.5, (60, 20, 30))
+    kd[rng.random(kd.shape) < 0.4] = np.nan
+    kd = xr.DataArray(kd, dims=("time", "lat", "lon"))
+    par = xr.full_like(kd.isel(time=0), 25.0)
+    depth = xr.DataArray(-rng.uniform(1, 10, (20, 30)), dims=("lat", "lon"))
+    eager = daily_light_budget(par, kd, depth)
+    lazy = daily_light_budget(par.chunk(7), kd.chunk({"time": 10, "lat": 7, "lon": 7}), depth.chunk(7))
+    xr.testing.assert_allclose(eager, lazy.compute())
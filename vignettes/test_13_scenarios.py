@@ -0,0 +1,30 @@
+import sys, os, numpy as np, xarray as xr
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "benchmarks"))
+from synthetic import step1_grid
+from libuts.physics import light_budget
+from libuts.scenarios import scenario_table, evaluate_scenarios, scenario_summary
+
+def test_scenarios_broadcast_matches_single_runs():
+    ds = step1_grid(80)
+    table = scenario_table(
+        weights=[[0.5, 0.3, 0.2], [0.6, 0.3, 0.1], [0.5, 0.3, 0.2]],
+        kd_scale=[1.0, 1.0, 0.8], depth_offset=[0.0, 0.0, -0.5],
+    )
+    res = evaluate_scenarios(ds, table)
+    assert res["SSI"].dims == ("scenario", "latitude", "longitude")
+    np.testing.assert_allclose(res["SSI"].isel(scenario=0), light_budget(ds)["SSI"], atol=1e-6)
+
+    # Scenario 2 equals Step 2 run on perturbed inputs
+    pert = ds.assign(KD490=ds["KD490"] * 0.8, depth=ds["depth"] - 0.5)
+    np.testing.assert_allclose(res["SSI"].isel(scenario=2), light_budget(pert)["SSI"], atol=1e-6)
+
+    summary = scenario_summary(res)
+    assert len(summary) == 3 and summary["suitable_fraction"].between(0, 1).all()
+    print("✅ Scenario summary:\n", summary)
+
+def test_scenarios_chunked_along_scenario():
+    ds = step1_grid(40)
+    table = scenario_table(kd_scale=np.linspace(0.5, 1.5, 50))
+    lazy = evaluate_scenarios(ds, table, chunk=8)
+    assert lazy["SSI"].chunks[0][0] == 8
+    xr.testing.assert_allclose(lazy.compute(), evaluate_scenarios(ds, table))
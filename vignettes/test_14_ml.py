@@ -0,0 +1,28 @@
+import sys, os, numpy as np
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "benchmarks"))
+from synthetic import write_step1, step1_grid
+from libuts.ml import FEATURES, load_or_train, predict_grid
+
+PARAMS = dict(n_estimators=20, max_depth=6, random_state=0, n_jobs=1)
+
+def test_model_persistence_and_chunked_prediction(tmp_path):
+    src = write_step1(tmp_path / "inputs.nc", 90)
+    ds = step1_grid(90)
+    X = np.stack([ds[v].values.ravel() for v in FEATURES], axis=1)
+    X = X[~np.isnan(ds["depth"].values.ravel())]
+    y = X[:, 0] * 0.5 + X[:, 1]
+
+    rf, meta = load_or_train(X, y, params=PARAMS, model_dir=tmp_path / "models")
+    assert meta["trained"] and os.path.exists(meta["path"])
+    _, again = load_or_train(X, y, params=PARAMS, model_dir=tmp_path / "models")
+    assert not again["trained"] and again["path"] == meta["path"], "Unchanged inputs should skip training."
+    _, other = load_or_train(X, y + 1, params=PARAMS, model_dir=tmp_path / "models")
+    assert other["trained"] and other["data_hash"] != meta["data_hash"]
+
+    full = np.stack([ds[v].values.ravel() for v in FEATURES], axis=1)
+    expected = rf.predict(full).astype("float32").reshape(90, 90)
+    for workers in (0, 2):
+        grid = predict_grid(meta["path"], src, tmp_path / f"ssi_{workers}.npy",
+                            rows_per_chunk=17, n_workers=workers)
+        np.testing.assert_allclose(grid, expected, rtol=1e-6)
+    print("✅ Model artefact:", os.path.basename(meta["path"]))
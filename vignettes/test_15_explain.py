@@ -0,0 +1,45 @@
+import os, joblib, numpy as np
+from libuts.ml import load_or_train
+from libuts.explain import compute_explanation, stratified_sample, latest_explanation
+
+def test_stratified_sample_covers_target_range():
+    y = np.r_[np.zeros(900), np.linspace(0.5, 1, 100)]
+    idx = stratified_sample(y, 100)
+    assert 90 <= len(idx) <= 110 and len(np.unique(idx)) == len(idx)
+    assert (y[idx] > 0.5).sum() >= 5, "Rare high-SSI rows should be represented."
+
+def test_explanation_artefact_is_reused(tmp_path):
+    rng = np.random.default_rng(0)
+    X = rng.random((3000, 4))
+    y = 2 * X[:, 0] + X[:, 2]
+    params = dict(n_estimators=10, max_depth=5, random_state=0, n_jobs=1)
+    _, meta = load_or_train(X, y, params=params, model_dir=tmp_path)
+    feats = ["KD490", "ADG443", "APH443", "BBP443"]
+
+    serial = compute_explanation(meta["path"], meta["data_hash"], X, y, feats,
+                                 n_samples=300, out_dir=tmp_path / "a")
+    parallel = compute_explanation(meta["path"], meta["data_hash"], X, y, feats,
+                                   n_samples=300, n_workers=2, chunk=64, out_dir=tmp_path / "b")
+    np.testing.assert_allclose(serial["shap_values"], parallel["shap_values"], rtol=1e-5, atol=1e-6)
+    assert serial["ranking"]["Variable"].iloc[0] == "KD490"
+    # SHAP additivity on the stored sample
+    np.testing.assert_allclose(serial["shap_values"].sum(1) + serial["base_value"],
+                               joblib.load(meta["path"]).predict(serial["X"].values), atol=1e-4)
+
+    mtime = os.path.getmtime(serial["path"])
+    again = compute_explanation(meta["path"], meta["data_hash"], X, y, feats, n_samples=300,
+                                out_dir=tmp_path / "a")
+    assert os.path.getmtime(again["path"]) == mtime, "Artefact should be read, not recomputed."
+    assert latest_explanation(tmp_path / "a")["model_hash"] == meta["data_hash"]
+
+    # Another sample size or seed is another artefact; the dashboard picks by model hash
+    other = compute_explanation(meta["path"], meta["data_hash"], X, y, feats, n_samples=200, out_dir=tmp_path / "a")
+    reseeded = compute_explanation(meta["path"], meta["data_hash"], X, y, feats, n_samples=300, seed=1,
+                                   out_dir=tmp_path / "a")
+    assert len({serial["path"], other["path"], reseeded["path"]}) == 3
+    assert len(other["X"]) < len(serial["X"]) and not np.array_equal(reseeded["index"], serial["index"])
+    _, meta2 = load_or_train(X, y, params=dict(params, max_depth=3), model_dir=tmp_path)
+    compute_explanation(meta2["path"], meta2["data_hash"], X, y, feats, n_samples=100, out_dir=tmp_path / "a")
+    assert latest_explanation(tmp_path / "a")["model_hash"] == meta2["data_hash"]
+    assert latest_explanation(tmp_path / "a", model_hash=meta["data_hash"])["model_hash"] == meta["data_hash"]
+    assert latest_explanation(tmp_path / "a", model_hash="0" * 64) is None
@@ -0,0 +1,34 @@
+import sys, os, json, numpy as np
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "benchmarks"))
+from synthetic import write_step1
+import xarray as xr
+from libuts.stats import load_or_compute_stats, summary_frame, corr_frame, stats_path
+
+def test_streaming_stats_match_pandas(tmp_path):
+    src = str(write_step1(tmp_path / "step3.nc", 150))
+    stats = load_or_compute_stats(src, rows=37)
+    df = xr.open_dataset(src).to_dataframe()
+
+    ref = df.describe().T
+    got = summary_frame(stats).set_index("Variable")
+    for col in ["count", "mean", "std", "min", "max"]:
+        np.testing.assert_allclose(got[col], ref.loc[got.index, col], rtol=1e-6)
+    span = (ref["max"] - ref["min"]).loc[got.index]
+    for col in ["25%", "50%", "75%"]:
+        assert (abs(got[col] - ref.loc[got.index, col]) <= 2 * span / 4096 + 1e-9).all()
+
+    corr = corr_frame(stats)
+    np.testing.assert_allclose(corr, df.dropna().corr().loc[corr.index, corr.columns], atol=1e-9)
+    print("✅ Stats cache:", stats_path(src))
+
+def test_stats_cache_refreshes_on_content_change(tmp_path):
+    src = str(write_step1(tmp_path / "step3.nc", 40))
+    first = load_or_compute_stats(src)
+    os.utime(src, (0, 0))                          # touched, same content → no recompute
+    assert load_or_compute_stats(src)["source"]["sha256"] == first["source"]["sha256"]
+
+    write_step1(src, 40, seed=1)                   # new content → recomputed
+    second = load_or_compute_stats(src)
+    assert second["source"]["sha256"] != first["source"]["sha256"]
+    with open(stats_path(src)) as f:
+        assert json.load(f)["source"]["sha256"] == second["source"]["sha256"]
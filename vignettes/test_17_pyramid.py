@@ -0,0 +1,21 @@
+import sys, os, numpy as np
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "benchmarks"))
+from synthetic import step1_grid
+from libuts.pyramid import build_pyramid, Pyramid
+
+def test_pyramid_levels_and_viewport_selection(tmp_path):
+    ds = step1_grid(1000).rename({"latitude": "lat", "longitude": "lon"})
+    levels = build_pyramid(ds, tmp_path / "pyr.zarr", variables=["KD490", "depth"], chunk=128, min_size=128)
+    assert [lv["shape"][0] for lv in levels] == [1000, 500, 250, 125]
+
+    pyr = Pyramid(tmp_path / "pyr.zarr")
+    np.testing.assert_allclose(pyr.level(1)["KD490"][0, 0], ds["KD490"][:2, :2].mean(), rtol=1e-6)
+
+    full, i_full = pyr.view("KD490", width=200, height=200)
+    assert i_full == 2 and full.shape == (250, 250), "Full extent on 200 px → 250-cell level."
+
+    # Zoomed into ~5 % of the extent → full-resolution level, small slice
+    x = (13.40, 13.42); y = (54.10, 54.12)
+    zoom, i_zoom = pyr.view("KD490", x, y, width=200, height=200)
+    assert i_zoom == 0 and zoom.size < 60 * 60
+    np.testing.assert_allclose(zoom, ds["KD490"].sel(lat=zoom.lat, lon=zoom.lon), rtol=1e-6)
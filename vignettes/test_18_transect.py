@@ -0,0 +1,52 @@
+import sys, os, time, numpy as np, pytest
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "benchmarks"))
+from synthetic import step1_grid
+from libuts.transect import TransectSampler, densify
+
+def test_transect_matches_sel():
+    ds = step1_grid(2000).rename({"latitude": "lat", "longitude": "lon"})
+    sampler = TransectSampler(ds)
+
+    # Constant-latitude line reproduces the old nearest-latitude cut
+    lat = float(ds.lat[777])
+    df = sampler.profile(sampler.latitude_line(lat), ["KD490", "depth"])
+    ref = ds.sel(lat=lat, method="nearest")
+    np.testing.assert_array_equal(df["KD490"].values, ref["KD490"].values)
+    assert df["distance_km"].is_monotonic_increasing
+
+    # Arbitrary polyline: about one sample per crossed cell, all variables together
+    corridor = [(13.35, 54.05), (13.5, 54.2), (13.65, 54.3)]
+    sampler.profile(corridor, ["KD490", "depth", "PAR_surface"])    # warm up arrays
+    t0 = time.perf_counter()
+    df = sampler.profile([(13.36, 54.06), (13.5, 54.25)], ["KD490", "depth", "PAR_surface"])
+    cold_ms = (time.perf_counter() - t0) * 1000
+    t0 = time.perf_counter()
+    sampler.profile([(13.36, 54.06), (13.5, 54.25)], ["KD490", "depth", "PAR_surface"])
+    warm_ms = (time.perf_counter() - t0) * 1000
+    assert len(densify(corridor, sampler.dx, sampler.dy)) >= 2 * len(df) // 3
+    print(f"✅ Transect on 2000² grid: {cold_ms:.1f} ms new geometry, {warm_ms:.2f} ms cached.")
+
+def test_transect_clipped_to_grid():
+    ds = step1_grid(200).rename({"latitude": "lat", "longitude": "lon"})
+    sampler = TransectSampler(ds)
+    lon0, lon1 = float(ds.lon.min()), float(ds.lon.max())
+    lat = float(ds.lat[100])
+
+    # Wholly outside: an empty profile, not an error
+    df = sampler.profile([(lon1 + 0.1, lat), (lon1 + 0.3, lat + 0.1)], ["KD490"])
+    assert df.empty and list(df.columns) == ["distance_km", "lon", "lat", "KD490"]
+
+    # Partly outside: samples only inside, distance still measured from the first vertex
+    inside = sampler.profile([(lon0, lat), (lon1, lat)], ["KD490"])
+    longer = sampler.profile([(lon0 - 0.1, lat), (lon1 + 0.1, lat)], ["KD490"])
+    assert longer["lon"].between(lon0, lon1).all() and len(longer) >= len(inside)
+    km_per_deg = inside["distance_km"].iloc[-1] / (lon1 - lon0)
+    assert longer["distance_km"].iloc[0] == pytest.approx(0.1 * km_per_deg)
+
+    # Leaving and re-entering: the gap keeps its along-track length
+    out_and_back = [(lon0, lat), (lon1 + 0.2, lat), (lon1 + 0.2, lat + 0.01), (lon0, lat + 0.01)]
+    df = sampler.profile(out_and_back, ["KD490"])
+    assert df["distance_km"].is_monotonic_increasing and np.isfinite(df["KD490"]).all()
+    gap = df["distance_km"].diff().max()
+    assert gap > 2 * 0.2 * km_per_deg, "The outside detour must count towards the distance."
+    print(f"✅ Transects clipped to the grid ({gap:.1f} km outside detour kept)")
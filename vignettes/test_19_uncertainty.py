@@ -0,0 +1,26 @@
+import numpy as np
+from sklearn.datasets import make_classification
+from sklearn.ensemble import RandomForestClassifier
+from libuts.uncertainty import prediction_std, tree_predictions, inbag_counts, ij_std
+
+def test_single_fit_estimators_agree_with_bootstrap():
+    X, y = make_classification(n_samples=600, n_features=5, flip_y=0.1, random_state=0)
+    params = dict(n_estimators=60, max_depth=6, random_state=0)
+    rf = RandomForestClassifier(**params).fit(X, y)
+
+    np.testing.assert_allclose(prediction_std(rf, X, "trees", chunk=128), tree_predictions(rf, X).std(axis=0))
+    assert inbag_counts(rf, len(X)).sum(axis=1).tolist() == [len(X)] * 60
+
+    oob = prediction_std(rf, X, "oob")
+    ij = prediction_std(rf, X, "ij", chunk=100)
+    boot = prediction_std(RandomForestClassifier(**params), X, "bootstrap", y=y, n_boot=6, n_workers=0)
+    assert np.isfinite(oob).mean() > 0.99 and (ij >= 0).all()
+    assert np.corrcoef(ij, boot)[0, 1] > 0.3, "IJ should track the refit bootstrap."
+    assert 0.3 < ij.mean() / boot.mean() < 3, "IJ and bootstrap std should be on the same scale."
+
+    # In-bag counts and the IJ Gram matrix in blocks of training rows give the same result
+    full = np.stack([np.bincount(s, minlength=len(X)) for s in rf.estimators_samples_])
+    np.testing.assert_array_equal(inbag_counts(rf, len(X)), full)
+    np.testing.assert_array_equal(inbag_counts(rf, len(X), slice(100, 250)), full[:, 100:250])
+    np.testing.assert_allclose(ij_std(rf, X, len(X), budget_mb=0.05), ij, rtol=1e-9, atol=1e-12)   # 109-row blocks
+    print(f"✅ Mean std — IJ {ij.mean():.3f}, bootstrap {boot.mean():.3f}, OOB {np.nanmean(oob):.3f}")
@@ -0,0 +1,19 @@
+import numpy as np
+from sklearn.datasets import make_classification
+from sklearn.ensemble import RandomForestClassifier
+from libuts.cv import spatial_block_folds, cross_validate
+
+def test_spatial_folds_are_tile_aligned_and_parallel_matches_serial():
+    rows, cols = np.divmod(np.arange(100 * 80), 80)
+    folds = spatial_block_folds(rows, cols, block=10, n_splits=5)
+    tiles = (rows // 10) * 8 + cols // 10
+    assert all(len(np.unique(folds[tiles == t])) == 1 for t in np.unique(tiles)), "Tiles split across folds."
+    assert np.bincount(folds).min() >= 0.8 * len(folds) / 5, "Folds unbalanced."
+
+    X, y = make_classification(n_samples=len(rows), n_features=5, random_state=0)
+    rf = RandomForestClassifier(n_estimators=20, max_depth=6, random_state=0)
+    serial = cross_validate(rf, X, y, folds, n_workers=0)
+    parallel = cross_validate(rf, X, y, folds, n_workers=2)
+    assert list(serial["fold"]) == [0, 1, 2, 3, 4] and serial["n_test"].sum() == len(y)
+    np.testing.assert_allclose(serial["score"], parallel["score"])
+    print(f"✅ Spatial 5-fold F1 = {serial['score'].mean():.3f}")
@@ -0,0 +1,25 @@
+import sys, os, numpy as np
+from scipy import ndimage
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "benchmarks"))
+from synthetic import restoration_candidates
+from libuts.patches import label_patches, patch_table, expand, PATCH_FEATURES
+from libuts.planner import RestorationProblem, OBJECTIVES
+
+def test_patch_objectives_equal_expanded_pixel_objectives():
+    df, shape = restoration_candidates(120)
+    labels = label_patches(df["row"], df["col"], df[PATCH_FEATURES].values, shape, patch_size=40)
+    patches = patch_table(df, labels, OBJECTIVES)
+    assert len(patches) == labels.max() + 1 and len(patches) < len(df) / 20
+    assert patches["n_pixels"].sum() == len(df)
+
+    # Every patch is one 4-connected region of the grid
+    for patch in np.unique(labels):
+        mask = np.zeros(shape, dtype=bool)
+        mask[df["row"].values[labels == patch], df["col"].values[labels == patch]] = True
+        assert ndimage.label(mask)[1] == 1, f"Patch {patch} is not contiguous."
+
+    choice = np.random.default_rng(0).random((5, len(patches))) > 0.7
+    F_patch = RestorationProblem(patches, weights=patches["n_pixels"].values).evaluate(choice)
+    F_pixel = RestorationProblem(df).evaluate(np.stack([expand(labels, c) for c in choice]))
+    np.testing.assert_allclose(F_patch, F_pixel, rtol=1e-9)
+    print(f"✅ {len(df)} pixels → {len(patches)} patches; objectives preserved.")
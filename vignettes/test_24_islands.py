@@ -0,0 +1,28 @@
+import sys, os, numpy as np, pytest
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "benchmarks"))
+from synthetic import restoration_candidates
+from libuts.planner import RestorationProblem, attribute_matrix, front_hypervolume
+from libuts.islands import PooledRestorationProblem, run_islands, share, attach
+
+def test_pooled_evaluation_and_island_model():
+    df, _ = restoration_candidates(80)
+    X = np.random.default_rng(0).random((30, len(df)))
+    with PooledRestorationProblem(df, n_workers=2, representation="bitset") as pooled:
+        np.testing.assert_allclose(pooled.evaluate(X), RestorationProblem(df).evaluate(X), rtol=1e-10)
+
+    shm, spec = share(np.arange(6.0))
+    _, view = attach(spec)
+    assert view.sum() == 15 and not view.flags.writeable
+    shm.close(); shm.unlink()
+
+    epochs = []
+    res = run_islands(df, n_islands=2, n_gen=12, migrate_every=4, n_migrants=3, pop_size=24,
+                      callback=lambda n, pop, X, F: epochs.append((n, pop.shape, len(X))))
+    assert [h["n_gen"] for h in res.history] == [4, 8, 12]
+    assert [(n, shape) for n, shape, _ in epochs] == [(4, (48, len(df))), (8, (48, len(df))), (12, (48, len(df)))]
+    assert len(res.X) == len(res.F) > 0
+    with pytest.raises(RuntimeError, match="Unknown encoding"):
+        run_islands(df, n_islands=2, n_gen=4, pop_size=24, encoding="gray")
+    hv = [front_hypervolume(h["F"], attribute_matrix(df)) for h in res.history]
+    assert hv[-1] >= hv[0] - 1e-12, "Merged front should not lose hypervolume."
+    print(f"✅ Islands: merged front of {len(res.F)}, HV {hv[0]:.4f} → {hv[-1]:.4f}")
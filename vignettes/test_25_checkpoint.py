@@ -0,0 +1,80 @@
+import sys, os, numpy as np
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "benchmarks"))
+from pymoo.optimize import minimize
+from synthetic import restoration_candidates
+from libuts.planner import RestorationProblem, make_algorithm, attribute_matrix, front_hypervolume
+from libuts.checkpoint import candidate_key, remap, plan_start, load_checkpoint, resume_minimize, PlannerCheckpoint
+
+def test_checkpoint_resume_and_warm_start(tmp_path):
+    path = str(tmp_path / "ckpt.npz")
+    df, shape = restoration_candidates(80)
+    flat = df["row"].values * shape[1] + df["col"].values
+    A = attribute_matrix(df)
+    key = candidate_key(A, pixel_flat=flat)
+    assert plan_start(path, key, flat, None, len(df), 40, 20).mode == "cold"
+
+    cb = PlannerCheckpoint(path, key, flat, every=5)
+    res = minimize(RestorationProblem(df), make_algorithm(40, "binary"), ("n_gen", 10), seed=1, callback=cb)
+    ckpt = load_checkpoint(path)
+    assert ckpt.n_gen == 10 and ckpt.pop.shape == (40, len(df))
+    np.testing.assert_array_equal(ckpt.front, res.X)
+
+    start = plan_start(path, key, flat, None, len(df), 40, 20, encoding="binary")
+    assert (start.mode, start.done, start.n_gen) == ("resume", 10, 10)
+    np.testing.assert_array_equal(start.sampling, res.algorithm.pop.get("X"))
+
+    # A finished plan is not rerun, nor extended by a lower n_gen; other settings are another plan
+    for n_gen in (10, 6):
+        done = plan_start(path, key, flat, None, len(df), 40, n_gen)
+        assert (done.mode, done.n_gen) == ("done", 0)
+        np.testing.assert_array_equal(done.X, res.X)
+        np.testing.assert_array_equal(done.F, res.F)
+    other = candidate_key(A, pixel_flat=flat, settings={"encoding": "real", "pop_size": 40})
+    assert other != key and plan_start(path, other, flat, None, len(df), 40, 20).mode == "warm"
+
+    # Majority vote per patch when the candidates become patches
+    n = len(df) // 4 * 4
+    sel = ckpt.front[:, :n]
+    votes = remap(sel, flat[:n], flat[:n], np.arange(n) // 4)
+    np.testing.assert_array_equal(votes, sel.reshape(len(sel), -1, 4).sum(axis=2) > 2)
+
+    # New data (a week later): slightly shifted attributes, a few pixels dropped
+    df2 = df.iloc[7:].copy()
+    df2["CO2_potential"] *= 1.02
+    flat2, A2 = flat[7:], attribute_matrix(df2)
+    warm = plan_start(path, candidate_key(A2, pixel_flat=flat2), flat2, None, len(df2), 40, 20, encoding="binary",
+                      warm_n_gen=5)
+    assert warm.mode == "warm" and warm.done == 0 and warm.n_gen == 5
+    np.testing.assert_array_equal(warm.sampling[0], ckpt.front[0, 7:])
+
+    problem = RestorationProblem(df2)
+    hv = lambda s: front_hypervolume(minimize(problem, make_algorithm(40, "binary", sampling=s),
+                                              ("n_gen", 5), seed=2).F, A2)
+    hv_cold, hv_warm = hv(None), hv(warm.sampling)
+    assert hv_warm > hv_cold, "Warm start should lead a cold start after the same generations."
+    print(f"✅ Checkpoint: resume at gen {start.done}, 5-generation HV cold {hv_cold:.4f} vs warm {hv_warm:.4f}")
+
+def test_resume_continues_the_run_exactly(tmp_path):
+    df, shape = restoration_candidates(80)
+    flat = df["row"].values * shape[1] + df["col"].values
+    problem = RestorationProblem(df)
+    for encoding in ("real", "binary"):
+        path = str(tmp_path / f"{encoding}.npz")
+        key = candidate_key(attribute_matrix(df), pixel_flat=flat, settings={"encoding": encoding})
+        full = minimize(problem, make_algorithm(40, encoding), ("n_gen", 12), seed=7)
+
+        # Interrupted after the generation-5 checkpoint, then resumed to 12
+        cb = PlannerCheckpoint(path, key, flat, every=5)
+        minimize(problem, make_algorithm(40, encoding), ("n_gen", 5), seed=7, callback=cb)
+        start = plan_start(path, key, flat, None, len(df), 40, 12, encoding=encoding)
+        assert (start.mode, start.done, start.n_gen) == ("resume", 5, 7) and start.state is not None
+        if encoding == "real":
+            assert start.sampling.dtype == np.float64 and not np.isin(start.sampling, (0.0, 1.0)).all()
+        cb = PlannerCheckpoint(path, key, flat, every=5)
+        res = resume_minimize(problem, make_algorithm(40, encoding, sampling=start.sampling), start, seed=7,
+                              callback=cb)
+        cb.save(res.algorithm, n_gen=res.algorithm.n_gen - 1)
+        np.testing.assert_array_equal(res.X, full.X)
+        np.testing.assert_array_equal(res.F, full.F)
+        assert load_checkpoint(path).n_gen == 12
+    print("✅ Checkpoint: resumed runs match uninterrupted ones (real and binary encodings)")
@@ -0,0 +1,46 @@
+import os, json
+from datetime import datetime
+from libuts.pipeline import Step, run, dependencies
+
+def _script(root, name, body):
+    with open(os.path.join(root, name), "w") as f:
+        f.write("import time, shutil\n" + body + "\n")
+
+def test_pipeline_skips_unchanged_steps(tmp_path):
+    root = str(tmp_path)
+    os.makedirs(os.path.join(root, "outputs"))
+    _script(root, "a.py", "time.sleep(1.0); open('outputs/a.txt', 'w').write('A')")
+    _script(root, "b.py", "time.sleep(1.0); open('outputs/b.txt', 'w').write('B')")
+    _script(root, "c.py", "shutil.copy('outputs/a.txt', 'outputs/c.txt')")
+    _script(root, "d.py", "open('outputs/d.txt', 'w').write(open('outputs/b.txt').read() + open('outputs/c.txt').read())")
+    steps = [Step("a", "a.py", outputs=["outputs/a.txt"]), Step("b", "b.py", outputs=["outputs/b.txt"]),
+             Step("c", "c.py", inputs=["outputs/a.txt"], outputs=["outputs/c.txt"]),
+             Step("d", "d.py", inputs=["outputs/b.txt", "outputs/c.txt"], outputs=["outputs/d.txt"])]
+    assert dependencies(steps) == {"a": set(), "b": set(), "c": {"a"}, "d": {"b", "c"}}
+    status = lambda recs: {r["step"]: r["status"] for r in recs}
+
+    first = {r["step"]: r for r in run(steps, root=root)}
+    assert set(status(first.values()).values()) == {"ran"}
+    times = {s: [datetime.fromisoformat(first[s][k]) for k in ("started", "finished")] for s in first}
+    assert all(times[u][1] <= times[s][0] for s, up in dependencies(steps).items() for u in up), \
+        "A step started before its upstream finished."
+    assert set(status(run(steps, root=root)).values()) == {"cached"}
+
+    # Same output content after a code change → only the edited step reruns
+    _script(root, "a.py", "open('outputs/a.txt', 'w').write('A')  # faster")
+    assert status(run(steps, root=root)) == {"a": "ran", "b": "cached", "c": "cached", "d": "cached"}
+    # Changed parameters propagate downstream through the files
+    steps[0].params = {"value": 2}
+    _script(root, "a.py", "open('outputs/a.txt', 'w').write('A2')")
+    assert status(run(steps, root=root)) == {"a": "ran", "b": "cached", "c": "ran", "d": "ran"}
+    assert open(os.path.join(root, "outputs/d.txt")).read() == "BA2"
+
+    os.remove(os.path.join(root, "outputs/c.txt"))
+    assert status(run(steps, targets=["c"], root=root, dry_run=True)) == {"a": "cached", "c": "would run"}
+    _script(root, "c.py", "raise SystemExit(1)")
+    assert status(run(steps, root=root)) == {"a": "cached", "b": "cached", "c": "failed", "d": "blocked"}
+
+    with open(os.path.join(root, "outputs/pipeline_runs.jsonl")) as f:
+        log = [json.loads(line) for line in f]
+    assert len(log) == 5 * 4 and {"run_id", "started", "finished", "seconds", "fingerprint"} <= set(log[0])
+    print(f"✅ Pipeline: {len({r['run_id'] for r in log})} runs logged, cache hits and invalidation as expected")
@@ -0,0 +1,39 @@
+import sys, os, numpy as np
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "benchmarks"))
+from synthetic import step1_grid, write_step1
+from libuts.steps import run_all, ml_step, uncertainty_step, step_paths, harmonize_coords, align
+from libuts.store import STEP_VARIABLES, store_variables
+
+RF = dict(n_estimators=20, max_depth=6, random_state=0, n_jobs=1)
+
+def test_steps_chain_in_memory(tmp_path):
+    ds = step1_grid(60)
+    opt = harmonize_coords(ds)
+    assert set(opt.dims) == {"lat", "lon"}
+    assert align(opt, opt) is opt, "Aligned grids should not be re-interpolated."
+    shifted = opt.assign_coords(lat=opt["lat"] + 1e-4)
+    np.testing.assert_array_equal(align(shifted, opt)["lat"], opt["lat"])
+
+    out = str(tmp_path / "mem")
+    res = run_all(ds, out_dir=out, save=["physics"], until="ml", ml=dict(rf_params=RF, shap_samples=100))
+    paths = step_paths(out)
+    assert set(store_variables(paths.store)) == set(STEP_VARIABLES["physics"])
+    assert not os.path.exists(paths.physics) and not os.path.exists(paths.ml)
+    assert not os.path.exists(paths.ssi_ml) and not os.path.exists(paths.valid_pixels)
+    assert set(res.timings) == {"physics", "ml"} and res.peak_rss_mb > 0
+
+    # Same SSI_ML as the file-based chain (pool inference on the Step 1 NetCDF), up to
+    # the float32 store encoding of the Step 2 fields, which moves a few forest splits
+    files = step_paths(str(tmp_path / "files"))
+    os.makedirs(files.out_dir)
+    write_step1(files.inputs, 60)
+    ref = ml_step(files.inputs, paths.store, n_workers=0, rf_params=RF, shap_samples=100, paths=files)
+    diff = np.abs(res.ds["SSI_ML"].values - ref.ds["SSI_ML"].values)
+    assert np.nanmean(diff) < 1e-3 and np.nanmax(diff) < 0.05
+    np.testing.assert_array_equal(res.pixels.flat, ref.pixels.flat)
+    assert "SSI_ML" in store_variables(files.store) and os.path.exists(files.valid_pixels)
+
+    unc = uncertainty_step(res.ds, pixels=res.pixels, method="trees", cv_block=8, n_splits=3, cv_workers=0,
+                           rf_params=dict(RF, n_estimators=10), save=False, paths=paths)
+    assert len(unc.cv) == 3 and np.isfinite(unc.df["uncertainty"]).all()
+    print(f"✅ In-memory chain: {res.timings}, peak RSS {res.peak_rss_mb:.0f} MB")
@@ -0,0 +1,85 @@
+import sys, os, numpy as np, pytest
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "benchmarks"))
+import xarray as xr
+from synthetic import step1_grid, daily_kd490, write_step1
+from libuts.store import STEP_VARIABLES, write_variables, open_store, store_variables, variables_through
+from libuts.steps import physics_step, ml_step, uncertainty_step, step_paths
+
+RF = dict(n_estimators=20, max_depth=6, random_state=0, n_jobs=1)
+
+def test_store_appends_and_encodes(tmp_path):
+    path = str(tmp_path / "store.zarr")
+    ds = step1_grid(300)
+    ds["PAR_surface"] = ds["PAR_surface"].astype("float64")
+    write_variables(ds, path, STEP_VARIABLES["inputs"], step="inputs", chunk=128, new=True)
+
+    lazy = open_store(path)
+    assert set(lazy.dims) == {"lat", "lon"}
+    assert all(lazy[v].dtype == np.float32 for v in lazy.data_vars)
+    assert lazy["KD490"].chunks == ((128, 128, 44), (128, 128, 44)), "Variables should open lazily, chunked."
+    assert os.path.exists(os.path.join(path, "zarr.json"))
+    np.testing.assert_allclose(lazy["depth"].values, ds["depth"].values)
+
+    # A later step adds only its own variables; the existing ones are left untouched
+    before = os.path.getmtime(os.path.join(path, "KD490", "zarr.json"))
+    extra = xr.Dataset({"SSI": lazy["KD490"] * 0 + 0.5}).load()
+    write_variables(extra, path, ["SSI"], step="physics")
+    assert store_variables(path) == {**{v: "inputs" for v in STEP_VARIABLES["inputs"]}, "SSI": "physics"}
+    assert os.path.getmtime(os.path.join(path, "KD490", "zarr.json")) == before
+
+    # Rerunning a step overwrites its variables; another grid is refused; new=True starts over
+    write_variables(extra + 0.25, path, ["SSI"], step="physics")
+    assert float(open_store(path, ["SSI"])["SSI"].max()) == 0.75
+    with pytest.raises(ValueError):
+        write_variables(step1_grid(50), path, ["KD490"])
+    write_variables(step1_grid(50), path, ["KD490"], new=True)
+    assert list(store_variables(path)) == ["KD490"]
+    print("✅ Store: float32, chunked, append-only per step, grid checked")
+
+def test_step1_rewrite_keeps_downstream_on_same_grid(tmp_path):
+    path = str(tmp_path / "store.zarr")
+    inputs = STEP_VARIABLES["inputs"]
+    write_step1(path, 80, days=4)
+    extra = xr.Dataset({"SSI": open_store(path, ["KD490"])["KD490"].load() * 0 + 0.5})
+    write_variables(extra, path, ["SSI"], step="physics")
+
+    # Refetched, identical inputs: downstream variables survive
+    write_variables(step1_grid(80), path, inputs, step="inputs", replace_grid=True)
+    assert set(store_variables(path)) == set(inputs) | {"KD490_daily", "SSI"}
+
+    # Another period: only the variables along the time axis are replaced
+    daily = daily_kd490(step1_grid(80), 6, start="2024-08-01").rename(KD490="KD490_daily")
+    write_variables(daily, path, ["KD490_daily"], step="inputs", replace_grid=True)
+    ds = open_store(path)
+    assert ds.sizes["time"] == 6 and str(ds["time"].values[0])[:10] == "2024-08-01" and "SSI" in ds
+
+    # Another grid: everything on the old grid goes
+    write_variables(step1_grid(60), path, inputs, step="inputs", replace_grid=True)
+    assert set(store_variables(path)) == set(inputs) and open_store(path).sizes["lat"] == 60
+    print("✅ Step 1 rewrite: same grid keeps downstream variables, new period / grid replaces")
+
+def test_steps_share_one_store(tmp_path):
+    paths = step_paths(str(tmp_path))
+    write_variables(step1_grid(60), paths.store, STEP_VARIABLES["inputs"], step="inputs", new=True)
+    physics_step(paths.store, paths=paths)
+    ml_step(paths.store, paths.store, n_workers=1, rf_params=RF, shap_samples=100, paths=paths)
+    res = uncertainty_step(paths.store, cv_block=16, cv_workers=0, boot_workers=0, rf_params=RF, paths=paths)
+
+    held = store_variables(paths.store)
+    assert sorted(held) == sorted(variables_through("uncertainty"))
+    assert [held[v] for v in STEP_VARIABLES["ml"]] == ["ml"]
+    assert not any(os.path.exists(p) for p in (paths.inputs, paths.physics, paths.ml, paths.enriched))
+    np.testing.assert_allclose(open_store(paths.store, ["uncertainty"])["uncertainty"].values,
+                               res.ds["uncertainty"].values, rtol=1e-6)
+    print(f"✅ Steps 1–4 → one store with {len(held)} variables")
+
+def test_physics_step_streams_into_the_store(tmp_path):
+    paths = step_paths(str(tmp_path))
+    write_step1(paths.store, 80, days=12)
+    res = physics_step(paths.store, daily=paths.store, tile=32, paths=paths)
+    assert res.ds["SSI"].chunks is not None and res.daily["PAR_bed_cumulative"].chunks is not None, \
+        "Step 2 should hand its grids to the store lazily, not load them."
+    stored = open_store(paths.store, STEP_VARIABLES["physics"] + STEP_VARIABLES["physics_daily"])
+    for name, ds in (("SSI", res.ds), ("PAR_bed_cumulative", res.daily), ("n_valid_days", res.daily)):
+        np.testing.assert_allclose(stored[name].values, ds[name].values.astype(np.float32), rtol=1e-6)
+    print("✅ Step 2 streams its static and daily grids into the store")
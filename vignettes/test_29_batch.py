@@ -0,0 +1,73 @@
+import sys, os, shutil, numpy as np, pandas as pd, pytest, yaml
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "benchmarks"))
+from synthetic import write_step1
+from libuts.batch import load_catalogue, run_batch, read_status, SUMMARY
+from libuts.store import store_variables
+
+STEPS = {
+    "ml": {"rf_params": {"n_estimators": 20, "max_depth": 6, "random_state": 0, "n_jobs": 1}, "shap_samples": 100},
+    "uncertainty": {"cv_block": 8, "n_boot": 5, "rf_params": {"n_estimators": 20, "max_depth": 6, "random_state": 0}},
+    "optimize": {"n_gen": 3, "patch_size": 20},
+}
+
+def write_catalogue(path, aois):
+    defaults = {"start": "2024-07-01", "end": "2024-07-03", "until": "optimize",
+                "save": ["physics", "ml", "uncertainty"], "steps": STEPS}
+    with open(path, "w") as f:
+        yaml.safe_dump({"defaults": defaults, "aois": aois}, f)
+
+def test_shipped_catalogue_and_validation(tmp_path):
+    aois = load_catalogue()
+    assert aois[0]["name"] == "greifswalder" and aois[0]["bbox"]["lon_min"] == 13.3
+    assert all(a["steps"]["optimize"]["n_gen"] == 50 for a in aois), "Defaults should reach every AOI."
+
+    bbox = {"lon_min": 13.3, "lon_max": 13.7, "lat_min": 54.0, "lat_max": 54.4}
+    cat = str(tmp_path / "aois.yaml")
+    write_catalogue(cat, [{"name": "a", "bbox": bbox}, {"name": "a", "bbox": bbox}])
+    with pytest.raises(ValueError):
+        load_catalogue(cat)
+    write_catalogue(cat, [{"name": "a", "bbox": dict(bbox, lon_max=13.0)}])
+    with pytest.raises(ValueError):
+        load_catalogue(cat)
+
+def test_batch_isolates_failures_and_resumes(tmp_path):
+    root = str(tmp_path)
+    write_step1(os.path.join(root, "a.nc"), 40)
+    write_step1(os.path.join(root, "b.nc"), 40, seed=1)
+    bbox = {"lon_min": 13.3, "lon_max": 13.7, "lat_min": 54.0, "lat_max": 54.4}
+    cat = os.path.join(root, "aois.yaml")
+    write_catalogue(cat, [
+        {"name": "lagoon_a", "bbox": bbox, "inputs": "a.nc"},
+        {"name": "lagoon_b", "bbox": bbox, "inputs": "b.nc", "steps": {"optimize": {"n_gen": 2}}},
+        {"name": "missing", "bbox": bbox, "inputs": "nowhere.nc"},
+        {"name": "uncached", "bbox": bbox, "cache_dir": "cache", "power_cache_dir": "power"},
+    ])
+    aois = load_catalogue(cat, root=root)
+    assert aois[1]["steps"]["optimize"] == {"n_gen": 2, "patch_size": 20}
+
+    table = run_batch(aois, out_root="out", n_workers=2, offline=True, root=root).set_index("aoi")
+    assert list(table["status"]) == ["done", "done", "failed", "failed"]
+    assert "not cached" in table.loc["uncached", "error"], "Offline runs must not fetch."
+    assert (table.loc[["lagoon_a", "lagoon_b"], "n_sites"] > 0).all()
+    assert {"physics_s", "ml_s", "uncertainty_s", "optimize_s"} <= set(table.columns)
+    held = store_variables(os.path.join(root, "out", "lagoon_a", "lagoon_a_store.zarr"))
+    assert {"SSI", "SSI_ML", "uncertainty"} <= set(held), "Each AOI writes its own namespace."
+    assert os.path.exists(os.path.join(root, "out", "lagoon_b", "lagoon_b_valid_pixels.npz"))
+    pd.testing.assert_frame_equal(pd.read_csv(os.path.join(root, "out", SUMMARY)).set_index("aoi")[["status"]],
+                                  table[["status"]])
+
+    # Rerun: finished AOIs are reused, failed ones retried, changed ones resume at the first changed step
+    aois[0]["steps"]["optimize"]["n_gen"] = 2
+    again = run_batch(aois, out_root="out", n_workers=0, offline=True, root=root).set_index("aoi")
+    assert list(again["status"]) == ["done", "cached", "failed", "failed"]
+    assert again.loc["lagoon_b", "n_sites"] == table.loc["lagoon_b", "n_sites"]
+    assert read_status(os.path.join(root, "out", "lagoon_a"))["reused"] == ["physics", "ml", "uncertainty"]
+    assert again.loc["lagoon_a", ["physics_s", "ml_s", "uncertainty_s"]].isna().all()
+    assert again.loc["lagoon_a", "optimize_s"] > 0 and again.loc["lagoon_a", "n_sites"] > 0
+
+    # Outputs gone: not cached, rerun from the first missing step
+    shutil.rmtree(os.path.join(root, "out", "lagoon_b", "lagoon_b_store.zarr"))
+    third = run_batch(aois[:2], out_root="out", n_workers=0, offline=True, root=root).set_index("aoi")
+    assert list(third["status"]) == ["cached", "done"]
+    assert third.loc["lagoon_b", "physics_s"] > 0 and read_status(os.path.join(root, "out", "lagoon_b"))["reused"] == []
+    print("✅ Batch summary:\n", again.drop(columns="error").to_string())
@@ -0,0 +1,50 @@
+import sys, os, numpy as np, pytest
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "benchmarks"))
+import dask.array as da
+from synthetic import step1_grid, daily_kd490, write_step1
+from suite import run_suite, summary_frame, compare, comparable
+from libuts.store import open_store, store_variables
+
+def test_synthetic_store_with_daily_cube(tmp_path):
+    cube = daily_kd490(step1_grid(120), 40, chunks=(16, 64, 64))
+    assert isinstance(cube["KD490"].data, da.Array) and cube["KD490"].data.chunks[0] == (16, 16, 8)
+
+    path = str(tmp_path / "store.zarr")
+    write_step1(path, 120, days=5)
+    ds = open_store(path)
+    assert set(store_variables(path)) == {"KD490", "ADG443", "APH443", "BBP443", "PAR_surface", "depth", "KD490_daily"}
+    daily = ds["KD490_daily"].values
+    assert daily.shape == (5, 120, 120) and str(ds["time"].values[0])[:10] == "2024-07-01"
+    land = ~np.isfinite(ds["depth"].values)
+    assert land.any() and np.isnan(daily[:, land]).all(), "Land must stay blank every day."
+    assert 0.15 < np.isnan(daily[:, ~land]).mean() < 0.25, "About a fifth of the sea should be cloudy."
+    with pytest.raises(ValueError):
+        write_step1(str(tmp_path / "inputs.nc"), 50, days=5)
+    print("✅ Synthetic Step 1 store with a daily KD490 cube")
+
+def test_compare_flags_regressions():
+    def results(seconds, rss, status="ok", profile="quick"):
+        return {"profile": profile, "days": 0, "sizes": {"500": {
+            "physics": {"status": "ok", "seconds": 2.0, "peak_rss_mb": 200.0},
+            "ml": {"status": status, "seconds": seconds, "peak_rss_mb": rss},
+            "dashboard": {"status": "ok", "seconds": 0.2, "peak_rss_mb": 300.0}}}}
+    base = results(10.0, 400.0)
+    current = results(14.0, 420.0)
+    current["sizes"]["500"]["dashboard"]["seconds"] = 0.6      # +200 %, but within the absolute slack
+    current["sizes"]["1000"] = {"ml": {"status": "failed"}}      # not in the baseline
+    table = compare(current, base)
+    assert table[["stage", "metric"]].values.tolist() == [["ml", "seconds"]]
+    assert table["change"].iloc[0] == "+40%"
+    assert compare(results(10.0, 600.0), base)["metric"].tolist() == ["peak_rss_mb"]
+    assert compare(results(None, None, status="timeout"), base)["current"].tolist() == ["timeout"]
+    assert compare(base, base).empty
+    assert comparable(results(10.0, 400.0, profile="full"), base) is not None
+    print("✅ Regressions: relative tolerance, absolute slack, failed stages")
+
+def test_suite_skips_stages_without_inputs():
+    results = run_suite([100], stages=["physics", "uncertainty"])
+    table = summary_frame(results).set_index("stage")
+    assert table.loc["physics", "status"] == "ok" and table.loc["physics", "peak_rss_mb"] > 0
+    assert table.loc["uncertainty", "status"] == "skipped", "Step 4 needs the Step 3 outputs."
+    assert results["machine"]["cpus"] == os.cpu_count()
+    print("✅ Suite:\n", table.to_string())